@@ -1,23 +1,59 @@
 from fastapi import APIRouter, HTTPException
+from datetime import date
 from typing import List, Optional
 
 import services.accounts_service as accounts_service
+import services.balances_service as balances_service
 from models.account import AccountBase, AccountUpdate
+from models.balance import AccountBalanceAt, BalanceGranularity, BalanceSeries
 
 router = APIRouter(prefix="/accounts", tags=["Accounts"])
 
 
 @router.get("/{acc_id}")
-def get_account_by_acc_id(acc_id: int):
-    account = accounts_service.fetch_account_by_id(acc_id)
+async def get_account_by_acc_id(acc_id: int):
+    account = await accounts_service.fetch_account_by_id_async(acc_id)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     return account
 
 
+@router.get("/{acc_id}/balance", response_model=AccountBalanceAt)
+def get_account_balance(acc_id: int, as_of: Optional[date] = None):
+    """
+    Closing balance of an account on a day (default: today), from the nearest balance checkpoint.
+    """
+    try:
+        balance = balances_service.fetch_account_balance(acc_id, as_of)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if balance is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return balance
+
+
+@router.get("/{acc_id}/balance/history", response_model=BalanceSeries)
+def get_account_balance_history(
+    acc_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    granularity: BalanceGranularity = BalanceGranularity.DAY,
+):
+    """
+    Running balance of an account per transaction or per day between two dates (inclusive).
+    """
+    try:
+        series = balances_service.fetch_balance_series(acc_id, start_date, end_date, granularity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if series is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return series
+
+
 @router.get("/user/{user_id}")
-def get_accounts_for_user(user_id: int):
-    accounts = accounts_service.fetch_accounts_by_user(user_id)
+async def get_accounts_for_user(user_id: int):
+    accounts = await accounts_service.fetch_accounts_by_user_async(user_id)
     if not accounts:
         raise HTTPException(status_code=404, detail="Accounts not found")
     return accounts
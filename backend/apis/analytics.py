@@ -0,0 +1,29 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+from models.analytics import SpendingGroupBy, SpendingPeriod, SpendingReport
+import services.analytics_service as analytics_service
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+@router.get("/{user_id}/spending", response_model=SpendingReport)
+def get_spending(
+    user_id: int,
+    group_by: SpendingGroupBy = SpendingGroupBy.CATEGORY,
+    period: SpendingPeriod = SpendingPeriod.MONTH,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+):
+    """
+    Spending and income per tag, category or account and per day, week or month.
+    Dates are inclusive; weeks start on Monday.
+    """
+    try:
+        report = analytics_service.fetch_spending_report(user_id, group_by, period, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if report is None:
+        raise HTTPException(status_code=500, detail="Spending report not available")
+    return report
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 
 import services.bank_configs_service as bank_configs_service
+from utils.etag import table_etag, etag_matches, not_modified, etag_json_response
 
 router = APIRouter(prefix="/bank-configs", tags=["Bank Configs"])
 
 @router.get("/{bank_name}", summary="Get bank config by bank name")
-def get_bank_config(bank_name: str):
+def get_bank_config(bank_name: str, request: Request):
+    etag = table_etag("banks", "bank_configs")
+    if etag_matches(request, etag):
+        return not_modified(etag)
     try:
-        return bank_configs_service.fetch_bank_config(bank_name)
+        return etag_json_response(bank_configs_service.fetch_bank_config(bank_name), etag)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 
 import services.banks_service as banks_service
+from utils.etag import table_etag, etag_matches, not_modified, etag_json_response
 from models.bank import BankCreate
 
 router = APIRouter(prefix="/banks", tags=["Banks"])
 
 
 @router.get("/", summary="Get all banks")
-def get_all_banks():
-    return banks_service.fetch_all_banks()
+def get_all_banks(request: Request):
+    etag = table_etag("banks")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return etag_json_response(banks_service.fetch_all_banks(), etag)
 
 
 @router.get("/names", summary="Get all bank names")
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 
 import services.categories_service as categories_service
+from utils.etag import table_etag, etag_matches, not_modified, etag_json_response
 from models.category import CategoryCreate
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
 @router.get("/", summary="Get all categories")
-def get_all_categories():
-    return categories_service.fetch_all_categories()
+def get_all_categories(request: Request):
+    etag = table_etag("categories")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return etag_json_response(categories_service.fetch_all_categories(), etag)
 
 
 @router.get("/names", summary="Get all category names")
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException
+from datetime import date
 from typing import Optional, List
 
-from models.category_target import CategoryTarget
+from models.category_target import BudgetEvaluation, CategoryTarget
 import services.category_targets_service as category_targets_service
 
 router = APIRouter(prefix="/category-targets", tags=["Category Targets"])
@@ -23,6 +24,21 @@ async def read_current_targets_by_user(user_id: int):
     return category_targets_service.fetch_current_targets_by_user(user_id)
 
 
+@router.get("/user/{user_id}/evaluation", response_model=BudgetEvaluation)
+def evaluate_budget(user_id: int, start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """
+    Target vs actual share of income per category for a period (default: the current month).
+    Dates are inclusive; variance is actual minus target.
+    """
+    try:
+        evaluation = category_targets_service.evaluate_budget(user_id, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if evaluation is None:
+        raise HTTPException(status_code=500, detail="Budget evaluation not available")
+    return evaluation
+
+
 @router.get("/{category_id}/user/{user_id}", response_model=List[CategoryTarget])
 async def read_target_by_category_user(category_id: int, user_id: int):
     result = category_targets_service.fetch_target_by_category_user(category_id, user_id)
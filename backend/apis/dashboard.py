@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException
+
+from models.dashboard import DashboardSummary
+import services.dashboard_service as dashboard_service
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+@router.get("/{user_id}/summary", response_model=DashboardSummary)
+def get_dashboard_summary(user_id: int, recent_limit: int = dashboard_service.DEFAULT_RECENT_LIMIT):
+    """
+    Account balances, current-month spending/income and the most recent transactions for a user.
+    """
+    try:
+        summary = dashboard_service.fetch_dashboard_summary(user_id, recent_limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Dashboard summary not available")
+    return summary
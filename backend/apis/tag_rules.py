@@ -1,15 +1,62 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
 from typing import List, Optional
 
 import services.tag_rules_service as tag_rules_service
-from models.tag_rule import TagRuleBase
+from utils.etag import table_etag, etag_matches, not_modified, etag_json_response
+from models.tag_rule import RetagJob, RuleImpactPreview, TagRuleBase
 
 router = APIRouter(prefix="/tagging_rules", tags=["Tagging Rules"])
 
 @router.get("/")
-def get_all_rules():
+def get_all_rules(request: Request):
+    # Rules embed their tag name
+    etag = table_etag("tagging_rules", "tags")
+    if etag_matches(request, etag):
+        return not_modified(etag)
     rules = tag_rules_service.fetch_all_tagging_rules()
-    return rules
+    return etag_json_response(rules, etag)
+
+@router.post("/retag", status_code=202, response_model=RetagJob)
+def retag_transactions(background_tasks: BackgroundTasks, user_id: Optional[int] = None, clear_unmatched: bool = False):
+    """
+    Re-apply the current rules to stored transactions in the background (first match by
+    rule_id wins). Poll GET /tagging_rules/retag/{job_id} for progress.
+    """
+    try:
+        job = tag_rules_service.start_retag_job(user_id, clear_unmatched)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    background_tasks.add_task(tag_rules_service.run_retag_job, job.job_id)
+    return job
+
+@router.get("/retag/{job_id}", response_model=RetagJob)
+def get_retag_job(job_id: str):
+    """Progress of a retag job. Jobs live in the memory of the worker that started them."""
+    job = tag_rules_service.fetch_retag_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Retag job not found")
+    return job
+
+@router.post("/preview", response_model=RuleImpactPreview)
+def preview_rule(
+    rule: TagRuleBase,
+    user_id: int,
+    rule_id: Optional[int] = None,
+    sample_size: int = tag_rules_service.PREVIEW_SAMPLE_SIZE,
+):
+    """
+    Dry run of creating a rule (or, with rule_id, changing that rule) against a user's
+    transactions: how many it would tag, which rules would lose matches and examples.
+    """
+    try:
+        preview = tag_rules_service.preview_rule_impact(user_id, rule, rule_id, sample_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if preview is None:
+        raise HTTPException(status_code=500, detail="Rule preview not available")
+    return preview
 
 @router.get("/{rule_id}")
 def get_rule_by_id(rule_id: int):
@@ -25,26 +72,38 @@ def get_rules_for_tag(tag_name: str):
         raise HTTPException(status_code=404, detail="Tagging rules not found")
     return rules
 
+def _retag_in_background(background_tasks: BackgroundTasks) -> None:
+    """Apply a rule change to stored transactions once the response is sent."""
+    job = tag_rules_service.queue_retag_after_rule_change()
+    if job:
+        background_tasks.add_task(tag_rules_service.run_retag_job, job.job_id)
+
 @router.post("/", status_code=201)
-def create_rule(rule: TagRuleBase):
+def create_rule(rule: TagRuleBase, background_tasks: BackgroundTasks):
+    """Create a rule; stored transactions are retagged in the background afterwards."""
     created = tag_rules_service.create_tagging_rule(rule)
     if not created:
         raise HTTPException(status_code=400, detail="Failed to create tagging rule")
+    _retag_in_background(background_tasks)
     return created
 
 # FIX THIS
 @router.put("/{rule_id}")
-def update_rule(rule_id: int, update_data: TagRuleBase):
+def update_rule(rule_id: int, update_data: TagRuleBase, background_tasks: BackgroundTasks):
+    """Update a rule; stored transactions are retagged in the background afterwards."""
     updated = tag_rules_service.update_tagging_rule(
         rule_id,
         tag_rule=update_data,
     )
     if not updated:
         raise HTTPException(status_code=404, detail="Failed to update tagging rule")
+    _retag_in_background(background_tasks)
     return tag_rules_service.fetch_rule_by_id(rule_id)
 
 @router.delete("/{rule_id}", status_code=204)
-def delete_rule(rule_id: int):
+def delete_rule(rule_id: int, background_tasks: BackgroundTasks):
+    """Delete a rule; stored transactions are retagged in the background afterwards."""
     deleted = tag_rules_service.delete_tagging_rule(rule_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Tagging rule not found")
+    _retag_in_background(background_tasks)
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
 
 import services.tags_service as tags_service
+from utils.etag import table_etag, etag_matches, not_modified, etag_json_response
 from models.tag import TagBase
 
 router = APIRouter(prefix="/tags", tags=["Tags"])
 
 
 @router.get("/", summary="Get all tags")
-def get_all_tags():
-    return tags_service.fetch_all_tags()
+async def get_all_tags(request: Request):
+    # Tags embed their category name; the version lookup is a blocking query
+    etag = await run_in_threadpool(table_etag, "tags", "categories")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return etag_json_response(await tags_service.fetch_all_tags_async(), etag)
 
 @router.get("/count", summary="Get total number of tags")
 def get_tag_count():
@@ -24,16 +30,16 @@ def get_latest():
 
 
 @router.get("/name/{tag_name}", summary="Get tag by name")
-def get_tag_by_name(tag_name: str):
+async def get_tag_by_name(tag_name: str):
     try:
-        return tags_service.fetch_tag_by_name(tag_name)
+        return await tags_service.fetch_tag_by_name_async(tag_name)
     except ValueError as ve:
         raise HTTPException(status_code=404, detail=str(ve))
 
 @router.get("/id/{tag_id}", summary="Get tag by ID")
-def get_tag_by_id(tag_id: str):
+async def get_tag_by_id(tag_id: int):
     try:
-        return tags_service.fetch_tag_by_id(tag_id)
+        return await tags_service.fetch_tag_by_id_async(tag_id)
     except ValueError as ve:
         raise HTTPException(status_code=404, detail=str(ve))
 
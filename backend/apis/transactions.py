@@ -1,26 +1,73 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
 
-from models.transaction import Transaction, TransactionUpsert, BulkTransactionRequest, BulkTransactionResponse
+from models.transaction import (
+    Transaction, TransactionUpsert, BulkTransactionRequest, BulkTransactionResponse,
+    TransactionType, TransactionSearchFilters, TransactionPage, BulkInsertMode, BulkStreamResponse,
+)
 import services.transactions_service as transactions_service
 
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
+BULK_MAX_TRANSACTIONS = 1000
+BULK_COPY_MAX_TRANSACTIONS = 100_000
+STREAM_MAX_CHUNK_SIZE = 10_000
+
+@router.get("/search", response_model=TransactionPage)
+def search_transactions(
+    user_id: int,
+    acc_id: Optional[int] = None,
+    tag_id: Optional[int] = None,
+    txn_type: Optional[TransactionType] = Query(None, alias="type"),
+    min_amount: Optional[Decimal] = Query(None, ge=0),
+    max_amount: Optional[Decimal] = Query(None, ge=0),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    q: Optional[str] = None,
+    limit: int = transactions_service.SEARCH_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+):
+    """
+    Search a user's transactions, newest first, with keyset pagination.
+    Pass the returned next_cursor as `cursor` to fetch the following page.
+    """
+    filters = TransactionSearchFilters(
+        user_id=user_id,
+        acc_id=acc_id,
+        tag_id=tag_id,
+        type=txn_type,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        start_date=start_date,
+        end_date=end_date,
+        query=q,
+    )
+    try:
+        return transactions_service.search_transactions(filters, limit, cursor, include_total)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/{transaction_id}", response_model=Transaction)
-def get_transaction(transaction_id: int):
-    transaction = transactions_service.fetch_transaction_by_id(transaction_id)
+async def get_transaction(transaction_id: int):
+    transaction = await transactions_service.fetch_transaction_by_id_async(transaction_id)
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     return transaction
 
 @router.get("/user/{user_id}", response_model=List[Transaction])
-def list_transactions_for_user(user_id: int):
-    return transactions_service.get_all_transaction_for_user(user_id)
+async def list_transactions_for_user(user_id: int):
+    return await transactions_service.get_all_transaction_for_user_async(user_id)
 
 
 @router.get("/account/{acc_id}", response_model=List[Transaction])
-def list_transactions_for_account(acc_id: int):
-    return transactions_service.get_all_transaction_for_account(acc_id)
+async def list_transactions_for_account(acc_id: int):
+    return await transactions_service.get_all_transaction_for_account_async(acc_id)
 
 @router.post("/", response_model=int)
 def create_transaction(transaction: Transaction):
@@ -36,22 +83,87 @@ def update_transaction(transaction_id: int, transaction: Transaction):
         raise HTTPException(status_code=400, detail="Failed to update transaction")
     return {"status": "success"}
 
-@router.post("/bulk", response_model=BulkTransactionResponse)
-def bulk_create_transactions(request: BulkTransactionRequest):
+def _parse_bulk_body(body: bytes, content_type: str, content_encoding: Optional[str]) -> List[Transaction]:
+    """Decode a bulk request body according to its content type."""
+    if content_type == transactions_service.COLUMNAR_CONTENT_TYPE:
+        try:
+            return transactions_service.decode_columnar_transactions(body, content_encoding)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        return BulkTransactionRequest.model_validate_json(body).transactions
+    except ValidationError as e:
+        # Same shape as FastAPI's own body validation errors
+        errors = [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        raise RequestValidationError(errors, body=body)
+
+@router.post(
+    "/bulk",
+    response_model=BulkTransactionResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"transactions": {"type": "array", "items": {"$ref": "#/components/schemas/Transaction"}}},
+                        "required": ["transactions"],
+                    }
+                },
+                transactions_service.COLUMNAR_CONTENT_TYPE: {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"columns": {"type": "object"}, "constants": {"type": "object"}},
+                        "required": ["columns"],
+                    }
+                },
+            },
+        }
+    },
+)
+async def bulk_create_transactions(request: Request, mode: BulkInsertMode = BulkInsertMode.VALUES):
     """
     Bulk insert multiple transactions.
+    Accepts a JSON body {"transactions": [...]}, or a columnar payload sent with
+    Content-Type application/vnd.finance.transactions.columnar+json (optionally gzip encoded).
+    Use mode=copy for large backfills; it raises the per-request limit and ingests via COPY.
     Returns detailed response with success/failure counts and any errors.
     """
-    if not request.transactions:
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    transactions = await run_in_threadpool(
+        _parse_bulk_body, body, content_type, request.headers.get("content-encoding")
+    )
+
+    if not transactions:
         raise HTTPException(status_code=400, detail="No transactions provided")
     
-    if len(request.transactions) > 1000:  # Limit bulk operations
-        raise HTTPException(status_code=400, detail="Maximum 1000 transactions allowed per bulk operation")
+    max_transactions = BULK_COPY_MAX_TRANSACTIONS if mode == BulkInsertMode.COPY else BULK_MAX_TRANSACTIONS
+    if len(transactions) > max_transactions:  # Limit bulk operations
+        raise HTTPException(status_code=400, detail=f"Maximum {max_transactions} transactions allowed per bulk operation")
     
-    result = transactions_service.bulk_add_transactions(request.transactions)
+    result = await run_in_threadpool(transactions_service.bulk_add_transactions, transactions, mode=mode)
     
     # If all transactions failed, return 400
     if result.success_count == 0 and result.failure_count > 0:
         raise HTTPException(status_code=400, detail=f"All {result.failure_count} transactions failed")
     
     return result
+
+@router.post("/bulk/stream", response_model=BulkStreamResponse)
+async def stream_bulk_create_transactions(
+    request: Request,
+    chunk_size: int = Query(transactions_service.STREAM_CHUNK_SIZE, ge=1, le=STREAM_MAX_CHUNK_SIZE),
+    mode: BulkInsertMode = BulkInsertMode.VALUES,
+):
+    """
+    Stream transactions as NDJSON (application/x-ndjson), one transaction object per line.
+    Rows are validated and inserted in chunks while the body is still arriving, so there is
+    no per-request row limit. Returns a summary per chunk plus overall totals.
+    """
+    result = await transactions_service.stream_add_transactions(request.stream(), chunk_size, mode)
+    if result.total_processed == 0 and result.error is None:
+        raise HTTPException(status_code=400, detail="No transactions provided")
+    return result
@@ -1,8 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from apis import banks, categories, category_targets, tags, users, tag_rules, accounts, transactions, bank_configs
+from starlette.concurrency import run_in_threadpool
+from apis import banks, categories, category_targets, tags, users, tag_rules, accounts, transactions, bank_configs, dashboard, analytics
+from db.database import close_pool, get_pool_stats
+from db.async_database import close_async_pool, get_async_pool_stats
+from utils.cache import get_cache_stats
+import services.analytics_service as analytics_service
+import services.balances_service as balances_service
+import repositories.table_versions_repository as table_versions_repo
+from utils.responses import CompressionMiddleware, ORJSONResponse
+
+
+async def advance_checkpoints_periodically():
+    """Add each new month's balance checkpoints without an operator rebuild."""
+    while True:
+        await run_in_threadpool(balances_service.advance_balance_checkpoints)
+        await asyncio.sleep(balances_service.CHECKPOINT_ADVANCE_INTERVAL_SECONDS)
 
-app = FastAPI(title="Finance Tracker Automation")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Transaction writes maintain these derived tables in the same statement, so they
+    # have to exist before the first request
+    await run_in_threadpool(analytics_service.ensure_monthly_rollups)
+    await run_in_threadpool(table_versions_repo.ensure_table_versions)
+    await run_in_threadpool(balances_service.ensure_balance_checkpoints)
+    checkpoint_task = asyncio.create_task(advance_checkpoints_periodically())
+    yield
+    checkpoint_task.cancel()
+    close_pool()
+    await close_async_pool()
+
+app = FastAPI(title="Finance Tracker Automation", lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -24,11 +56,21 @@ app.include_router(users.router)
 app.include_router(tag_rules.router)
 app.include_router(accounts.router)
 app.include_router(transactions.router)
+app.include_router(dashboard.router)
+app.include_router(analytics.router)
 
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
 
+@app.get("/health/db")
+def database_pool_stats():
+    return {**get_pool_stats(), "async": get_async_pool_stats()}
+
+@app.get("/health/cache")
+def reference_cache_stats():
+    return get_cache_stats()
+
 if __name__ =="__main__":
     import uvicorn
     import os
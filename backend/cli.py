@@ -0,0 +1,103 @@
+"""
+Operator commands that talk to the database directly instead of going through the HTTP API.
+
+    python cli.py ingest --mode copy < payload.json.gz
+    python cli.py rebuild-rollups [--user-id 1]
+    python cli.py rebuild-checkpoints [--acc-id 1]
+"""
+import argparse
+import sys
+
+from db.database import close_pool
+from models.transaction import BulkInsertMode
+import services.transactions_service as transactions_service
+import services.analytics_service as analytics_service
+import services.balances_service as balances_service
+import repositories.table_versions_repository as table_versions_repo
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def ingest(args: argparse.Namespace) -> int:
+    """
+    Read a columnar transactions payload (the /transactions/bulk columnar format,
+    gzip or plain) from stdin, validate and insert it with the same service code
+    the API uses, and write the BulkTransactionResponse JSON to stdout.
+    Inserts also maintain the rollup and checkpoint tables, so they are created here
+    as at API startup; the API may never have run against this database.
+    """
+    body = sys.stdin.buffer.read()
+    encoding = "gzip" if body[:2] == GZIP_MAGIC else None
+    try:
+        transactions = transactions_service.decode_columnar_transactions(body, encoding)
+    except ValueError as e:
+        print(f"Invalid payload: {e}", file=sys.stderr)
+        return 2
+    if not transactions:
+        print("No transactions provided", file=sys.stderr)
+        return 2
+
+    if not (analytics_service.ensure_monthly_rollups()
+            and balances_service.ensure_balance_checkpoints()
+            and table_versions_repo.ensure_table_versions()):
+        print("Could not prepare the derived tables, see the backend log", file=sys.stderr)
+        return 1
+
+    result = transactions_service.bulk_add_transactions(transactions, mode=args.mode)
+    sys.stdout.write(result.model_dump_json())
+    return 0
+
+
+def rebuild_rollups(args: argparse.Namespace) -> int:
+    """Create the monthly rollup table if needed and recompute it from transactions."""
+    try:
+        row_count = analytics_service.rebuild_monthly_rollups(args.user_id)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    if row_count is None:
+        print("Rollup rebuild failed, see the backend log", file=sys.stderr)
+        return 1
+    print(f"Rebuilt {row_count} monthly rollup rows")
+    return 0
+
+
+def rebuild_checkpoints(args: argparse.Namespace) -> int:
+    """Create the balance checkpoint table if needed and recompute it from transactions."""
+    try:
+        row_count = balances_service.rebuild_balance_checkpoints(args.acc_id)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    if row_count is None:
+        print("Checkpoint rebuild failed, see the backend log", file=sys.stderr)
+        return 1
+    print(f"Rebuilt {row_count} balance checkpoints")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Finance tracker operator commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="Bulk insert a columnar transactions payload from stdin")
+    ingest_parser.add_argument("--mode", type=BulkInsertMode, default=BulkInsertMode.COPY, choices=list(BulkInsertMode))
+    ingest_parser.set_defaults(handler=ingest)
+
+    rollups_parser = commands.add_parser("rebuild-rollups", help="Backfill the monthly transaction rollups")
+    rollups_parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's rollups")
+    rollups_parser.set_defaults(handler=rebuild_rollups)
+
+    checkpoints_parser = commands.add_parser("rebuild-checkpoints", help="Backfill monthly account balance checkpoints")
+    checkpoints_parser.add_argument("--acc-id", type=int, default=None, help="Only rebuild this account's checkpoints")
+    checkpoints_parser.set_defaults(handler=rebuild_checkpoints)
+
+    args = parser.parse_args()
+    try:
+        return args.handler(args)
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import asyncpg
+from dotenv import load_dotenv
+
+from utils.logger import logger
+
+load_dotenv()
+
+# Opt-in per deployment: when disabled, the async service helpers fall back to
+# running the psycopg2 repositories in the threadpool.
+DB_ASYNC_ENABLED = os.getenv("DB_ASYNC_ENABLED", "false").lower() in ("1", "true", "yes")
+DB_ASYNC_MIN_SIZE = int(os.getenv("DB_ASYNC_MIN_SIZE", os.getenv("DB_POOL_MIN_SIZE", "1")))
+DB_ASYNC_MAX_SIZE = int(os.getenv("DB_ASYNC_MAX_SIZE", os.getenv("DB_POOL_MAX_SIZE", "10")))
+# Transaction-mode poolers such as pgbouncer need the statement cache disabled (0)
+DB_ASYNC_STATEMENT_CACHE_SIZE = int(os.getenv("DB_ASYNC_STATEMENT_CACHE_SIZE", "100"))
+
+_async_pool: Optional[asyncpg.Pool] = None
+_async_pool_lock: Optional[asyncio.Lock] = None
+
+
+async def get_async_pool() -> asyncpg.Pool:
+    """Return the process-wide asyncpg pool, creating it on first use."""
+    global _async_pool, _async_pool_lock
+    if _async_pool is not None:
+        return _async_pool
+    if _async_pool_lock is None:
+        _async_pool_lock = asyncio.Lock()
+    async with _async_pool_lock:
+        if _async_pool is None:
+            _async_pool = await asyncpg.create_pool(
+                os.getenv("DATABASE_URL"),
+                min_size=DB_ASYNC_MIN_SIZE,
+                max_size=DB_ASYNC_MAX_SIZE,
+                statement_cache_size=DB_ASYNC_STATEMENT_CACHE_SIZE,
+            )
+            logger.info(f"[Database] Async connection pool created (min={DB_ASYNC_MIN_SIZE}, max={DB_ASYNC_MAX_SIZE})")
+    return _async_pool
+
+
+@asynccontextmanager
+async def async_db_connection() -> AsyncIterator[asyncpg.Connection]:
+    """Acquire a connection from the async pool and release it when the block exits."""
+    pool = await get_async_pool()
+    async with pool.acquire() as conn:
+        yield conn
+
+
+def get_async_pool_stats() -> Dict:
+    """Return async pool counters, or a placeholder if the pool has not been created yet."""
+    if _async_pool is None:
+        return {"enabled": DB_ASYNC_ENABLED, "initialized": False}
+    return {
+        "enabled": DB_ASYNC_ENABLED,
+        "initialized": True,
+        "min_size": _async_pool.get_min_size(),
+        "max_size": _async_pool.get_max_size(),
+        "open": _async_pool.get_size(),
+        "idle": _async_pool.get_idle_size(),
+    }
+
+
+async def close_async_pool() -> None:
+    """Close the async pool. Called on application shutdown."""
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+        logger.info("[Database] Async connection pool closed")
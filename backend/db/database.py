@@ -1,9 +1,259 @@
 import psycopg2
 import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
 from dotenv import load_dotenv
+from psycopg2 import pool as pg_pool
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from utils.logger import logger
 
 load_dotenv()
 
-def get_connection(cursor_factory=None):
-    # return psycopg2.connect(os.getenv("TEST_DATABASE_URL"), cursor_factory=cursor_factory)
-    return psycopg2.connect(os.getenv("DATABASE_URL"), cursor_factory=cursor_factory)
\ No newline at end of file
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_HEALTHCHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTHCHECK_INTERVAL", "30"))
+
+
+class PooledConnection:
+    """
+    Thin proxy over a pooled psycopg2 connection.
+    close() hands the connection back to the pool instead of closing the socket,
+    so repositories keep their usual try/finally cleanup.
+    """
+
+    _OWN_ATTRIBUTES = ("_pool", "_conn")
+
+    def __init__(self, pool: "ConnectionPool", conn):
+        self._pool = pool
+        self._conn = conn
+
+    @property
+    def closed(self) -> int:
+        return 1 if self._conn is None else self._conn.closed
+
+    def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn)
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("Connection has already been returned to the pool")
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        # Attributes such as autocommit must reach the real connection, not the proxy
+        if name in self._OWN_ATTRIBUTES:
+            object.__setattr__(self, name, value)
+        elif self._conn is None:
+            raise psycopg2.InterfaceError("Connection has already been returned to the pool")
+        else:
+            setattr(self._conn, name, value)
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of psycopg2 connections.
+
+    Checkouts block for up to `timeout` seconds when every connection is in use,
+    and connections idle for longer than `healthcheck_interval` are pinged with
+    SELECT 1 before being handed out. Broken connections are discarded.
+    """
+
+    def __init__(self, dsn: str, min_size: int, max_size: int, timeout: float, healthcheck_interval: float):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.healthcheck_interval = healthcheck_interval
+        self._pool = pg_pool.ThreadedConnectionPool(min_size, max_size, dsn)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._last_used: Dict[int, float] = {}
+        self._stats = {"checkouts": 0, "waits": 0, "timeouts": 0, "discarded": 0, "in_use": 0}
+        # Mirrors ThreadedConnectionPool: it opens min_size connections up front, reuses
+        # idle ones first and keeps at most min_size idle, closing the rest on putconn
+        self._open = min_size
+        self._idle = min_size
+
+    def getconn(self, cursor_factory=None) -> PooledConnection:
+        if not self._slots.acquire(blocking=False):
+            self._bump("waits")
+            if not self._slots.acquire(timeout=self.timeout):
+                self._bump("timeouts")
+                raise pg_pool.PoolError(f"Timed out after {self.timeout}s waiting for a database connection")
+
+        try:
+            conn = self._checkout_healthy()
+        except Exception:
+            self._slots.release()
+            raise
+
+        conn.cursor_factory = cursor_factory
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+        return PooledConnection(self, conn)
+
+    def putconn(self, conn) -> None:
+        discard = bool(conn.closed)
+        if not discard:
+            try:
+                if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                conn.cursor_factory = None
+            except psycopg2.Error:
+                discard = True
+
+        with self._lock:
+            if discard:
+                self._stats["discarded"] += 1
+                self._last_used.pop(id(conn), None)
+                self._open -= 1
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+                if self._idle < self.min_size:
+                    self._idle += 1
+                else:
+                    self._open -= 1
+            self._stats["in_use"] -= 1
+
+        try:
+            self._pool.putconn(conn, close=discard)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle"] = self._idle
+            stats["open"] = self._open
+        stats["min_size"] = self.min_size
+        stats["max_size"] = self.max_size
+        return stats
+
+    def closeall(self) -> None:
+        self._pool.closeall()
+
+    def _checkout_healthy(self):
+        for _ in range(self.max_size + 1):
+            conn = self._pool.getconn()
+            with self._lock:
+                if self._idle:
+                    self._idle -= 1
+                else:
+                    self._open += 1
+            if self._is_healthy(conn):
+                return conn
+            logger.warning("[Database] Discarding broken pooled connection")
+            with self._lock:
+                self._stats["discarded"] += 1
+                self._last_used.pop(id(conn), None)
+                self._open -= 1
+            self._pool.putconn(conn, close=True)
+        raise psycopg2.OperationalError("Could not obtain a healthy database connection")
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        with self._lock:
+            last_used = self._last_used.get(id(conn))
+        # Freshly opened or recently used connections are trusted as-is
+        if last_used is None or time.monotonic() - last_used < self.healthcheck_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _bump(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # dsn = os.getenv("TEST_DATABASE_URL")
+                _pool = ConnectionPool(
+                    os.getenv("DATABASE_URL"),
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=DB_POOL_MAX_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    healthcheck_interval=DB_POOL_HEALTHCHECK_INTERVAL,
+                )
+                logger.info(f"[Database] Connection pool created (min={DB_POOL_MIN_SIZE}, max={DB_POOL_MAX_SIZE})")
+    return _pool
+
+
+def get_connection(cursor_factory=None) -> PooledConnection:
+    """
+    Check out a connection from the pool.
+    Calling close() on the returned connection gives it back to the pool.
+    """
+    return get_pool().getconn(cursor_factory)
+
+
+@contextmanager
+def db_connection(cursor_factory=None) -> Iterator[PooledConnection]:
+    """
+    Context manager around a pooled connection.
+    Commits when the block succeeds, rolls back on error and always returns the connection.
+    """
+    conn = get_connection(cursor_factory)
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+@contextmanager
+def db_cursor(cursor_factory=None) -> Iterator:
+    """Context manager yielding a cursor on a pooled connection (see db_connection)."""
+    with db_connection(cursor_factory) as conn:
+        cursor = conn.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
+
+def get_pool_stats() -> Dict:
+    """Return pool counters, or a placeholder if the pool has not been created yet."""
+    if _pool is None:
+        return {"initialized": False}
+    return {"initialized": True, **_pool.stats()}
+
+
+def close_pool() -> None:
+    """Close every pooled connection. Called on application shutdown."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            logger.info("[Database] Connection pool closed")
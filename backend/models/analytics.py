@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+
+
+class SpendingGroupBy(str, Enum):
+    TAG = "tag"
+    CATEGORY = "category"
+    ACCOUNT = "account"
+
+
+class SpendingPeriod(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class SpendingBucket(BaseModel):
+    """Totals for one group within one period. group_id/group_name are null for untagged transactions."""
+    period_start: date
+    group_id: Optional[int] = None
+    group_name: Optional[str] = None
+    spending: Decimal
+    income: Decimal
+    transaction_count: int
+
+
+class SpendingReport(BaseModel):
+    user_id: int
+    group_by: SpendingGroupBy
+    period: SpendingPeriod
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    total_spending: Decimal
+    total_income: Decimal
+    buckets: List[SpendingBucket]
@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import List, Optional, Union
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+
+
+class BalanceGranularity(str, Enum):
+    TRANSACTION = "transaction"
+    DAY = "day"
+
+
+class AccountBalanceAt(BaseModel):
+    """An account's balance at the end of `as_of`, and the checkpoint it was derived from."""
+    acc_id: int
+    as_of: date
+    balance: Decimal
+    checkpoint_date: Optional[date] = None
+
+
+class BalancePoint(BaseModel):
+    """Balance after a transaction, or at the end of a day for daily series (transaction_id is null)."""
+    point_time: Union[datetime, date]
+    transaction_id: Optional[int] = None
+    amount: Decimal
+    transaction_count: int
+    balance: Decimal
+
+
+class BalanceSeries(BaseModel):
+    acc_id: int
+    start_date: date
+    end_date: date
+    granularity: BalanceGranularity
+    opening_balance: Decimal
+    checkpoint_date: Optional[date] = None
+    points: List[BalancePoint]
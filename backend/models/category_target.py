@@ -1,10 +1,33 @@
 from pydantic import BaseModel, confloat
-from datetime import datetime
-from typing import Optional, Annotated
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional, Annotated
 
 class CategoryTarget(BaseModel):
     target_id: int
     percentage: Annotated[float, confloat(ge=0, le=100)]
     start_date: Optional[datetime] = None
     category_id: int
-    user_id: int
\ No newline at end of file
+    user_id: int
+
+
+class CategoryBudgetStatus(BaseModel):
+    """
+    Target vs actual for one category. Percentages are shares of the period's income;
+    variance is actual minus target, so a positive value means overspending.
+    """
+    category_id: int
+    category_name: str
+    target_percentage: Optional[float] = None
+    target_start_date: Optional[datetime] = None
+    spending: Decimal
+    actual_percentage: Optional[float] = None
+    variance: Optional[float] = None
+
+
+class BudgetEvaluation(BaseModel):
+    user_id: int
+    start_date: date
+    end_date: date
+    income: Decimal
+    categories: List[CategoryBudgetStatus]
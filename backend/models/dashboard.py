@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import date
+from decimal import Decimal
+
+from models.transaction import Transaction
+
+
+class AccountBalance(BaseModel):
+    acc_id: int
+    acc_name: str
+    bank_name: str
+    currency: str
+    balance: Decimal
+
+
+class DashboardSummary(BaseModel):
+    user_id: int
+    account_count: int
+    transaction_count: int
+    accounts: List[AccountBalance]
+    month_start: date
+    monthly_spending: Decimal
+    monthly_income: Decimal
+    recent_transactions: List[Transaction]
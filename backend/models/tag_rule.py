@@ -1,4 +1,7 @@
-from typing import Annotated
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Annotated, List, Optional
 from pydantic import BaseModel, StringConstraints
 
 class TaggingRule(BaseModel):
@@ -9,4 +12,63 @@ class TaggingRule(BaseModel):
 
 class TagRuleBase(BaseModel):
     keyword: Annotated[str, StringConstraints(min_length=1)]
-    tag_name: Annotated[str, StringConstraints(min_length=1)]
\ No newline at end of file
+    tag_name: Annotated[str, StringConstraints(min_length=1)]
+
+class RetagJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class RetagJob(BaseModel):
+    """Progress of a background retag. total is the number of transactions in scope."""
+    job_id: str
+    user_id: Optional[int] = None
+    clear_unmatched: bool = False
+    # Tags of deleted or changed rules: transactions no rule matches lose these tags
+    clear_tag_ids: List[int] = []
+    status: RetagJobStatus = RetagJobStatus.PENDING
+    total: int = 0
+    processed: int = 0
+    updated: int = 0
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class RuleMatchShift(BaseModel):
+    """Transactions that move away from (or are kept by) an existing rule."""
+    rule_id: int
+    keyword: str
+    tag_name: str
+    transaction_count: int
+
+
+class RulePreviewSample(BaseModel):
+    """A transaction the candidate rule would tag. current_rule_id is the rule matching it today."""
+    transaction_id: int
+    transaction_time: datetime
+    description: str
+    amount: Decimal
+    tag_name: Optional[str] = None
+    current_rule_id: Optional[int] = None
+
+
+class RuleImpactPreview(BaseModel):
+    """
+    Dry run of adding a rule (rule_id is None) or changing an existing rule's keyword and tag.
+    keyword_match_count counts transactions containing the keyword; match_count the ones the
+    rule would actually win under first-match-by-rule_id.
+    """
+    user_id: int
+    rule_id: Optional[int] = None
+    keyword: str
+    tag_name: str
+    total_transactions: int
+    keyword_match_count: int
+    match_count: int
+    newly_tagged_count: int
+    rules_losing_matches: List[RuleMatchShift]
+    shadowed_by: List[RuleMatchShift]
+    samples: List[RulePreviewSample]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
 
@@ -43,6 +43,11 @@ class TransactionUpsert(BaseModel):
     user_id: Optional[int] = None
 
 
+class BulkInsertMode(str, Enum):
+    VALUES = "values"
+    COPY = "copy"
+
+
 class BulkTransactionRequest(BaseModel):
     transactions: List[Transaction]
 
@@ -50,6 +55,47 @@ class BulkTransactionRequest(BaseModel):
 class BulkTransactionResponse(BaseModel):
     success_count: int
     failure_count: int
+    duplicate_count: int = 0
     total_processed: int
     inserted_ids: List[int]
     errors: Optional[List[str]] = None
+
+
+
+class BulkChunkSummary(BaseModel):
+    chunk_index: int
+    first_line: int
+    last_line: int
+    success_count: int
+    failure_count: int
+    duplicate_count: int = 0
+    inserted_ids: List[int]
+    errors: Optional[List[str]] = None
+
+
+class BulkStreamResponse(BaseModel):
+    success_count: int
+    failure_count: int
+    duplicate_count: int
+    total_processed: int
+    chunks: List[BulkChunkSummary]
+    error: Optional[str] = None
+
+
+class TransactionSearchFilters(BaseModel):
+    """Filters for the paginated transaction search. Amount bounds apply to the absolute amount."""
+    user_id: int
+    acc_id: Optional[int] = None
+    tag_id: Optional[int] = None
+    type: Optional[TransactionType] = None
+    min_amount: Optional[Decimal] = Field(None, ge=0)
+    max_amount: Optional[Decimal] = Field(None, ge=0)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    query: Optional[str] = None
+
+
+class TransactionPage(BaseModel):
+    items: List[Transaction]
+    next_cursor: Optional[str] = None
+    total_count: Optional[int] = None
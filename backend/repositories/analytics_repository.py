@@ -0,0 +1,135 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from psycopg2.extras import RealDictCursor
+
+from db.database import get_connection
+from models.analytics import SpendingGroupBy, SpendingPeriod
+from repositories.rollups_repository import ROLLUP_TABLE, covers_whole_months
+from utils.logger import logger
+
+# Group key, display name and the joins needed to reach them, per grouping.
+# Only these fixed fragments are interpolated into the query.
+_GROUP_COLUMNS = {
+    SpendingGroupBy.TAG: (
+        "t.tag_id", "tg.tag_name",
+        "LEFT JOIN tags tg ON tg.tag_id = t.tag_id",
+    ),
+    SpendingGroupBy.CATEGORY: (
+        "c.category_id", "c.category_name",
+        "LEFT JOIN tags tg ON tg.tag_id = t.tag_id LEFT JOIN categories c ON c.category_id = tg.category_id",
+    ),
+    SpendingGroupBy.ACCOUNT: (
+        "t.acc_id", "a.acc_name",
+        "LEFT JOIN accounts a ON a.acc_id = t.acc_id",
+    ),
+}
+
+def get_spending_buckets(
+    user_id: int,
+    group_by: SpendingGroupBy,
+    period: SpendingPeriod,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Optional[List[Dict]]:
+    """
+    Sums a user's spending (debits, as positive amounts) and income per group and
+    period with a single GROUP BY over transactions. Weeks start on Monday.
+    Monthly reports over whole months are read from the monthly rollups instead.
+    Returns None on failure.
+    """
+    if period == SpendingPeriod.MONTH and covers_whole_months(start_date, end_date):
+        return _get_monthly_rollup_buckets(user_id, group_by, start_date, end_date)
+
+    group_id, group_name, joins = _GROUP_COLUMNS[group_by]
+    clauses = ["t.user_id = %(user_id)s"]
+    params = {"user_id": user_id, "period": period.value}
+    if start_date is not None:
+        clauses.append("t.transaction_time >= %(start)s")
+        params["start"] = start_date
+    if end_date is not None:
+        # end_date is inclusive of the whole day
+        clauses.append("t.transaction_time < %(end)s")
+        params["end"] = end_date + timedelta(days=1)
+
+    query = f"""
+        SELECT date_trunc(%(period)s, t.transaction_time)::date AS period_start,
+               {group_id} AS group_id,
+               {group_name} AS group_name,
+               COALESCE(SUM(-t.amount) FILTER (WHERE t.amount < 0), 0) AS spending,
+               COALESCE(SUM(t.amount) FILTER (WHERE t.amount > 0), 0) AS income,
+               COUNT(*) AS transaction_count
+        FROM transactions t
+        {joins}
+        WHERE {' AND '.join(clauses)}
+        GROUP BY 1, 2, 3
+        ORDER BY period_start, spending DESC, group_id
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection(RealDictCursor)
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return [dict(row) for row in cursor.fetchall()]
+    except Exception as e:
+        logger.error(f"[Repository] Error in get_spending_buckets: {e}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+def _get_monthly_rollup_buckets(
+    user_id: int,
+    group_by: SpendingGroupBy,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Optional[List[Dict]]:
+    """
+    Same result as get_spending_buckets for whole-month ranges, read from the
+    (user, account, tag, month) rollups instead of scanning transactions.
+    The rollup table is aliased as t so the group joins apply unchanged.
+    """
+    group_id, group_name, joins = _GROUP_COLUMNS[group_by]
+    clauses = ["t.user_id = %(user_id)s"]
+    params = {"user_id": user_id}
+    if start_date is not None:
+        clauses.append("t.month >= %(start)s")
+        params["start"] = start_date
+    if end_date is not None:
+        clauses.append("t.month <= %(end)s")
+        params["end"] = end_date.replace(day=1)
+
+    query = f"""
+        SELECT t.month AS period_start,
+               {group_id} AS group_id,
+               {group_name} AS group_name,
+               SUM(t.spending) AS spending,
+               SUM(t.income) AS income,
+               SUM(t.transaction_count) AS transaction_count
+        FROM {ROLLUP_TABLE} t
+        {joins}
+        WHERE {' AND '.join(clauses)}
+        GROUP BY 1, 2, 3
+        HAVING SUM(t.transaction_count) > 0
+        ORDER BY period_start, spending DESC, group_id
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection(RealDictCursor)
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return [dict(row) for row in cursor.fetchall()]
+    except Exception as e:
+        logger.error(f"[Repository] Error in _get_monthly_rollup_buckets: {e}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
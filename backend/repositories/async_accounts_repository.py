@@ -0,0 +1,36 @@
+from typing import Optional, List, Dict
+
+from db.async_database import async_db_connection
+from utils.logger import logger
+
+async def get_account_by_id(acc_id: int) -> Optional[Dict]:
+    """Fetch the account by id and return a dict with account and related names."""
+    query = (
+        "SELECT a.acc_id, a.acc_name, a.user_id, a.bank_id, a.is_active, a.balance, a.currency, "
+        "u.username AS user_name, b.bank_name "
+        "FROM users u JOIN accounts a ON a.user_id = u.user_id JOIN banks b ON a.bank_id = b.bank_id "
+        "WHERE a.acc_id = $1 AND a.is_active = true"
+    )
+    try:
+        async with async_db_connection() as conn:
+            row = await conn.fetchrow(query, acc_id)
+        return dict(row) if row else None
+    except Exception as e:
+        logger.error(f"[Repository] Error in async get_account_by_id: {e}")
+        return None
+
+async def get_accounts_by_user(user_id: int) -> Optional[List[Dict]]:
+    """Fetch all active accounts for a given user id and return list of dicts."""
+    query = (
+        "SELECT a.acc_id, a.acc_name, a.user_id, a.bank_id, a.is_active, a.balance, a.currency, "
+        "u.username AS user_name, b.bank_name "
+        "FROM users u JOIN accounts a ON a.user_id = u.user_id JOIN banks b ON a.bank_id = b.bank_id "
+        "WHERE u.user_id = $1 AND a.is_active = true"
+    )
+    try:
+        async with async_db_connection() as conn:
+            rows = await conn.fetch(query, user_id)
+        return [dict(r) for r in rows] if rows else None
+    except Exception as e:
+        logger.error(f"[Repository] Error in async get_accounts_by_user: {e}")
+        return None
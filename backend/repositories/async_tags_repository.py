@@ -0,0 +1,48 @@
+from db.async_database import async_db_connection
+from utils.logger import logger
+
+from typing import Optional, List, Dict
+
+async def get_tag_by_name(tag_name: str) -> Optional[Dict]:
+    """
+    Fetches the tag given a tag name.
+    Returns None if the tag does not exist.
+    """
+    query = "SELECT c.category_id, c.category_name, t.tag_name, t.tag_id FROM categories c JOIN tags t ON t.category_id = c.category_id WHERE t.tag_name = $1"
+
+    try:
+        async with async_db_connection() as conn:
+            row = await conn.fetchrow(query, tag_name.strip())
+        return dict(row) if row else None
+    except Exception as e:
+        logger.error(f"[Repository] Error in async get_tag_by_name: {e}")
+        return None
+
+async def get_tag_by_id(tag_id: int) -> Optional[Dict]:
+    """
+    Fetches the tag given a tag ID.
+    Returns None if the tag is not found.
+    """
+    query = "SELECT c.category_id, c.category_name, t.tag_name, t.tag_id FROM categories c JOIN tags t ON t.category_id = c.category_id WHERE t.tag_id = $1"
+
+    try:
+        async with async_db_connection() as conn:
+            row = await conn.fetchrow(query, tag_id)
+        return dict(row) if row else None
+    except Exception as e:
+        logger.error(f"[Repository] Error in async get_tag_by_id: {e}")
+        return None
+
+async def get_all_tags() -> List[Dict]:
+    """
+    Returns a list of all tags with their category.
+    """
+    query = "SELECT t.tag_id, t.tag_name, c.category_id, c.category_name FROM tags t JOIN categories c ON c.category_id = t.category_id ORDER BY tag_name"
+
+    try:
+        async with async_db_connection() as conn:
+            rows = await conn.fetch(query)
+        return [dict(r) for r in rows]
+    except Exception as e:
+        logger.error(f"[Repository] Error in async get_all_tags: {e}")
+        return []
@@ -0,0 +1,47 @@
+from db.async_database import async_db_connection
+from utils.logger import logger
+
+from typing import Optional, List
+from models.transaction import Transaction
+
+async def get_transaction_by_id(transaction_id: int) -> Optional[Transaction]:
+    """
+    Returns a Transaction from an ID.
+    """
+    query = "SELECT * FROM transactions WHERE transaction_id = $1"
+
+    try:
+        async with async_db_connection() as conn:
+            row = await conn.fetchrow(query, transaction_id)
+        return Transaction(**dict(row)) if row else None
+    except Exception as e:
+        logger.error(f"[Repository] Error in async get_transaction_by_id: {e}")
+        return None
+
+async def get_all_transaction_for_user(user_id: int) -> List[Transaction]:
+    """
+    Returns the Transactions for a user.
+    """
+    query = "SELECT * FROM transactions WHERE user_id = $1"
+
+    try:
+        async with async_db_connection() as conn:
+            rows = await conn.fetch(query, user_id)
+        return [Transaction(**dict(row)) for row in rows]
+    except Exception as e:
+        logger.error(f"[Repository] Error in async get_all_transaction_for_user: {e}")
+        return []
+
+async def get_all_transaction_for_account(acc_id: int) -> List[Transaction]:
+    """
+    Returns the Transactions for an account.
+    """
+    query = "SELECT * FROM transactions WHERE acc_id = $1"
+
+    try:
+        async with async_db_connection() as conn:
+            rows = await conn.fetch(query, acc_id)
+        return [Transaction(**dict(row)) for row in rows]
+    except Exception as e:
+        logger.error(f"[Repository] Error in async get_all_transaction_for_account: {e}")
+        return []
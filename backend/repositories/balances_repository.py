@@ -0,0 +1,323 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from psycopg2.extras import RealDictCursor
+
+from db.database import get_connection
+from models.balance import BalanceGranularity
+from utils.logger import logger
+
+CHECKPOINT_TABLE = "account_balance_checkpoints"
+
+# net_total is the sum of the account's transactions before checkpoint_date (the first
+# of a month). The opening balance in accounts.balance is added at read time, so
+# editing it never invalidates checkpoints.
+CHECKPOINT_TABLE_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+        acc_id INTEGER NOT NULL,
+        checkpoint_date DATE NOT NULL,
+        net_total NUMERIC NOT NULL DEFAULT 0,
+        PRIMARY KEY (acc_id, checkpoint_date)
+    );
+"""
+
+# Latest checkpoint at or before %(at)s, and the account balance at %(at)s derived from
+# it: opening balance + checkpoint + the transactions between the checkpoint and %(at)s.
+# Without a checkpoint the delta simply covers the whole history.
+_BALANCE_AT_CTES = f"""
+    cp AS (
+        SELECT checkpoint_date, net_total
+        FROM {CHECKPOINT_TABLE}
+        WHERE acc_id = %(acc_id)s AND checkpoint_date <= %(at)s
+        ORDER BY checkpoint_date DESC
+        LIMIT 1
+    ),
+    base AS (
+        SELECT a.acc_id,
+               (SELECT checkpoint_date FROM cp) AS checkpoint_date,
+               a.balance
+                 + COALESCE((SELECT net_total FROM cp), 0)
+                 + COALESCE((
+                     SELECT SUM(t.amount) FROM transactions t
+                     WHERE t.acc_id = a.acc_id
+                       AND t.transaction_time >= COALESCE((SELECT checkpoint_date FROM cp), '-infinity'::date)
+                       AND t.transaction_time < %(at)s
+                 ), 0) AS balance
+        FROM accounts a
+        WHERE a.acc_id = %(acc_id)s
+    )
+"""
+
+def checkpoint_adjust_sql(source: str) -> str:
+    """
+    UPDATE statement that shifts existing checkpoints by a set of transaction rows.
+
+    `source` must name a relation (typically a CTE) with acc_id, transaction_time,
+    amount and delta, where delta is 1 for rows being added and -1 for rows being
+    removed. Every checkpoint dated after a row moves by that row's amount, so a
+    backdated transaction touches at most one checkpoint per month since it.
+    Checkpoints whose net change is zero, such as for an update that keeps amount,
+    time and account, are not rewritten.
+    The affected checkpoints are locked in (acc_id, checkpoint_date) order first, so
+    concurrent writes to the same account queue up instead of deadlocking.
+    """
+    return f"""
+        UPDATE {CHECKPOINT_TABLE} AS cp
+        SET net_total = cp.net_total + d.net
+        FROM (
+            SELECT c.acc_id, c.checkpoint_date, SUM({source}.amount * {source}.delta) AS net
+            FROM (
+                SELECT l.acc_id, l.checkpoint_date
+                FROM {CHECKPOINT_TABLE} l
+                WHERE EXISTS (
+                    SELECT 1 FROM {source}
+                    WHERE {source}.acc_id = l.acc_id AND {source}.transaction_time < l.checkpoint_date
+                )
+                ORDER BY l.acc_id, l.checkpoint_date
+                FOR UPDATE
+            ) AS c
+            JOIN {source} ON {source}.acc_id = c.acc_id AND {source}.transaction_time < c.checkpoint_date
+            GROUP BY 1, 2
+            HAVING SUM({source}.amount * {source}.delta) <> 0
+        ) AS d
+        WHERE cp.acc_id = d.acc_id AND cp.checkpoint_date = d.checkpoint_date
+    """
+
+def ensure_checkpoint_table() -> Optional[bool]:
+    """
+    Creates the checkpoint table if it does not exist.
+    Returns True if the table was missing (and so still needs a backfill), False if it
+    already existed, or None on failure.
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT to_regclass(%s) IS NULL", (CHECKPOINT_TABLE,))
+        created = cursor.fetchone()[0]
+        cursor.execute(CHECKPOINT_TABLE_DDL)
+        conn.commit()
+        if created:
+            logger.info(f"Created {CHECKPOINT_TABLE}")
+        return created
+    except Exception as e:
+        logger.error(f"[Repository] Error in ensure_checkpoint_table: {e}")
+        if conn:
+            conn.rollback()
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+def rebuild_balance_checkpoints(acc_id: Optional[int] = None) -> Optional[int]:
+    """
+    Recomputes monthly balance checkpoints from transactions, for one account or all,
+    creating the table first if needed. Each account gets a checkpoint on the first of
+    every month from the month after its first transaction up to the current month.
+    Concurrent transaction writes wait on the table lock and adjust the new rows after.
+    Returns the number of checkpoints written, or None on failure.
+    """
+    account_filter = " WHERE acc_id = %(acc_id)s" if acc_id is not None else ""
+    query = f"""
+        WITH bounds AS (
+            SELECT acc_id, date_trunc('month', MIN(transaction_time)) AS first_month
+            FROM transactions{account_filter}
+            GROUP BY acc_id
+        ),
+        points AS (
+            SELECT b.acc_id, gs::date AS checkpoint_date
+            FROM bounds b,
+                 generate_series(b.first_month + interval '1 month', date_trunc('month', now()), interval '1 month') AS gs
+        ),
+        monthly AS (
+            SELECT acc_id, date_trunc('month', transaction_time)::date AS month, SUM(amount) AS net
+            FROM transactions{account_filter}
+            GROUP BY 1, 2
+        )
+        INSERT INTO {CHECKPOINT_TABLE} (acc_id, checkpoint_date, net_total)
+        SELECT p.acc_id, p.checkpoint_date,
+               SUM(COALESCE(m.net, 0)) OVER (PARTITION BY p.acc_id ORDER BY p.checkpoint_date)
+        FROM points p
+        LEFT JOIN monthly m ON m.acc_id = p.acc_id AND m.month = (p.checkpoint_date - interval '1 month')::date
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(CHECKPOINT_TABLE_DDL)
+        cursor.execute(f"LOCK TABLE {CHECKPOINT_TABLE} IN EXCLUSIVE MODE")
+        cursor.execute(f"DELETE FROM {CHECKPOINT_TABLE}{account_filter}", {"acc_id": acc_id})
+        cursor.execute(query, {"acc_id": acc_id})
+        row_count = cursor.rowcount
+        conn.commit()
+        logger.info(f"Rebuilt {row_count} balance checkpoints" + (f" for account {acc_id}" if acc_id is not None else ""))
+        return row_count
+    except Exception as e:
+        logger.error(f"[Repository] Error in rebuild_balance_checkpoints: {e}")
+        if conn:
+            conn.rollback()
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+# Checkpoints each account is missing between its latest checkpoint (or its first
+# transaction's month) and the current month, with the total each one starts from
+_MISSING_CHECKPOINTS_CTES = f"""
+    latest AS (
+        SELECT DISTINCT ON (acc_id) acc_id, checkpoint_date AS from_date, net_total
+        FROM {CHECKPOINT_TABLE}
+        ORDER BY acc_id, checkpoint_date DESC
+    ),
+    unstarted AS (
+        SELECT a.acc_id, date_trunc('month', f.first_time)::date AS from_date, 0 AS net_total
+        FROM accounts a
+        CROSS JOIN LATERAL (SELECT MIN(t.transaction_time) AS first_time FROM transactions t WHERE t.acc_id = a.acc_id) AS f
+        WHERE f.first_time IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM {CHECKPOINT_TABLE} c WHERE c.acc_id = a.acc_id)
+    ),
+    missing AS (
+        SELECT s.acc_id, s.from_date, s.net_total, gs::date AS checkpoint_date
+        FROM (SELECT * FROM latest UNION ALL SELECT * FROM unstarted) AS s,
+             generate_series(s.from_date + interval '1 month', date_trunc('month', now()), interval '1 month') AS gs
+    )
+"""
+
+def advance_balance_checkpoints() -> Optional[int]:
+    """
+    Appends the checkpoints each account is missing up to the current month, carrying
+    its latest checkpoint forward by the transactions since it, so balance reads stay
+    bounded without a full rebuild. Cheap when every account is current: nothing is
+    locked or written. Otherwise the table is locked like a rebuild, so no concurrent
+    write can land between the new checkpoints and the totals they are computed from.
+    Returns the number of checkpoints added, or None on failure.
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"WITH {_MISSING_CHECKPOINTS_CTES} SELECT EXISTS (SELECT 1 FROM missing)")
+        if not cursor.fetchone()[0]:
+            conn.rollback()
+            return 0
+        cursor.execute(f"LOCK TABLE {CHECKPOINT_TABLE} IN EXCLUSIVE MODE")
+        cursor.execute(f"""
+            WITH {_MISSING_CHECKPOINTS_CTES}
+            INSERT INTO {CHECKPOINT_TABLE} (acc_id, checkpoint_date, net_total)
+            SELECT m.acc_id, m.checkpoint_date,
+                   m.net_total + COALESCE((
+                       SELECT SUM(t.amount) FROM transactions t
+                       WHERE t.acc_id = m.acc_id
+                         AND t.transaction_time >= m.from_date AND t.transaction_time < m.checkpoint_date
+                   ), 0)
+            FROM missing m
+            ORDER BY m.acc_id, m.checkpoint_date
+            ON CONFLICT (acc_id, checkpoint_date) DO NOTHING
+        """)
+        row_count = cursor.rowcount
+        conn.commit()
+        logger.info(f"Added {row_count} balance checkpoints")
+        return row_count
+    except Exception as e:
+        logger.error(f"[Repository] Error in advance_balance_checkpoints: {e}")
+        if conn:
+            conn.rollback()
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+def get_account_balance(acc_id: int, at: datetime) -> Optional[Dict]:
+    """
+    Returns the balance of an account just before `at` (transactions at or after it are
+    excluded) together with the checkpoint it was derived from.
+    Returns None if the account does not exist or on failure.
+    """
+    query = f"WITH {_BALANCE_AT_CTES} SELECT acc_id, checkpoint_date, balance FROM base"
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection(RealDictCursor)
+        cursor = conn.cursor()
+        cursor.execute(query, {"acc_id": acc_id, "at": at})
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    except Exception as e:
+        logger.error(f"[Repository] Error in get_account_balance: {e}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+def get_balance_series(
+    acc_id: int,
+    start_date: date,
+    end_date: date,
+    granularity: BalanceGranularity,
+) -> Optional[Dict]:
+    """
+    Returns the account's opening balance at start_date and its running balance over
+    [start_date, end_date] (inclusive): one point per transaction, or one end-of-day
+    point per day with transactions. The opening balance comes from the nearest
+    checkpoint, so only the requested range and one partial month are scanned.
+    Returns None if the account does not exist or on failure.
+    """
+    if granularity == BalanceGranularity.DAY:
+        points_query = f"""
+            WITH {_BALANCE_AT_CTES},
+            daily AS (
+                SELECT t.transaction_time::date AS day, SUM(t.amount) AS amount, COUNT(*) AS transaction_count
+                FROM transactions t
+                WHERE t.acc_id = %(acc_id)s AND t.transaction_time >= %(at)s AND t.transaction_time < %(end)s
+                GROUP BY 1
+            )
+            SELECT daily.day AS point_time, NULL::integer AS transaction_id, daily.amount, daily.transaction_count,
+                   base.balance + SUM(daily.amount) OVER (ORDER BY daily.day) AS balance
+            FROM daily CROSS JOIN base
+            ORDER BY daily.day
+        """
+    else:
+        points_query = f"""
+            WITH {_BALANCE_AT_CTES}
+            SELECT t.transaction_time AS point_time, t.transaction_id, t.amount, 1 AS transaction_count,
+                   base.balance + SUM(t.amount) OVER (ORDER BY t.transaction_time, t.transaction_id) AS balance
+            FROM transactions t CROSS JOIN base
+            WHERE t.acc_id = %(acc_id)s AND t.transaction_time >= %(at)s AND t.transaction_time < %(end)s
+            ORDER BY t.transaction_time, t.transaction_id
+        """
+    params = {"acc_id": acc_id, "at": start_date, "end": end_date + timedelta(days=1)}
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection(RealDictCursor)
+        cursor = conn.cursor()
+        cursor.execute(f"WITH {_BALANCE_AT_CTES} SELECT acc_id, checkpoint_date, balance FROM base", params)
+        opening = cursor.fetchone()
+        if not opening:
+            return None
+        cursor.execute(points_query, params)
+        return {**dict(opening), "points": [dict(row) for row in cursor.fetchall()]}
+    except Exception as e:
+        logger.error(f"[Repository] Error in get_balance_series: {e}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
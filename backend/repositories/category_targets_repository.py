@@ -1,9 +1,31 @@
-from typing import List, Optional
+from datetime import date, timedelta
+from typing import Dict, List, Optional
 from psycopg2.extras import RealDictCursor
 
 from db.database import get_connection
 from utils.logger import logger
 from models.category_target import CategoryTarget
+from repositories.rollups_repository import ROLLUP_TABLE, covers_whole_months
+
+# Per-row spending (debits as positive amounts) and income with each row's category,
+# for the budget period. Whole-month periods read the monthly rollups.
+_BUDGET_PERIOD_FROM_TRANSACTIONS = """
+    SELECT tg.category_id,
+           CASE WHEN t.amount < 0 THEN -t.amount ELSE 0 END AS spending,
+           CASE WHEN t.amount > 0 THEN t.amount ELSE 0 END AS income
+    FROM transactions t
+    LEFT JOIN tags tg ON tg.tag_id = t.tag_id
+    WHERE t.user_id = %(user_id)s
+      AND t.transaction_time >= %(start)s AND t.transaction_time < %(end)s
+"""
+
+_BUDGET_PERIOD_FROM_ROLLUPS = f"""
+    SELECT tg.category_id, r.spending, r.income
+    FROM {ROLLUP_TABLE} r
+    LEFT JOIN tags tg ON tg.tag_id = r.tag_id
+    WHERE r.user_id = %(user_id)s
+      AND r.month >= %(start)s AND r.month < %(end)s
+"""
 
 def insert_category_target(percentage: float, category_id: int, user_id: int) -> Optional[int]:
     """
@@ -141,3 +163,71 @@ def get_target_by_category_user(category_id: int, user_id: int) -> List[Category
             cursor.close()
         if conn:
             conn.close()
+
+
+def get_budget_evaluation(user_id: int, start_date: date, end_date: date) -> Optional[List[Dict]]:
+    """
+    Compares each category's effective target with actual spending in one query.
+
+    The effective target is the latest one whose start_date is on or before end_date
+    (targets without a start_date always apply). Spending is the sum of debits whose
+    tag belongs to the category; both percentages are shares of the period's income.
+    Categories with a target or with spending are returned, ordered by name.
+    Periods made of whole months, the default, are summed from the monthly rollups;
+    other periods scan the transactions in range.
+    Returns None on failure.
+    """
+    period_source = _BUDGET_PERIOD_FROM_ROLLUPS if covers_whole_months(start_date, end_date) else _BUDGET_PERIOD_FROM_TRANSACTIONS
+    query = f"""
+        WITH targets AS (
+            SELECT DISTINCT ON (category_id) category_id, percentage, start_date
+            FROM category_targets
+            WHERE user_id = %(user_id)s AND (start_date IS NULL OR start_date < %(end)s)
+            ORDER BY category_id, start_date DESC NULLS LAST
+        ),
+        period AS ({period_source}),
+        spend AS (
+            SELECT category_id, SUM(spending) AS spending
+            FROM period
+            WHERE category_id IS NOT NULL
+            GROUP BY category_id
+            HAVING SUM(spending) > 0
+        ),
+        income AS (
+            SELECT COALESCE(SUM(income), 0) AS income FROM period
+        )
+        SELECT c.category_id,
+               c.category_name,
+               targets.percentage AS target_percentage,
+               targets.start_date AS target_start_date,
+               COALESCE(spend.spending, 0) AS spending,
+               income.income,
+               ROUND(100 * COALESCE(spend.spending, 0) / NULLIF(income.income, 0), 2) AS actual_percentage,
+               ROUND(100 * COALESCE(spend.spending, 0) / NULLIF(income.income, 0) - targets.percentage::numeric, 2) AS variance
+        FROM targets
+        FULL JOIN spend USING (category_id)
+        JOIN categories c ON c.category_id = COALESCE(targets.category_id, spend.category_id)
+        CROSS JOIN income
+        ORDER BY c.category_name
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection(RealDictCursor)
+        cursor = conn.cursor()
+        cursor.execute(query, {
+            "user_id": user_id,
+            "start": start_date,
+            # end_date is inclusive of the whole day
+            "end": end_date + timedelta(days=1),
+        })
+        return [dict(row) for row in cursor.fetchall()]
+    except Exception as e:
+        logger.error(f"[Repository] get_budget_evaluation failed: {e}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
@@ -0,0 +1,91 @@
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Optional, Dict
+
+from psycopg2.extras import RealDictCursor
+
+from db.database import get_connection
+from repositories.rollups_repository import ROLLUP_TABLE
+from repositories.balances_repository import CHECKPOINT_TABLE
+from utils.logger import logger
+
+def get_dashboard_summary(user_id: int, month_start: date, month_end: date, recent_limit: int) -> Optional[Dict]:
+    """
+    Computes the dashboard figures for a user in a single query.
+    An account's balance is its stored balance plus the sum of its transactions, read as
+    its latest balance checkpoint plus the transactions since.
+    Spending and income for [month_start, month_end) come from the monthly rollups, so
+    both bounds must be the first day of a calendar month. The transaction count is
+    summed from the rollups as well, so no part of the load scans the user's history.
+    Returns None on failure.
+    """
+    query = f"""
+        WITH acc AS (
+            SELECT a.acc_id, a.acc_name, b.bank_name, a.currency,
+                   a.balance + COALESCE(cp.net_total, 0) + COALESCE(recent.net, 0) AS balance
+            FROM accounts a
+            JOIN banks b ON b.bank_id = a.bank_id
+            LEFT JOIN LATERAL (
+                SELECT checkpoint_date, net_total FROM {CHECKPOINT_TABLE}
+                WHERE acc_id = a.acc_id AND checkpoint_date <= CURRENT_DATE
+                ORDER BY checkpoint_date DESC
+                LIMIT 1
+            ) cp ON true
+            LEFT JOIN LATERAL (
+                SELECT SUM(t.amount) AS net FROM transactions t
+                WHERE t.acc_id = a.acc_id
+                  AND t.transaction_time >= COALESCE(cp.checkpoint_date, '-infinity'::date)
+            ) recent ON true
+            WHERE a.user_id = %(user_id)s AND a.is_active = true
+        ),
+        month AS (
+            SELECT COALESCE(SUM(spending), 0) AS spending,
+                   COALESCE(SUM(income), 0) AS income
+            FROM {ROLLUP_TABLE}
+            WHERE user_id = %(user_id)s AND month >= %(month_start)s AND month < %(month_end)s
+        ),
+        recent AS (
+            SELECT * FROM transactions
+            WHERE user_id = %(user_id)s
+            ORDER BY transaction_time DESC, transaction_id DESC
+            LIMIT %(recent_limit)s
+        )
+        SELECT
+            (SELECT COUNT(*) FROM acc) AS account_count,
+            (SELECT COALESCE(SUM(transaction_count), 0) FROM {ROLLUP_TABLE} WHERE user_id = %(user_id)s) AS transaction_count,
+            (SELECT COALESCE(json_agg(acc ORDER BY acc.acc_id), '[]')::text FROM acc) AS accounts,
+            month.spending AS monthly_spending,
+            month.income AS monthly_income,
+            (SELECT COALESCE(json_agg(recent ORDER BY recent.transaction_time DESC, recent.transaction_id DESC), '[]')::text
+             FROM recent) AS recent_transactions
+        FROM month
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection(RealDictCursor)
+        cursor = conn.cursor()
+        cursor.execute(query, {
+            "user_id": user_id,
+            "month_start": month_start,
+            "month_end": month_end,
+            "recent_limit": recent_limit,
+        })
+        row = cursor.fetchone()
+        if not row:
+            return None
+        summary = dict(row)
+        # Parse the aggregated JSON ourselves so amounts stay exact Decimals
+        summary["accounts"] = json.loads(summary["accounts"], parse_float=Decimal)
+        summary["recent_transactions"] = json.loads(summary["recent_transactions"], parse_float=Decimal)
+        return summary
+    except Exception as e:
+        logger.error(f"[Repository] Error in get_dashboard_summary: {e}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
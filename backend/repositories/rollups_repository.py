@@ -0,0 +1,160 @@
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+
+from db.database import get_connection
+from utils.logger import logger
+
+ROLLUP_TABLE = "transaction_monthly_rollups"
+
+# The unique key uses COALESCE(tag_id, 0) so there is a single row per untagged
+# (user, account, month) on any Postgres version; tag IDs start at 1.
+# revision and updated_at change on every upsert and let per-user caches tell when a
+# user's transactions were written, whichever process wrote them
+ROLLUP_TABLE_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+        user_id INTEGER NOT NULL,
+        acc_id INTEGER NOT NULL,
+        tag_id INTEGER,
+        month DATE NOT NULL,
+        spending NUMERIC NOT NULL DEFAULT 0,
+        income NUMERIC NOT NULL DEFAULT 0,
+        transaction_count INTEGER NOT NULL DEFAULT 0
+    );
+    ALTER TABLE {ROLLUP_TABLE}
+        ADD COLUMN IF NOT EXISTS revision BIGINT NOT NULL DEFAULT 1,
+        ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+    CREATE UNIQUE INDEX IF NOT EXISTS {ROLLUP_TABLE}_key_idx ON {ROLLUP_TABLE} (user_id, acc_id, (COALESCE(tag_id, 0)), month);
+    CREATE INDEX IF NOT EXISTS idx_{ROLLUP_TABLE}_user_month ON {ROLLUP_TABLE} (user_id, month);
+"""
+
+def covers_whole_months(start_date: Optional[date], end_date: Optional[date]) -> bool:
+    """True if the range starts on the first of a month and ends on the last day of one."""
+    if start_date is not None and start_date.day != 1:
+        return False
+    if end_date is not None and (end_date + timedelta(days=1)).day != 1:
+        return False
+    return True
+
+def rollup_upsert_sql(source: str) -> str:
+    """
+    INSERT ... ON CONFLICT statement that adds a set of transaction rows to the rollups.
+
+    `source` must yield user_id, acc_id, tag_id, transaction_time, amount and delta,
+    where delta is 1 for rows being added and -1 for rows being removed. It is meant
+    to run as a data-modifying CTE next to the write it accounts for, so the rollups
+    change in the same statement, and therefore the same transaction, as the rows.
+    Rows are grouped by key first because ON CONFLICT may touch each row only once,
+    and upserted in key order so concurrent writes lock shared rows in the same order.
+    """
+    return f"""
+        INSERT INTO {ROLLUP_TABLE} AS r (user_id, acc_id, tag_id, month, spending, income, transaction_count)
+        SELECT user_id, acc_id, tag_id, date_trunc('month', transaction_time)::date,
+               COALESCE(SUM(-amount * delta) FILTER (WHERE amount < 0), 0),
+               COALESCE(SUM(amount * delta) FILTER (WHERE amount > 0), 0),
+               SUM(delta)
+        FROM {source}
+        GROUP BY 1, 2, 3, 4
+        ORDER BY 1, 2, 3, 4
+        ON CONFLICT (user_id, acc_id, (COALESCE(tag_id, 0)), month) DO UPDATE SET
+            spending = r.spending + EXCLUDED.spending,
+            income = r.income + EXCLUDED.income,
+            transaction_count = r.transaction_count + EXCLUDED.transaction_count,
+            revision = r.revision + 1,
+            updated_at = now()
+    """
+
+def get_user_rollup_version(user_id: int) -> Optional[Tuple[int, int, Optional[datetime]]]:
+    """
+    Returns (row count, summed revision, latest updated_at) of a user's rollup rows,
+    which changes whenever any of the user's transactions is written, or None on failure.
+    Rows are only removed by a rebuild, which also moves updated_at forward.
+    """
+    query = f"""
+        SELECT COUNT(*), COALESCE(SUM(revision), 0), MAX(updated_at)
+        FROM {ROLLUP_TABLE}
+        WHERE user_id = %s
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, (user_id,))
+        return tuple(cursor.fetchone())
+    except Exception as e:
+        logger.error(f"[Repository] Error in get_user_rollup_version: {e}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+def ensure_rollup_table() -> Optional[bool]:
+    """
+    Creates the rollup table and its indexes if they do not exist.
+    Returns True if the table was missing (and so still needs a backfill), False if it
+    already existed, or None on failure.
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT to_regclass(%s) IS NULL", (ROLLUP_TABLE,))
+        created = cursor.fetchone()[0]
+        cursor.execute(ROLLUP_TABLE_DDL)
+        conn.commit()
+        if created:
+            logger.info(f"Created {ROLLUP_TABLE}")
+        return created
+    except Exception as e:
+        logger.error(f"[Repository] Error in ensure_rollup_table: {e}")
+        if conn:
+            conn.rollback()
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+def rebuild_monthly_rollups(user_id: Optional[int] = None) -> Optional[int]:
+    """
+    Recomputes the monthly rollups from transactions, for one user or for everyone,
+    creating the table first if needed. Concurrent transaction writes wait on the
+    table lock and apply their own delta after the rebuild commits.
+    Returns the number of rollup rows written, or None on failure.
+    """
+    source = "(SELECT t.*, 1 AS delta FROM transactions t{}) AS changed".format(
+        " WHERE t.user_id = %(user_id)s" if user_id is not None else ""
+    )
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(ROLLUP_TABLE_DDL)
+        cursor.execute(f"LOCK TABLE {ROLLUP_TABLE} IN EXCLUSIVE MODE")
+        if user_id is None:
+            cursor.execute(f"DELETE FROM {ROLLUP_TABLE}")
+        else:
+            cursor.execute(f"DELETE FROM {ROLLUP_TABLE} WHERE user_id = %(user_id)s", {"user_id": user_id})
+        cursor.execute(rollup_upsert_sql(source), {"user_id": user_id})
+        row_count = cursor.rowcount
+        conn.commit()
+        logger.info(f"Rebuilt {row_count} monthly rollup rows" + (f" for user {user_id}" if user_id is not None else ""))
+        return row_count
+    except Exception as e:
+        logger.error(f"[Repository] Error in rebuild_monthly_rollups: {e}")
+        if conn:
+            conn.rollback()
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
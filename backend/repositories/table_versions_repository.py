@@ -0,0 +1,102 @@
+from typing import Dict, Iterable, Optional
+
+from db.database import get_connection
+from utils.logger import logger
+
+VERSIONS_TABLE = "table_versions"
+
+# Reference tables whose writes invalidate ETags and the service caches keyed on them
+# (accounts for the names in spending reports). They change rarely; per-user data
+# (transactions) is versioned through the rollups instead, so ingest does not
+# serialise on a shared row here.
+VERSIONED_TABLES = ("accounts", "banks", "bank_configs", "categories", "tags", "tagging_rules")
+
+# Tables that carried a version trigger in earlier releases
+UNVERSIONED_TABLES = ("transactions", "category_targets")
+
+# A statement-level trigger bumps the table's row on every write, whichever process or
+# worker makes it (API, cli.py ingest, rebuilds, manual SQL). The row lock is taken when
+# the statement ends and released at commit, so readers only see a version once the data
+# it stands for is visible.
+VERSIONS_TABLE_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (
+        table_name TEXT PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0
+    );
+    CREATE OR REPLACE FUNCTION bump_{VERSIONS_TABLE}() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO {VERSIONS_TABLE} (table_name, version) VALUES (TG_TABLE_NAME, 1)
+        ON CONFLICT (table_name) DO UPDATE SET version = {VERSIONS_TABLE}.version + 1;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+""" + "".join(
+    f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = '{table}_bump_version' AND tgrelid = '{table}'::regclass) THEN
+            CREATE TRIGGER {table}_bump_version
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_{VERSIONS_TABLE}();
+        END IF;
+    END
+    $$;
+    """
+    for table in VERSIONED_TABLES
+) + "".join(
+    f"""
+    DROP TRIGGER IF EXISTS {table}_bump_version ON {table};
+    """
+    for table in UNVERSIONED_TABLES
+)
+
+def ensure_table_versions() -> bool:
+    """
+    Creates the version table, its trigger function and the triggers on every
+    versioned table, dropping triggers left on tables no longer versioned.
+    Safe to run repeatedly. Returns False on failure.
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(VERSIONS_TABLE_DDL)
+        conn.commit()
+        return True
+    except Exception as e:
+        logger.error(f"[Repository] Error in ensure_table_versions: {e}")
+        if conn:
+            conn.rollback()
+        return False
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+def get_table_versions(tables: Iterable[str]) -> Optional[Dict[str, int]]:
+    """
+    Returns the committed write version of each table (0 if never written since the
+    triggers were installed), or None on failure.
+    """
+    tables = list(tables)
+    query = f"SELECT table_name, version FROM {VERSIONS_TABLE} WHERE table_name = ANY(%s)"
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, (tables,))
+        versions = dict(cursor.fetchall())
+        return {table: versions.get(table, 0) for table in tables}
+    except Exception as e:
+        logger.error(f"[Repository] Error in get_table_versions: {e}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
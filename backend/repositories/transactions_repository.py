@@ -1,10 +1,36 @@
+import io
+
 from db.database import get_connection
 from utils.logger import logger
 from psycopg2.extras import RealDictCursor, execute_values
 import psycopg2
 
+from datetime import datetime, timedelta
 from typing import Optional, List, Tuple
-from models.transaction import Transaction
+from models.transaction import Transaction, TransactionSearchFilters
+from repositories.rollups_repository import rollup_upsert_sql
+from repositories.balances_repository import checkpoint_adjust_sql
+
+# Columns the derived-table maintenance needs back from each written row
+ROLLUP_RETURNING = "user_id, acc_id, tag_id, transaction_time, amount"
+
+# Monthly rollups and balance checkpoints are maintained by CTEs that run alongside each
+# write, so they change in the same statement as the rows. `changed` lists the written
+# rows with delta 1 (added) or -1 (removed); for updates the old row is removed and the
+# new one added.
+_INSERTED_CHANGES = "changed AS (SELECT *, 1 AS delta FROM inserted)"
+_UPDATED_CHANGES = """changed AS (
+    SELECT old.*, -1 AS delta FROM old JOIN updated USING (transaction_id)
+    UNION ALL
+    SELECT updated.*, 1 AS delta FROM updated
+)"""
+_MAINTAIN_ROLLUPS = f"""rollup AS (
+    {rollup_upsert_sql("changed")}
+)"""
+# Writes that never touch amount, time or account (retags) use _MAINTAIN_ROLLUPS alone
+_MAINTAIN_DERIVED = f"""{_MAINTAIN_ROLLUPS}, checkpoints AS (
+    {checkpoint_adjust_sql("changed")}
+)"""
 
 def get_transaction_by_id(transaction_id: int) -> Optional[Transaction]:
     """
@@ -75,14 +101,102 @@ def get_all_transaction_for_account(acc_id: int) -> List[Transaction]:
         if conn:
             conn.close()
 
+def _build_search_filters(filters: TransactionSearchFilters) -> Tuple[List[str], List]:
+    """
+    Translates search filters into SQL WHERE clauses and their parameters.
+    """
+    clauses = ["user_id = %s"]
+    params = [filters.user_id]
+
+    if filters.acc_id is not None:
+        clauses.append("acc_id = %s")
+        params.append(filters.acc_id)
+    if filters.tag_id is not None:
+        clauses.append("tag_id = %s")
+        params.append(filters.tag_id)
+    if filters.type is not None:
+        clauses.append("type = %s")
+        params.append(filters.type.value)
+    if filters.min_amount is not None:
+        clauses.append("ABS(amount) >= %s")
+        params.append(filters.min_amount)
+    if filters.max_amount is not None:
+        clauses.append("ABS(amount) <= %s")
+        params.append(filters.max_amount)
+    if filters.start_date is not None:
+        clauses.append("transaction_time >= %s")
+        params.append(filters.start_date)
+    if filters.end_date is not None:
+        # end_date is inclusive of the whole day
+        clauses.append("transaction_time < %s")
+        params.append(filters.end_date + timedelta(days=1))
+    if filters.query:
+        escaped = filters.query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        clauses.append("description ILIKE %s")
+        params.append(f"%{escaped}%")
+
+    return clauses, params
+
+def search_transactions(
+    filters: TransactionSearchFilters,
+    limit: int,
+    after: Optional[Tuple[datetime, int]] = None,
+    include_total: bool = False,
+) -> Tuple[List[Transaction], Optional[int]]:
+    """
+    Returns one page of a user's transactions, newest first, and optionally the total match count.
+    Uses keyset pagination on (transaction_time, transaction_id): `after` is the last row of the previous page.
+    """
+    clauses, params = _build_search_filters(filters)
+    page_clauses = list(clauses)
+    page_params = list(params)
+    if after is not None:
+        page_clauses.append("(transaction_time, transaction_id) < (%s, %s)")
+        page_params.extend(after)
+
+    query = f"""
+        SELECT * FROM transactions
+        WHERE {' AND '.join(page_clauses)}
+        ORDER BY transaction_time DESC, transaction_id DESC
+        LIMIT %s
+    """
+    count_query = f"SELECT COUNT(*) AS total FROM transactions WHERE {' AND '.join(clauses)}"
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection(RealDictCursor)
+        cursor = conn.cursor()
+        cursor.execute(query, (*page_params, limit))
+        results = cursor.fetchall()
+
+        total = None
+        if include_total:
+            cursor.execute(count_query, tuple(params))
+            total = cursor.fetchone()["total"]
+
+        return [Transaction(**row) for row in results], total
+    except Exception as e:
+        logger.error(f"[Repository] Error in search_transactions: {e}")
+        return [], None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
 def insert_transaction(transaction: Transaction) -> Optional[int]:
     """
     Inserts a new transaction and returns the generated transaction_id.
+    The monthly rollups and balance checkpoints are updated in the same statement.
     """
-    query = """
-        INSERT INTO transactions(transaction_time, description, old_description, amount, reference_id, type, tag_id, acc_id, user_id) 
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING transaction_id
+    query = f"""
+        WITH inserted AS (
+            INSERT INTO transactions(transaction_time, description, old_description, amount, reference_id, type, tag_id, acc_id, user_id) 
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING transaction_id, {ROLLUP_RETURNING}
+        ), {_INSERTED_CHANGES}, {_MAINTAIN_DERIVED}
+        SELECT transaction_id FROM inserted
     """
     conn = None
     cursor = None
@@ -118,16 +232,26 @@ def insert_transaction(transaction: Transaction) -> Optional[int]:
 def update_transaction(transaction_id: int, transaction: Transaction) -> bool:
     """
     Updates an existing transaction. Returns True if successful, False otherwise.
+    The old row is taken out of the monthly rollups and balance checkpoints and the new one
+    added, in the same statement.
     """
-    query = """
-        UPDATE transactions
-        SET
-            description = %s,
-            tag_id = %s,
-            acc_id = %s,
-            user_id = %s,
-            modified_at = CURRENT_TIMESTAMP
-        WHERE transaction_id = %s
+    query = f"""
+        WITH old AS (
+            SELECT transaction_id, {ROLLUP_RETURNING} FROM transactions
+            WHERE transaction_id = %(transaction_id)s
+            FOR UPDATE
+        ), updated AS (
+            UPDATE transactions
+            SET
+                description = %(description)s,
+                tag_id = %(tag_id)s,
+                acc_id = %(acc_id)s,
+                user_id = %(user_id)s,
+                modified_at = CURRENT_TIMESTAMP
+            WHERE transaction_id = %(transaction_id)s
+            RETURNING transaction_id, {ROLLUP_RETURNING}
+        ), {_UPDATED_CHANGES}, {_MAINTAIN_DERIVED}
+        SELECT transaction_id FROM updated
     """
     conn = None
     cursor = None
@@ -135,13 +259,13 @@ def update_transaction(transaction_id: int, transaction: Transaction) -> bool:
     try:
         conn = get_connection()
         cursor = conn.cursor()
-        cursor.execute(query, (
-            transaction.description,
-            transaction.tag_id,
-            transaction.acc_id,
-            transaction.user_id,
-            transaction_id
-        ))
+        cursor.execute(query, {
+            "description": transaction.description,
+            "tag_id": transaction.tag_id,
+            "acc_id": transaction.acc_id,
+            "user_id": transaction.user_id,
+            "transaction_id": transaction_id,
+        })
         conn.commit()
         return cursor.rowcount > 0  # True if a row was updated
     except Exception as e:
@@ -159,7 +283,8 @@ def bulk_insert_transactions(transactions: List[Transaction]) -> Tuple[List[int]
     """
     Bulk inserts multiple transactions and returns a tuple of (inserted_ids, errors).
     Uses execute_values for efficient bulk operations with ON CONFLICT support.
-    Skips duplicate transactions based on (reference_id, acc_id) unique constraint.
+    Skips duplicate transactions based on (reference_id, acc_id) unique constraint;
+    inserted_ids only contains the rows that were actually written.
     """
     if not transactions:
         return [], []
@@ -199,25 +324,36 @@ def bulk_insert_transactions(transactions: List[Transaction]) -> Tuple[List[int]
         if not transaction_data:
             return [], errors
         
-        # Execute bulk insert using execute_values which properly supports ON CONFLICT
-        query = """
-            INSERT INTO transactions(transaction_time, description, old_description, amount, reference_id, type, tag_id, acc_id, user_id) 
-            VALUES %s
-            ON CONFLICT ON CONSTRAINT unique_reference_per_account DO NOTHING
+        # RETURNING reports exactly which rows landed; conflicting rows return nothing,
+        # so only rows actually written reach the rollups and checkpoints
+        query = f"""
+            WITH inserted AS (
+                INSERT INTO transactions(transaction_time, description, old_description, amount, reference_id, type, tag_id, acc_id, user_id) 
+                VALUES %s
+                ON CONFLICT ON CONSTRAINT unique_reference_per_account DO NOTHING
+                RETURNING transaction_id, reference_id, {ROLLUP_RETURNING}
+            ), {_INSERTED_CHANGES}, {_MAINTAIN_DERIVED}
+            SELECT transaction_id, reference_id FROM inserted
         """
         
-        execute_values(
+        # One statement for the whole batch: rollup and checkpoint rows are locked in key
+        # order within a statement, which pages of the same batch could not guarantee
+        inserted_rows = execute_values(
             cursor,
             query,
             transaction_data,
-            page_size=1000
+            page_size=len(transaction_data),
+            fetch=True
         )
         
         conn.commit()
-        logger.info(f"Successfully processed {len(transaction_data)} transactions (duplicates automatically skipped)")
-        
-        # Return empty list for inserted_ids
-        inserted_ids = []
+        inserted_ids = [row[0] for row in inserted_rows]
+        skipped = len(transaction_data) - len(inserted_ids)
+        logger.info(f"Bulk inserted {len(inserted_ids)} of {len(transaction_data)} transactions ({skipped} duplicates skipped)")
+        if skipped:
+            inserted_refs = {row[1] for row in inserted_rows}
+            skipped_refs = [row[4] for row in transaction_data if row[4] not in inserted_refs]
+            logger.debug(f"Skipped duplicate reference_ids: {skipped_refs}")
         
     except psycopg2.Error as e:
         logger.error(f"[Repository] Database error in bulk_insert_transactions: {e}")
@@ -236,3 +372,273 @@ def bulk_insert_transactions(transactions: List[Transaction]) -> Tuple[List[int]
             conn.close()
     
     return inserted_ids, errors
+
+TRANSACTION_COPY_COLUMNS = (
+    "transaction_time", "description", "old_description", "amount", "reference_id",
+    "type", "tag_id", "acc_id", "user_id",
+)
+
+def _copy_text_value(value) -> str:
+    """
+    Formats a value for COPY ... FROM STDIN in PostgreSQL text format.
+    """
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+def copy_insert_transactions(transactions: List[Transaction]) -> Tuple[List[int], List[str]]:
+    """
+    Bulk inserts transactions for large backfills and returns a tuple of (inserted_ids, errors).
+    Streams rows with COPY into a temporary staging table, then moves them across with a single
+    INSERT ... SELECT that skips duplicates on the (reference_id, acc_id) unique constraint.
+    """
+    if not transactions:
+        return [], []
+
+    conn = None
+    cursor = None
+    inserted_ids = []
+    errors = []
+
+    buffer = io.StringIO()
+    row_count = 0
+    for i, transaction in enumerate(transactions):
+        if not transaction.user_id or not transaction.acc_id:
+            errors.append(f"Transaction {i}: Missing required user_id or acc_id")
+            continue
+        row = (
+            transaction.transaction_time,
+            transaction.description,
+            transaction.old_description,
+            transaction.amount,
+            transaction.reference_id,
+            transaction.type.value if transaction.type else None,
+            transaction.tag_id,
+            transaction.acc_id,
+            transaction.user_id,
+        )
+        buffer.write("\t".join(_copy_text_value(v) for v in row))
+        buffer.write("\n")
+        row_count += 1
+
+    if not row_count:
+        return [], errors
+    buffer.seek(0)
+
+    columns = ", ".join(TRANSACTION_COPY_COLUMNS)
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        # Staging table inherits the column types of transactions and vanishes at commit
+        cursor.execute(f"""
+            CREATE TEMP TABLE transactions_staging ON COMMIT DROP AS
+            SELECT {columns} FROM transactions WITH NO DATA
+        """)
+        cursor.copy_expert(f"COPY transactions_staging ({columns}) FROM STDIN", buffer)
+        cursor.execute(f"""
+            WITH inserted AS (
+                INSERT INTO transactions ({columns})
+                SELECT {columns} FROM transactions_staging
+                ON CONFLICT ON CONSTRAINT unique_reference_per_account DO NOTHING
+                RETURNING transaction_id, reference_id, {ROLLUP_RETURNING}
+            ), {_INSERTED_CHANGES}, {_MAINTAIN_DERIVED}
+            SELECT transaction_id, reference_id FROM inserted
+        """)
+        inserted_ids = [row[0] for row in cursor.fetchall()]
+
+        conn.commit()
+        logger.info(f"COPY ingested {row_count} transactions: {len(inserted_ids)} inserted, {row_count - len(inserted_ids)} duplicates skipped")
+
+    except psycopg2.Error as e:
+        logger.error(f"[Repository] Database error in copy_insert_transactions: {e}")
+        if conn:
+            conn.rollback()
+        inserted_ids = []
+        errors.append(f"Database error: {str(e)}")
+    except Exception as e:
+        logger.error(f"[Repository] Unexpected error in copy_insert_transactions: {e}")
+        if conn:
+            conn.rollback()
+        inserted_ids = []
+        errors.append(f"Unexpected error: {str(e)}")
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+    return inserted_ids, errors
+
+# First-match-by-rule_id tagging, as the statement processor's KeywordMatcher does it:
+# the lowest rule_id whose keyword occurs anywhere in the description, case-insensitively
+_RETAG_MATCH = """
+    (SELECT r.tag_id FROM rules r
+     WHERE strpos(upper(t.description), r.keyword) > 0
+     ORDER BY r.rule_id
+     LIMIT 1)
+"""
+
+def get_retag_scope(user_id: Optional[int] = None) -> Optional[Tuple[int, int, int]]:
+    """
+    Returns (row_count, min_transaction_id, max_transaction_id) for the transactions a retag
+    would scan, for one user or everyone. Returns None on failure.
+    """
+    query = "SELECT COUNT(*), MIN(transaction_id), MAX(transaction_id) FROM transactions"
+    params = ()
+    if user_id is not None:
+        query += " WHERE user_id = %s"
+        params = (user_id,)
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return tuple(cursor.fetchone())
+    except Exception as e:
+        logger.error(f"[Repository] Error in get_retag_scope: {e}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+def retag_transactions_batch(
+    first_id: int,
+    last_id: int,
+    user_id: Optional[int] = None,
+    clear_unmatched: bool = False,
+    clear_tag_ids: Optional[List[int]] = None,
+) -> Optional[Tuple[int, int]]:
+    """
+    Re-applies the current tagging rules to transactions with IDs in [first_id, last_id]
+    in one statement and commits. Rows whose description matches a rule get that rule's
+    tag; rows matching no rule keep their tag unless clear_unmatched is set or the tag
+    is in clear_tag_ids (tags of deleted or changed rules). Only rows
+    whose tag actually changes are written, and the monthly rollups move with them;
+    balance checkpoints are left alone since a tag never changes a balance.
+    Returns (rows_scanned, rows_updated), or None on failure.
+    """
+    user_filter = " AND t.user_id = %(user_id)s" if user_id is not None else ""
+    query = f"""
+        WITH rules AS (
+            SELECT rule_id, tag_id, upper(btrim(keyword)) AS keyword
+            FROM tagging_rules
+            WHERE btrim(keyword) <> ''
+        ), scanned AS (
+            SELECT t.transaction_id, t.tag_id, {_RETAG_MATCH} AS new_tag_id
+            FROM transactions t
+            WHERE t.transaction_id BETWEEN %(first_id)s AND %(last_id)s{user_filter}
+        ), targets AS (
+            SELECT transaction_id, new_tag_id FROM scanned
+            WHERE (new_tag_id IS NOT NULL AND tag_id IS DISTINCT FROM new_tag_id)
+               OR (new_tag_id IS NULL AND tag_id IS NOT NULL
+                   AND (%(clear_unmatched)s OR tag_id = ANY(%(clear_tag_ids)s::integer[])))
+        ), old AS (
+            SELECT t.transaction_id, t.user_id, t.acc_id, t.tag_id, t.transaction_time, t.amount
+            FROM transactions t
+            JOIN targets ON targets.transaction_id = t.transaction_id
+            FOR UPDATE OF t
+        ), updated AS (
+            UPDATE transactions t
+            SET tag_id = targets.new_tag_id, modified_at = CURRENT_TIMESTAMP
+            FROM targets
+            WHERE t.transaction_id = targets.transaction_id
+            RETURNING t.transaction_id, t.user_id, t.acc_id, t.tag_id, t.transaction_time, t.amount
+        ), {_UPDATED_CHANGES}, {_MAINTAIN_ROLLUPS}
+        SELECT (SELECT COUNT(*) FROM scanned), (SELECT COUNT(*) FROM updated)
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, {
+            "first_id": first_id,
+            "last_id": last_id,
+            "user_id": user_id,
+            "clear_unmatched": clear_unmatched,
+            "clear_tag_ids": list(clear_tag_ids or []),
+        })
+        scanned, updated = cursor.fetchone()
+        conn.commit()
+        return scanned, updated
+    except Exception as e:
+        logger.error(f"[Repository] Error in retag_transactions_batch: {e}")
+        if conn:
+            conn.rollback()
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+def get_description_counts(user_id: int) -> Optional[List[Tuple[str, int]]]:
+    """
+    Returns (description, transaction_count) for every distinct description of a user's
+    transactions. Repeated descriptions come back once, so callers matching text against
+    rules do the work once per description. Returns None on failure.
+    """
+    query = """
+        SELECT description, COUNT(*)
+        FROM transactions
+        WHERE user_id = %s AND description IS NOT NULL
+        GROUP BY description
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, (user_id,))
+        return cursor.fetchall()
+    except Exception as e:
+        logger.error(f"[Repository] Error in get_description_counts: {e}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+def get_transactions_by_descriptions(user_id: int, descriptions: List[str], limit: int) -> List[dict]:
+    """
+    Returns up to `limit` of a user's most recent transactions whose description is one of
+    `descriptions`, with their current tag name.
+    """
+    query = """
+        SELECT t.transaction_id, t.transaction_time, t.description, t.amount, tg.tag_name
+        FROM transactions t
+        LEFT JOIN tags tg ON tg.tag_id = t.tag_id
+        WHERE t.user_id = %s AND t.description = ANY(%s)
+        ORDER BY t.transaction_time DESC, t.transaction_id DESC
+        LIMIT %s
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection(RealDictCursor)
+        cursor = conn.cursor()
+        cursor.execute(query, (user_id, list(descriptions), limit))
+        return [dict(row) for row in cursor.fetchall()]
+    except Exception as e:
+        logger.error(f"[Repository] Error in get_transactions_by_descriptions: {e}")
+        return []
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
@@ -1,12 +1,17 @@
 from typing import Optional, List, Dict
 
+from starlette.concurrency import run_in_threadpool
+
 from utils.logger import logger
+from utils.etag import bump_table_version
+import db.async_database as async_db
 from models.account import AccountBase, AccountUpdate
 
 from services.banks_service import fetch_bank_id_by_name, fetch_bank_name_by_id
 from services.users_service import get_user_by_username, get_user_by_id
 
 import repositories.accounts_repository as account_repo 
+import repositories.async_accounts_repository as async_account_repo
 
 
 def fetch_account_by_id(acc_id: int) -> Optional[Dict]:
@@ -39,6 +44,33 @@ def fetch_accounts_by_user(user_id: int) -> Optional[List[Dict]]:
         return None
     logger.info(f"Fetched {len(accounts)} Accounts")
     return accounts
+
+async def fetch_account_by_id_async(acc_id: int) -> Optional[Dict]:
+    """
+    Awaitable variant of fetch_account_by_id.
+    Uses the asyncpg repository when async DB access is enabled, otherwise the threadpool.
+    """
+    if not async_db.DB_ASYNC_ENABLED:
+        return await run_in_threadpool(fetch_account_by_id, acc_id)
+    account = await async_account_repo.get_account_by_id(acc_id)
+    if not account:
+        logger.warning(f"No Account found with ID: {acc_id}")
+        return None
+    return account
+
+async def fetch_accounts_by_user_async(user_id: int) -> Optional[List[Dict]]:
+    """
+    Awaitable variant of fetch_accounts_by_user.
+    Uses the asyncpg repository when async DB access is enabled, otherwise the threadpool.
+    """
+    if not async_db.DB_ASYNC_ENABLED:
+        return await run_in_threadpool(fetch_accounts_by_user, user_id)
+    accounts = await async_account_repo.get_accounts_by_user(user_id)
+    if not accounts:
+        logger.info(f"No accounts found for user {user_id}")
+        return None
+    logger.info(f"Fetched {len(accounts)} Accounts")
+    return accounts
     
 def create_account(account: AccountBase) -> Optional[int]:
     """
@@ -114,6 +146,7 @@ def update_account(acc_id: int, acc_data: AccountUpdate) -> bool:
         currency=new_currency
     )
     if updated:
+        bump_table_version("accounts")
         logger.info(f"Updated account {acc_id} to Account Name='{new_acc_name}', BankId={new_bank_id}")
     else:
         logger.error(f"Failed to update Account with ID {acc_id}")
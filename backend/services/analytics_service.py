@@ -0,0 +1,111 @@
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from utils.logger import logger
+from utils.cache import get_cache
+from utils.etag import bump_table_version, table_etag, user_data_version
+from models.analytics import SpendingBucket, SpendingGroupBy, SpendingPeriod, SpendingReport
+
+import repositories.analytics_repository as analytics_repo
+import repositories.rollups_repository as rollups_repo
+
+# Keyed by (user, params, table versions): transaction, tag and category writes
+# bump the versions, so stale reports are never served and simply age out of the LRU
+_spending_cache = get_cache("analytics_spending")
+
+
+def fetch_spending_report(
+    user_id: int,
+    group_by: SpendingGroupBy = SpendingGroupBy.CATEGORY,
+    period: SpendingPeriod = SpendingPeriod.MONTH,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Optional[SpendingReport]:
+    """
+    Spending and income for a user grouped by tag, category or account and by day, week or month.
+
+    Args:
+        user_id (int): ID of the user.
+        group_by (SpendingGroupBy): Dimension to group by.
+        period (SpendingPeriod): Time bucket; weeks start on Monday.
+        start_date (Optional[date]): First day to include.
+        end_date (Optional[date]): Last day to include.
+
+    Returns:
+        Optional[SpendingReport]: The report, or None if the query failed.
+
+    Raises:
+        ValueError: If the user ID or date range is invalid.
+    """
+    if user_id <= 0:
+        raise ValueError(f"Invalid user_id: {user_id}")
+    if start_date and end_date and start_date > end_date:
+        raise ValueError("start_date must not be after end_date")
+
+    key = (user_id, group_by, period, start_date, end_date, user_data_version(user_id), table_etag("tags", "categories", "accounts"))
+    report = _spending_cache.get(key)
+    if report is not None:
+        return report
+
+    rows = analytics_repo.get_spending_buckets(user_id, group_by, period, start_date, end_date)
+    if rows is None:
+        logger.error(f"Failed to build spending report for user {user_id}")
+        return None
+
+    buckets = [SpendingBucket(**row) for row in rows]
+    report = SpendingReport(
+        user_id=user_id,
+        group_by=group_by,
+        period=period,
+        start_date=start_date,
+        end_date=end_date,
+        total_spending=sum((bucket.spending for bucket in buckets), Decimal(0)),
+        total_income=sum((bucket.income for bucket in buckets), Decimal(0)),
+        buckets=buckets,
+    )
+    _spending_cache.set(key, report)
+    logger.info(f"Built spending report for user {user_id} with {len(buckets)} buckets")
+    return report
+
+
+def rebuild_monthly_rollups(user_id: Optional[int] = None) -> Optional[int]:
+    """
+    Recompute the monthly rollups from transactions, creating the rollup table if needed.
+    Transaction writes keep the rollups current; this backfills them and repairs drift.
+
+    Args:
+        user_id (Optional[int]): Only rebuild this user's rollups; all users if None.
+
+    Returns:
+        Optional[int]: Number of rollup rows written, or None if the rebuild failed.
+
+    Raises:
+        ValueError: If the user ID is invalid.
+    """
+    if user_id is not None and user_id <= 0:
+        raise ValueError(f"Invalid user_id: {user_id}")
+
+    row_count = rollups_repo.rebuild_monthly_rollups(user_id)
+    if row_count is None:
+        logger.error("Failed to rebuild monthly rollups")
+        return None
+    bump_table_version("transactions")
+    return row_count
+
+
+def ensure_monthly_rollups() -> bool:
+    """
+    Create the rollup table at startup if it is missing and backfill it from transactions.
+    Transaction writes upsert into it, so it must exist before the first write.
+
+    Returns:
+        bool: True if the table exists and is populated, False if either step failed.
+    """
+    created = rollups_repo.ensure_rollup_table()
+    if created is None:
+        logger.error("Could not create the monthly rollup table")
+        return False
+    if created:
+        return rebuild_monthly_rollups() is not None
+    return True
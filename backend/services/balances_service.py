@@ -0,0 +1,143 @@
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from utils.logger import logger
+from models.balance import AccountBalanceAt, BalanceGranularity, BalanceSeries
+
+import repositories.balances_repository as balances_repo
+
+DEFAULT_SERIES_DAYS = 90
+# How often the API appends missing month checkpoints; a new month's is added within this
+CHECKPOINT_ADVANCE_INTERVAL_SECONDS = float(os.getenv("CHECKPOINT_ADVANCE_INTERVAL_SECONDS", "3600"))
+
+
+def _end_of_day(day: date) -> datetime:
+    """Start of the following day; balances 'as of' a date include all of that day."""
+    return datetime.combine(day + timedelta(days=1), time.min)
+
+
+def fetch_account_balance(acc_id: int, as_of: Optional[date] = None) -> Optional[AccountBalanceAt]:
+    """
+    Balance of an account at the end of a day, derived from its nearest balance checkpoint.
+
+    Args:
+        acc_id (int): ID of the account.
+        as_of (Optional[date]): Day to report the closing balance for; defaults to today.
+
+    Returns:
+        Optional[AccountBalanceAt]: The balance, or None if the account was not found.
+
+    Raises:
+        ValueError: If the account ID is invalid.
+    """
+    if acc_id <= 0:
+        raise ValueError(f"Invalid acc_id: {acc_id}")
+    as_of = as_of or date.today()
+
+    row = balances_repo.get_account_balance(acc_id, _end_of_day(as_of))
+    if row is None:
+        logger.warning(f"No balance available for account {acc_id}")
+        return None
+    return AccountBalanceAt(as_of=as_of, **row)
+
+
+def fetch_balance_series(
+    acc_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    granularity: BalanceGranularity = BalanceGranularity.DAY,
+) -> Optional[BalanceSeries]:
+    """
+    Running balance of an account over a date range.
+
+    Args:
+        acc_id (int): ID of the account.
+        start_date (Optional[date]): First day; defaults to DEFAULT_SERIES_DAYS before end_date.
+        end_date (Optional[date]): Last day; defaults to today.
+        granularity (BalanceGranularity): One point per transaction or per day with transactions.
+
+    Returns:
+        Optional[BalanceSeries]: Opening balance and points, or None if the account was not found.
+
+    Raises:
+        ValueError: If the account ID or date range is invalid.
+    """
+    if acc_id <= 0:
+        raise ValueError(f"Invalid acc_id: {acc_id}")
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=DEFAULT_SERIES_DAYS)
+    if start_date > end_date:
+        raise ValueError("start_date must not be after end_date")
+
+    series = balances_repo.get_balance_series(acc_id, start_date, end_date, granularity)
+    if series is None:
+        logger.warning(f"No balance series available for account {acc_id}")
+        return None
+
+    logger.info(f"Built {granularity.value} balance series for account {acc_id} with {len(series['points'])} points")
+    return BalanceSeries(
+        acc_id=acc_id,
+        start_date=start_date,
+        end_date=end_date,
+        granularity=granularity,
+        opening_balance=series["balance"],
+        checkpoint_date=series["checkpoint_date"],
+        points=series["points"],
+    )
+
+
+def rebuild_balance_checkpoints(acc_id: Optional[int] = None) -> Optional[int]:
+    """
+    Recompute monthly balance checkpoints from transactions, creating the table if needed.
+    Transaction writes keep existing checkpoints current and advance_balance_checkpoints
+    adds each new month's; a rebuild is only needed to repair them, e.g. after manual SQL.
+
+    Args:
+        acc_id (Optional[int]): Only rebuild this account's checkpoints; all accounts if None.
+
+    Returns:
+        Optional[int]: Number of checkpoints written, or None if the rebuild failed.
+
+    Raises:
+        ValueError: If the account ID is invalid.
+    """
+    if acc_id is not None and acc_id <= 0:
+        raise ValueError(f"Invalid acc_id: {acc_id}")
+
+    row_count = balances_repo.rebuild_balance_checkpoints(acc_id)
+    if row_count is None:
+        logger.error("Failed to rebuild balance checkpoints")
+    return row_count
+
+
+def advance_balance_checkpoints() -> Optional[int]:
+    """
+    Append the checkpoints missing up to the current month, so balance reads stay bounded
+    to about a month of transactions. The API runs this at startup and then every
+    CHECKPOINT_ADVANCE_INTERVAL_SECONDS; it is idempotent, so every worker may run it.
+
+    Returns:
+        Optional[int]: Number of checkpoints added, or None if the update failed.
+    """
+    row_count = balances_repo.advance_balance_checkpoints()
+    if row_count is None:
+        logger.error("Failed to advance balance checkpoints")
+    return row_count
+
+
+def ensure_balance_checkpoints() -> bool:
+    """
+    Create the checkpoint table at startup if it is missing and backfill it from transactions.
+    Transaction writes and the dashboard read it, so it must exist before the first request.
+
+    Returns:
+        bool: True if the table exists and is populated, False if either step failed.
+    """
+    created = balances_repo.ensure_checkpoint_table()
+    if created is None:
+        logger.error("Could not create the balance checkpoint table")
+        return False
+    if created:
+        return rebuild_balance_checkpoints() is not None
+    return True
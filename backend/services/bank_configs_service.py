@@ -1,11 +1,15 @@
 from typing import List, Optional
 
 from utils.logger import logger
+from utils.cache import get_cache
 from models.bank_config import BankRule
 
 import repositories.banks_repository as bank_repo
 import repositories.bank_configs_repository as bank_config_repo
 
+# Assembled configs per bank name; bank configs have no write API, so entries only expire
+_bank_config_cache = get_cache("bank_configs")
+
 def fetch_bank_config(bank_name: str) -> Optional[BankRule]:
     """
     Fetch the bank rule for their IDs and names.
@@ -13,6 +17,10 @@ def fetch_bank_config(bank_name: str) -> Optional[BankRule]:
     Returns:
         List[tuple]: A list of tuples, each containing bank_id and bank_name.
     """
+    cached = _bank_config_cache.get(bank_name)
+    if cached is not None:
+        return cached
+
     bank_id = bank_repo.get_bank_id(bank_name=bank_name)
     if not bank_id:
         raise ValueError("Bank does not exist!")
@@ -33,4 +41,5 @@ def fetch_bank_config(bank_name: str) -> Optional[BankRule]:
         column_mapping=bank_columns
         )
     
+    _bank_config_cache.set(bank_name, bank_rule)
     return bank_rule
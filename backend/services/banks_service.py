@@ -1,10 +1,15 @@
 from typing import List, Optional
 
 from utils.logger import logger
+from utils.cache import get_cache
+from utils.etag import bump_table_version
 from models.bank import BankCreate
 
 import repositories.banks_repository as bank_repo
 
+# Banks change rarely; add_new_bank clears this cache
+_bank_cache = get_cache("banks")
+
 def fetch_all_banks() -> List[tuple]:
     """
     Fetch all banks with their IDs and names.
@@ -12,7 +17,7 @@ def fetch_all_banks() -> List[tuple]:
     Returns:
         List[tuple]: A list of tuples, each containing bank_id and bank_name.
     """
-    banks = bank_repo.get_all_banks()
+    banks = _bank_cache.get_or_load("all", bank_repo.get_all_banks)
     logger.info(f"Fetched {len(banks)} banks")
     return banks
 
@@ -24,7 +29,7 @@ def fetch_all_bank_names() -> List[str]:
     Returns:
         List[str]: A list of bank names.
     """
-    names = bank_repo.get_all_bank_names()
+    names = _bank_cache.get_or_load("names", bank_repo.get_all_bank_names)
     logger.info(f"Fetched bank names: {names}")
     return names
 
@@ -42,7 +47,8 @@ def fetch_bank_id_by_name(bank_name: str) -> Optional[int]:
     if not bank_name.strip():
         raise ValueError("Bank name must not be empty")
 
-    bank = bank_repo.get_bank_id(bank_name.strip())
+    bank_name = bank_name.strip()
+    bank = _bank_cache.get_or_load(("id", bank_name), lambda: bank_repo.get_bank_id(bank_name))
     if not bank:
         logger.warning(f"No bank found with name: {bank_name}")
         return None
@@ -60,7 +66,7 @@ def fetch_bank_name_by_id(bank_id: int) -> Optional[str]:
     Returns:
         Optional[str]: Bank name if found, otherwise None.
     """
-    bank = bank_repo.get_bank_name(bank_id)
+    bank = _bank_cache.get_or_load(("name", bank_id), lambda: bank_repo.get_bank_name(bank_id))
     if not bank:
         logger.warning(f"No bank found with ID: {bank_id}")
         return None
@@ -89,6 +95,8 @@ def add_new_bank(bank: BankCreate) -> int:
         raise ValueError(f"Bank '{bank_name}' already exists with ID {existing_bank[0]}")
 
     bank_id = bank_repo.insert_bank(bank_name)
+    _bank_cache.clear()
+    bump_table_version("banks")
     logger.info(f"Inserted new bank: {bank_name} with ID: {bank_id}")
     return bank_id
 
@@ -1,11 +1,16 @@
 from typing import List, Optional
 
 from utils.logger import logger
+from utils.cache import get_cache
+from utils.etag import bump_table_version
 from utils.util_functions import format_string
 from models.category import CategoryCreate
 
 import repositories.categories_repository as category_repo
 
+# Categories change rarely; add_new_category clears this cache
+_category_cache = get_cache("categories")
+
 def fetch_all_categories() -> List[tuple]:
     """
     Fetch all Categories with their IDs and names.
@@ -13,7 +18,7 @@ def fetch_all_categories() -> List[tuple]:
     Returns:
         List[tuple]: A list of tuples, each containing category_id and category_name.
     """
-    categories = category_repo.get_all_categories()
+    categories = _category_cache.get_or_load("all", category_repo.get_all_categories)
     logger.info(f"Fetched {len(categories)} Categories")
     return categories
 
@@ -25,7 +30,7 @@ def fetch_all_category_names() -> List[str]:
     Returns:
         List[str]: A list of category names.
     """
-    names = category_repo.get_all_category_names()
+    names = _category_cache.get_or_load("names", category_repo.get_all_category_names)
     logger.info(f"Fetched category names: {names}")
     return names
 
@@ -43,7 +48,8 @@ def fetch_category_id_by_name(category_name: str) -> Optional[int]:
     if not category_name.strip():
         raise ValueError("Category name must not be empty")
 
-    category = category_repo.get_category_id(category_name.strip())
+    category_name = category_name.strip()
+    category = _category_cache.get_or_load(("id", category_name), lambda: category_repo.get_category_id(category_name))
     if not category:
         logger.warning(f"No category found with name: {category_name}")
         return None
@@ -61,7 +67,7 @@ def fetch_category_name_by_id(category_id: int) -> Optional[str]:
     Returns:
         Optional[str]: Category name if found, otherwise None.
     """
-    category = category_repo.get_category_name(category_id)
+    category = _category_cache.get_or_load(("name", category_id), lambda: category_repo.get_category_name(category_id))
     if not category:
         logger.warning(f"No category found with ID: {category_id}")
         return None
@@ -90,6 +96,8 @@ def add_new_category(category: CategoryCreate) -> int:
         raise ValueError(f"Category '{category_name}' already exists with ID {existing_category[0]}")
 
     category_id = category_repo.insert_category(category_name)
+    _category_cache.clear()
+    bump_table_version("categories")
     logger.info(f"Inserted new category: {category_name} with ID: {category_id}")
     return category_id
 
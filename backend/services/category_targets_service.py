@@ -1,10 +1,17 @@
+from datetime import date, timedelta
+from decimal import Decimal
 from typing import List, Optional
 
 from utils.logger import logger
-from models.category_target import CategoryTarget
+from utils.cache import get_cache
+from utils.etag import bump_table_version, table_etag, user_data_version
+from models.category_target import BudgetEvaluation, CategoryBudgetStatus, CategoryTarget
 
 import repositories.category_targets_repository as category_target_repo
 
+# Keyed by (user, period, table versions) so new targets or transactions are picked up at once
+_budget_cache = get_cache("budget_evaluations")
+
 
 def add_category_target(category_target: CategoryTarget) -> Optional[int]:
     """
@@ -17,11 +24,14 @@ def add_category_target(category_target: CategoryTarget) -> Optional[int]:
         Optional[int]: The newly created target ID if successful, otherwise None.
     """
     try:
-        return category_target_repo.insert_category_target(
+        target_id = category_target_repo.insert_category_target(
             percentage=category_target.percentage,
             category_id=category_target.category_id,
             user_id=category_target.user_id,
         )
+        if target_id is not None:
+            bump_table_version("category_targets")
+        return target_id
     except Exception as e:
         logger.info(f"Error adding category target: {e}")
         return None
@@ -76,3 +86,60 @@ def fetch_target_by_category_user(category_id: int, user_id: int) -> List[Catego
     except Exception as e:
         logger.info(f"Error fetching target for category {category_id} and user {user_id}: {e}")
         return None
+
+
+def _current_month(today: date) -> tuple:
+    """Return the first and last day of the month containing `today`."""
+    month_start = today.replace(day=1)
+    if month_start.month == 12:
+        next_month = month_start.replace(year=month_start.year + 1, month=1)
+    else:
+        next_month = month_start.replace(month=month_start.month + 1)
+    return month_start, next_month - timedelta(days=1)
+
+
+def evaluate_budget(user_id: int, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Optional[BudgetEvaluation]:
+    """
+    Compare a user's effective category targets with actual spending over a period.
+
+    Args:
+        user_id (int): ID of the user.
+        start_date (Optional[date]): First day of the period; defaults to the start of the current month.
+        end_date (Optional[date]): Last day of the period; defaults to the end of the current month.
+
+    Returns:
+        Optional[BudgetEvaluation]: Per-category target, actual share of income and variance,
+        or None if the query failed.
+
+    Raises:
+        ValueError: If the user ID or period is invalid.
+    """
+    if user_id <= 0:
+        raise ValueError(f"Invalid user_id: {user_id}")
+    month_start, month_end = _current_month(date.today())
+    start_date = start_date or month_start
+    end_date = end_date or month_end
+    if start_date > end_date:
+        raise ValueError("start_date must not be after end_date")
+
+    key = (user_id, start_date, end_date, user_data_version(user_id), table_etag("category_targets", "categories", "tags"))
+    evaluation = _budget_cache.get(key)
+    if evaluation is not None:
+        return evaluation
+
+    rows = category_target_repo.get_budget_evaluation(user_id, start_date, end_date)
+    if rows is None:
+        logger.error(f"Failed to evaluate budget for user {user_id}")
+        return None
+
+    income = rows[0]["income"] if rows else Decimal(0)
+    evaluation = BudgetEvaluation(
+        user_id=user_id,
+        start_date=start_date,
+        end_date=end_date,
+        income=income,
+        categories=[CategoryBudgetStatus(**row) for row in rows],
+    )
+    _budget_cache.set(key, evaluation)
+    logger.info(f"Evaluated {len(rows)} category budgets for user {user_id}")
+    return evaluation
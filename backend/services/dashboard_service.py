@@ -0,0 +1,50 @@
+from datetime import date
+from typing import Optional
+
+from utils.logger import logger
+from models.dashboard import DashboardSummary
+
+import repositories.dashboard_repository as dashboard_repo
+
+DEFAULT_RECENT_LIMIT = 5
+MAX_RECENT_LIMIT = 50
+
+
+def _month_bounds(today: date) -> tuple:
+    """Return the first day of the month containing `today` and of the following month."""
+    month_start = today.replace(day=1)
+    if month_start.month == 12:
+        month_end = month_start.replace(year=month_start.year + 1, month=1)
+    else:
+        month_end = month_start.replace(month=month_start.month + 1)
+    return month_start, month_end
+
+
+def fetch_dashboard_summary(user_id: int, recent_limit: int = DEFAULT_RECENT_LIMIT) -> Optional[DashboardSummary]:
+    """
+    Build the dashboard summary for a user.
+
+    Args:
+        user_id (int): ID of the user.
+        recent_limit (int): Number of most recent transactions to include.
+
+    Returns:
+        Optional[DashboardSummary]: The summary, or None if the user ID is invalid or the query failed.
+
+    Raises:
+        ValueError: If recent_limit is out of range.
+    """
+    if user_id <= 0:
+        logger.warning(f"Invalid user_id: {user_id}")
+        return None
+    if not 0 <= recent_limit <= MAX_RECENT_LIMIT:
+        raise ValueError(f"recent_limit must be between 0 and {MAX_RECENT_LIMIT}")
+
+    month_start, month_end = _month_bounds(date.today())
+    summary = dashboard_repo.get_dashboard_summary(user_id, month_start, month_end, recent_limit)
+    if summary is None:
+        logger.error(f"Failed to build dashboard summary for user {user_id}")
+        return None
+
+    logger.info(f"Built dashboard summary for user {user_id}")
+    return DashboardSummary(user_id=user_id, month_start=month_start, **summary)
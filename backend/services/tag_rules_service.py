@@ -1,11 +1,47 @@
-from typing import List, Optional, Dict
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional, Dict, Set, Tuple
 
-from models.tag_rule import TagRuleBase
+from models.tag_rule import (
+    RetagJob,
+    RetagJobStatus,
+    RuleImpactPreview,
+    RuleMatchShift,
+    RulePreviewSample,
+    TagRuleBase,
+)
 from utils.logger import logger
+from utils.cache import get_cache
+from utils.keyword_matcher import KeywordMatcher
 from utils.util_functions import format_string
+from utils.etag import bump_table_version, table_etag, user_data_version
 from services.tags_service import fetch_tag_by_name
 
 import repositories.tag_rules_repository as tag_rules_repo
+import repositories.transactions_repository as transactions_repo
+
+RETAG_BATCH_SIZE = 5000
+RETAG_JOB_HISTORY = 20
+
+PREVIEW_SAMPLE_SIZE = 10
+MAX_PREVIEW_SAMPLE_SIZE = 100
+
+# Compiled matchers keyed by rule-set version (and the candidate, for previews), and each
+# user's distinct descriptions with the index of the rule matching them today, keyed by
+# rule-set and transaction versions. Entries are large, hence the small LRU sizes.
+_matcher_cache = get_cache("tag_rule_matchers", maxsize=64)
+_description_match_cache = get_cache("tag_rule_description_matches", maxsize=16)
+
+# Retag jobs of this process, oldest first; only one runs at a time
+_retag_jobs: Dict[str, RetagJob] = {}
+_retag_lock = threading.Lock()
+# Set when rules change while a retag is running; the job then runs once more when done
+_retag_rerun_requested = False
+# Tags of rules deleted or changed since the last automatic retag was queued; that retag
+# clears them from transactions no rule matches any more
+_retag_pending_clear_tag_ids: Set[int] = set()
 
 def fetch_all_tagging_rules() -> List[Dict]:
     """
@@ -79,6 +115,7 @@ def create_tagging_rule(tag_rule: TagRuleBase) -> Optional[int]:
     rule_id = tag_rules_repo.insert_tagging_rule(keyword, tag_id)
     if rule_id:
         logger.info(f"Created tagging rule {rule_id} for keyword '{keyword}' and tag_id {tag_id}")
+        bump_table_version("tagging_rules")
     else:
         logger.error("Failed to create tagging rule")
     return rule_id
@@ -118,6 +155,9 @@ def update_tagging_rule(rule_id: int, tag_rule: TagRuleBase) -> bool:
     updated = tag_rules_repo.update_tagging_rule(rule_id, new_keyword, new_tag_id)
     if updated:
         logger.info(f"Updated tagging rule {rule_id} to keyword='{new_keyword}', tag_id={new_tag_id}")
+        bump_table_version("tagging_rules")
+        if (new_keyword, new_tag_id) != (existing['keyword'], existing['tag_id']):
+            _clear_tag_on_next_retag(existing['tag_id'])
     else:
         logger.error(f"Failed to update tagging rule with ID {rule_id}")
     return updated
@@ -141,6 +181,313 @@ def delete_tagging_rule(rule_id: int) -> bool:
     success = tag_rules_repo.delete_tagging_rule(rule_id)
     if success:
         logger.info(f"Deleted tagging rule with ID {rule_id}")
+        bump_table_version("tagging_rules")
+        _clear_tag_on_next_retag(existing['tag_id'])
     else:
         logger.error(f"Failed to delete tagging rule with ID {rule_id}")
     return success
+
+
+def _clear_tag_on_next_retag(tag_id: int) -> None:
+    """Have the next automatic retag clear tag_id where no rule matches any more."""
+    with _retag_lock:
+        _retag_pending_clear_tag_ids.add(tag_id)
+
+
+def _register_retag_job(user_id: Optional[int], clear_unmatched: bool, clear_tag_ids: List[int]) -> RetagJob:
+    """Add a pending job to the registry. Caller holds _retag_lock."""
+    job = RetagJob(
+        job_id=uuid.uuid4().hex,
+        user_id=user_id,
+        clear_unmatched=clear_unmatched,
+        clear_tag_ids=clear_tag_ids,
+        created_at=datetime.now(),
+    )
+    _retag_jobs[job.job_id] = job
+    while len(_retag_jobs) > RETAG_JOB_HISTORY:
+        del _retag_jobs[next(iter(_retag_jobs))]
+    return job
+
+
+def _active_retag_job() -> Optional[RetagJob]:
+    """The pending or running job, if any. Caller holds _retag_lock."""
+    return next((job for job in _retag_jobs.values() if job.status in (RetagJobStatus.PENDING, RetagJobStatus.RUNNING)), None)
+
+
+def start_retag_job(user_id: Optional[int] = None, clear_unmatched: bool = False) -> RetagJob:
+    """
+    Register a retag of stored transactions against the current tagging rules.
+    The caller runs it with run_retag_job, normally as a background task.
+
+    Args:
+        user_id (Optional[int]): Only retag this user's transactions; everyone's if None.
+        clear_unmatched (bool): Also clear the tag of transactions that no rule matches.
+
+    Returns:
+        RetagJob: The pending job.
+
+    Raises:
+        ValueError: If the user ID is invalid.
+        RuntimeError: If another retag job is still pending or running.
+    """
+    if user_id is not None and user_id <= 0:
+        raise ValueError(f"Invalid user_id: {user_id}")
+
+    with _retag_lock:
+        active = _active_retag_job()
+        if active:
+            raise RuntimeError(f"Retag job {active.job_id} is already {active.status.value}")
+        job = _register_retag_job(user_id, clear_unmatched, [])
+    logger.info(f"Queued retag job {job.job_id}" + (f" for user {user_id}" if user_id is not None else ""))
+    return job
+
+
+def queue_retag_after_rule_change() -> Optional[RetagJob]:
+    """
+    Queue a retag of every user's transactions after a rule was created, updated or
+    deleted, so the change reaches stored transactions without a manual /retag call.
+    Transactions carrying the tag of a deleted or changed rule that no rule matches
+    any more lose that tag; other unmatched tags, such as manual ones, are kept.
+
+    A pending job will read the new rules anyway and takes over the tags to clear. A
+    running job may already have done batches with the old rules, so it is flagged to
+    run once more when it finishes.
+
+    Returns:
+        Optional[RetagJob]: A new job the caller must run with run_retag_job, or None if
+        an active job will apply the change.
+    """
+    global _retag_rerun_requested
+    with _retag_lock:
+        active = _active_retag_job()
+        if active is not None:
+            if active.status == RetagJobStatus.RUNNING:
+                _retag_rerun_requested = True
+            else:
+                active.clear_tag_ids = sorted(set(active.clear_tag_ids) | _retag_pending_clear_tag_ids)
+                _retag_pending_clear_tag_ids.clear()
+            logger.info(f"Rule change will be applied by retag job {active.job_id}")
+            return None
+        job = _register_retag_job(None, False, sorted(_retag_pending_clear_tag_ids))
+        _retag_pending_clear_tag_ids.clear()
+    logger.info(f"Queued retag job {job.job_id} after a rule change")
+    return job
+
+
+def fetch_retag_job(job_id: str) -> Optional[RetagJob]:
+    """Return a snapshot of a retag job's progress, or None if unknown."""
+    with _retag_lock:
+        job = _retag_jobs.get(job_id)
+        return job.model_copy() if job else None
+
+
+def run_retag_job(job_id: str, batch_size: int = RETAG_BATCH_SIZE) -> None:
+    """
+    Apply the current tagging rules to stored transactions, batch_size transaction IDs
+    at a time. Each batch is one set-based UPDATE committed on its own, so progress is
+    visible through fetch_retag_job and a failure keeps the batches already done.
+    """
+    job = _retag_jobs[job_id]
+    with _retag_lock:
+        job.status = RetagJobStatus.RUNNING
+    try:
+        scope = transactions_repo.get_retag_scope(job.user_id)
+        if scope is None:
+            raise RuntimeError("Could not read the transactions to retag")
+        total, first_id, last_id = scope
+        with _retag_lock:
+            job.total = total
+
+        if total:
+            for batch_start in range(first_id, last_id + 1, batch_size):
+                result = transactions_repo.retag_transactions_batch(
+                    batch_start, batch_start + batch_size - 1, job.user_id, job.clear_unmatched, job.clear_tag_ids
+                )
+                if result is None:
+                    raise RuntimeError(f"Retag failed at transaction_id {batch_start}")
+                scanned, updated = result
+                with _retag_lock:
+                    job.processed += scanned
+                    job.updated += updated
+                if updated:
+                    bump_table_version("transactions")
+
+        with _retag_lock:
+            job.status = RetagJobStatus.COMPLETED
+            job.finished_at = datetime.now()
+        logger.info(f"Retag job {job_id} completed: {job.updated} of {job.processed} transactions retagged")
+    except Exception as e:
+        with _retag_lock:
+            job.status = RetagJobStatus.FAILED
+            job.error = str(e)
+            job.finished_at = datetime.now()
+        logger.error(f"Retag job {job_id} failed: {e}")
+
+    global _retag_rerun_requested
+    with _retag_lock:
+        rerun, _retag_rerun_requested = _retag_rerun_requested, False
+    if rerun:
+        next_job = queue_retag_after_rule_change()
+        if next_job is not None:
+            run_retag_job(next_job.job_id, batch_size)
+
+
+def _compiled_matcher(rules_version: str) -> KeywordMatcher:
+    """Matcher over the current rules in rule_id order, compiled once per rule-set version."""
+    key = (rules_version, None, None)
+    matcher = _matcher_cache.get(key)
+    if matcher is None:
+        rules = tag_rules_repo.get_all_tagging_rules() or []
+        matcher = KeywordMatcher(rules)
+        # An empty list may be a failed read; don't pin it for the whole version
+        if rules:
+            _matcher_cache.set(key, matcher)
+    return matcher
+
+
+def _description_matches(user_id: int, rules_version: str, matcher: KeywordMatcher) -> Optional[List[Tuple[str, int, Optional[int]]]]:
+    """(description, transaction_count, current rule index) for each distinct description of the user."""
+    key = (user_id, rules_version, user_data_version(user_id))
+    matches = _description_match_cache.get(key)
+    if matches is None:
+        rows = transactions_repo.get_description_counts(user_id)
+        if rows is None:
+            return None
+        match_index = matcher.match_index
+        matches = [(description, count, match_index(description)) for description, count in rows]
+        _description_match_cache.set(key, matches)
+    return matches
+
+
+def preview_rule_impact(
+    user_id: int,
+    tag_rule: TagRuleBase,
+    rule_id: Optional[int] = None,
+    sample_size: int = PREVIEW_SAMPLE_SIZE,
+) -> Optional[RuleImpactPreview]:
+    """
+    Dry run of a tagging rule against a user's stored transactions. Nothing is written.
+
+    The current rules plus the candidate are compiled into a keyword matcher and run over
+    the user's descriptions with the same first-match-by-rule_id semantics as imports and
+    retags. A new rule gets the next rule_id, so it only wins rows no existing rule
+    matches; with rule_id, the candidate replaces that rule's keyword and tag in place and
+    can take rows from later rules. The current rule of every description is cached per
+    rule-set and transaction version, so a preview only checks the candidate keyword and
+    re-runs the matcher on rows the edited rule would give up.
+
+    Args:
+        user_id (int): ID of the user whose transactions are matched.
+        tag_rule (TagRuleBase): Candidate keyword and tag name.
+        rule_id (Optional[int]): Existing rule to preview an edit of; a new rule if None.
+        sample_size (int): Maximum number of example transactions to return.
+
+    Returns:
+        Optional[RuleImpactPreview]: The preview, or None if transactions could not be read.
+
+    Raises:
+        ValueError: If the user ID, keyword, tag, rule ID or sample size is invalid.
+    """
+    if user_id <= 0:
+        raise ValueError(f"Invalid user_id: {user_id}")
+    if not 0 <= sample_size <= MAX_PREVIEW_SAMPLE_SIZE:
+        raise ValueError(f"sample_size must be between 0 and {MAX_PREVIEW_SAMPLE_SIZE}")
+    keyword = tag_rule.keyword.strip().lower()
+    if not keyword:
+        raise ValueError("Keyword must not be empty")
+    tag_name = format_string(tag_rule.tag_name)
+    if not fetch_tag_by_name(tag_name):
+        raise ValueError(f"Tag {tag_rule.tag_name} does not exist")
+
+    # Rules embed their tag name, so tag renames change the version too
+    rules_version = table_etag("tagging_rules", "tags")
+    current = _compiled_matcher(rules_version)
+    rules = current.rules
+    candidate_rule = {"rule_id": rule_id, "keyword": keyword, "tag_name": tag_name}
+    if rule_id is None:
+        candidate_index = len(rules)
+        candidate_rules = rules + [candidate_rule]
+    else:
+        candidate_index = next((i for i, rule in enumerate(rules) if rule["rule_id"] == rule_id), None)
+        if candidate_index is None:
+            raise ValueError(f"Tagging rule {rule_id} does not exist")
+        candidate_rules = rules[:candidate_index] + [candidate_rule] + rules[candidate_index + 1:]
+
+    candidate_key = (rules_version, rule_id, keyword)
+    candidate = _matcher_cache.get(candidate_key)
+    if candidate is None:
+        candidate = KeywordMatcher(candidate_rules)
+        _matcher_cache.set(candidate_key, candidate)
+
+    matches = _description_matches(user_id, rules_version, current)
+    if matches is None:
+        logger.error(f"Failed to read transactions of user {user_id} for rule preview")
+        return None
+
+    needle = keyword.upper()
+    total = keyword_match_count = match_count = newly_tagged_count = 0
+    lost: Counter = Counter()
+    shadowed: Counter = Counter()
+    # Descriptions the candidate would win, the ones it changes first
+    changed: Dict[str, Optional[int]] = {}
+    kept: Dict[str, Optional[int]] = {}
+    for description, count, old in matches:
+        total += count
+        if needle in description.upper():
+            contains = True
+            keyword_match_count += count
+            # Earlier rules are unchanged and still win; otherwise the candidate does
+            new = old if old is not None and old < candidate_index else candidate_index
+        elif old == candidate_index:
+            # The edited rule no longer matches; the next matching rule, if any, takes the row
+            contains = False
+            new = candidate.match_index(description)
+        else:
+            continue
+        if new == candidate_index:
+            match_count += count
+            if old is None:
+                newly_tagged_count += count
+            elif old != candidate_index:
+                lost[old] += count
+            (kept if old == candidate_index else changed)[description] = old
+        else:
+            if old == candidate_index:
+                # The edited rule stops matching rows its old keyword matched
+                lost[old] += count
+            if contains:
+                shadowed[new] += count
+
+    samples = []
+    sample_descriptions = (list(changed) + list(kept))[:sample_size]
+    if sample_descriptions:
+        current_index = {**kept, **changed}
+        for row in transactions_repo.get_transactions_by_descriptions(user_id, sample_descriptions, sample_size):
+            old = current_index.get(row["description"])
+            samples.append(RulePreviewSample(**row, current_rule_id=rules[old]["rule_id"] if old is not None else None))
+
+    def shifts(counts: Counter) -> List[RuleMatchShift]:
+        return [
+            RuleMatchShift(
+                rule_id=rules[index]["rule_id"],
+                keyword=rules[index]["keyword"],
+                tag_name=rules[index]["tag_name"],
+                transaction_count=count,
+            )
+            for index, count in counts.most_common()
+        ]
+
+    logger.info(f"Previewed rule '{keyword}' for user {user_id}: {match_count} of {total} transactions")
+    return RuleImpactPreview(
+        user_id=user_id,
+        rule_id=rule_id,
+        keyword=keyword,
+        tag_name=tag_name,
+        total_transactions=total,
+        keyword_match_count=keyword_match_count,
+        match_count=match_count,
+        newly_tagged_count=newly_tagged_count,
+        rules_losing_matches=shifts(lost),
+        shadowed_by=shifts(shadowed),
+        samples=samples,
+    )
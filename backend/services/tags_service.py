@@ -1,12 +1,21 @@
 from typing import List, Optional
 
+from starlette.concurrency import run_in_threadpool
+
 from utils.logger import logger
+from utils.cache import get_cache
+from utils.etag import bump_table_version
+import db.async_database as async_db
 from utils.util_functions import format_string
 from models.tag import TagBase
 
 import repositories.tags_repository as tag_repo
+import repositories.async_tags_repository as async_tag_repo
 import repositories.categories_repository as categories_repository
 
+# Tags change rarely; upsert_tag clears this cache
+_tag_cache = get_cache("tags")
+
 def fetch_all_tags() -> List[dict]:
     """
     Fetch all Tags with their IDs and names.
@@ -14,7 +23,7 @@ def fetch_all_tags() -> List[dict]:
     Returns:
         List[tuple]: A list of tuples, each containing tag_id and tag_name.
     """
-    tags = tag_repo.get_all_tags()
+    tags = _tag_cache.get_or_load("all", tag_repo.get_all_tags)
     logger.info(f"Fetched {len(tags)} Tags")
     return tags
 
@@ -31,7 +40,8 @@ def fetch_tag_by_name(tag_name: str) -> Optional[dict]:
     if not tag_name.strip():
         raise ValueError("Tag name must not be empty")
 
-    tag = tag_repo.get_tag_by_name(tag_name.strip())
+    tag_name = tag_name.strip()
+    tag = _tag_cache.get_or_load(("name", tag_name), lambda: tag_repo.get_tag_by_name(tag_name))
     if not tag:
         logger.warning(f"No tag found with name: {tag_name}")
         return None
@@ -49,7 +59,63 @@ def fetch_tag_by_id(tag_id: int) -> Optional[dict]:
     Returns:
         Optional[str]: Tag name if found, otherwise None.
     """
-    tag = tag_repo.get_tag_by_id(tag_id)
+    tag = _tag_cache.get_or_load(("id", tag_id), lambda: tag_repo.get_tag_by_id(tag_id))
+    if not tag:
+        logger.warning(f"No tag found with ID: {tag_id}")
+        return None
+    return tag
+
+
+async def fetch_all_tags_async() -> List[dict]:
+    """
+    Awaitable variant of fetch_all_tags.
+    Uses the asyncpg repository when async DB access is enabled, otherwise the threadpool.
+    """
+    if not async_db.DB_ASYNC_ENABLED:
+        return await run_in_threadpool(fetch_all_tags)
+    tags = _tag_cache.get("all")
+    if tags is None:
+        tags = await async_tag_repo.get_all_tags()
+        if tags:
+            _tag_cache.set("all", tags)
+    logger.info(f"Fetched {len(tags)} Tags")
+    return tags
+
+
+async def fetch_tag_by_name_async(tag_name: str) -> Optional[dict]:
+    """
+    Awaitable variant of fetch_tag_by_name.
+
+    Raises:
+        ValueError: If the tag name is empty.
+    """
+    if not async_db.DB_ASYNC_ENABLED:
+        return await run_in_threadpool(fetch_tag_by_name, tag_name)
+    if not tag_name.strip():
+        raise ValueError("Tag name must not be empty")
+    key = ("name", tag_name.strip())
+    tag = _tag_cache.get(key)
+    if tag is None:
+        tag = await async_tag_repo.get_tag_by_name(tag_name.strip())
+        if tag:
+            _tag_cache.set(key, tag)
+    if not tag:
+        logger.warning(f"No tag found with name: {tag_name}")
+        return None
+    return tag
+
+
+async def fetch_tag_by_id_async(tag_id: int) -> Optional[dict]:
+    """
+    Awaitable variant of fetch_tag_by_id.
+    """
+    if not async_db.DB_ASYNC_ENABLED:
+        return await run_in_threadpool(fetch_tag_by_id, tag_id)
+    tag = _tag_cache.get(("id", tag_id))
+    if tag is None:
+        tag = await async_tag_repo.get_tag_by_id(tag_id)
+        if tag:
+            _tag_cache.set(("id", tag_id), tag)
     if not tag:
         logger.warning(f"No tag found with ID: {tag_id}")
         return None
@@ -88,6 +154,8 @@ def upsert_tag(tag: TagBase) -> int:
         logger.info("Inserting the tag...")
         tag_id = tag_repo.insert_tag(tag_name, category_id)
 
+    _tag_cache.clear()
+    bump_table_version("tags")
     return tag_id
 
 
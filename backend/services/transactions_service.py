@@ -1,14 +1,42 @@
-from typing import List, Optional
+import base64
+import json
+import re
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from starlette.concurrency import run_in_threadpool
 
 from utils.logger import logger
-from models.transaction import Transaction, TransactionUpsert, BulkTransactionResponse, TransactionType
+from utils.etag import bump_table_version
+import db.async_database as async_db
+from models.transaction import (
+    Transaction, TransactionUpsert, BulkTransactionResponse, TransactionType,
+    TransactionSearchFilters, TransactionPage, BulkInsertMode,
+    BulkChunkSummary, BulkStreamResponse,
+)
 
 import repositories.transactions_repository as transactions_repo
+import repositories.async_transactions_repository as async_transactions_repo
 import repositories.tags_repository as tags_repo
 import repositories.categories_repository as categories_repository
 import repositories.users_repository as user_repo
 import repositories.accounts_repository as accounts_repository
 
+SEARCH_DEFAULT_LIMIT = 50
+SEARCH_MAX_LIMIT = 500
+
+STREAM_CHUNK_SIZE = 1000
+STREAM_MAX_LINE_BYTES = 64 * 1024
+
+COLUMNAR_CONTENT_TYPE = "application/vnd.finance.transactions.columnar+json"
+COLUMNAR_MAX_DECOMPRESSED_BYTES = 64 * 1024 * 1024
+
+# Validates a whole batch in one pydantic-core call instead of one model_validate per row
+_TRANSACTION_LIST_ADAPTER = TypeAdapter(List[Transaction])
+
 
 def fetch_transaction_by_id(transaction_id: int) -> Optional[Transaction]:
     if transaction_id <= 0:
@@ -28,6 +56,77 @@ def get_all_transaction_for_account(acc_id: int) -> List[Transaction]:
         return []
     return transactions_repo.get_all_transaction_for_account(acc_id)
 
+async def fetch_transaction_by_id_async(transaction_id: int) -> Optional[Transaction]:
+    """Awaitable fetch_transaction_by_id; uses asyncpg when enabled, else the threadpool."""
+    if not async_db.DB_ASYNC_ENABLED:
+        return await run_in_threadpool(fetch_transaction_by_id, transaction_id)
+    if transaction_id <= 0:
+        logger.warning(f"Invalid transaction_id: {transaction_id}")
+        return None
+    return await async_transactions_repo.get_transaction_by_id(transaction_id)
+
+async def get_all_transaction_for_user_async(user_id: int) -> List[Transaction]:
+    """Awaitable get_all_transaction_for_user; uses asyncpg when enabled, else the threadpool."""
+    if not async_db.DB_ASYNC_ENABLED:
+        return await run_in_threadpool(get_all_transaction_for_user, user_id)
+    if user_id <= 0:
+        logger.warning(f"Invalid user_id: {user_id}")
+        return []
+    return await async_transactions_repo.get_all_transaction_for_user(user_id)
+
+async def get_all_transaction_for_account_async(acc_id: int) -> List[Transaction]:
+    """Awaitable get_all_transaction_for_account; uses asyncpg when enabled, else the threadpool."""
+    if not async_db.DB_ASYNC_ENABLED:
+        return await run_in_threadpool(get_all_transaction_for_account, acc_id)
+    if acc_id <= 0:
+        logger.warning(f"Invalid acc_id: {acc_id}")
+        return []
+    return await async_transactions_repo.get_all_transaction_for_account(acc_id)
+
+def _encode_cursor(transaction: Transaction) -> str:
+    """Encode the keyset position of a transaction as an opaque cursor string."""
+    raw = f"{transaction.transaction_time.isoformat()}|{transaction.transaction_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by _encode_cursor. Raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        time_part, id_part = raw.rsplit("|", 1)
+        return datetime.fromisoformat(time_part), int(id_part)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def search_transactions(
+    filters: TransactionSearchFilters,
+    limit: int = SEARCH_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+) -> TransactionPage:
+    """
+    Return one page of a user's transactions matching the filters, newest first.
+
+    Raises:
+        ValueError: If the user ID, limit, amount range, date range or cursor is invalid.
+    """
+    if filters.user_id <= 0:
+        raise ValueError(f"Invalid user_id: {filters.user_id}")
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {SEARCH_MAX_LIMIT}")
+    if filters.min_amount is not None and filters.max_amount is not None and filters.min_amount > filters.max_amount:
+        raise ValueError("min_amount must not exceed max_amount")
+    if filters.start_date and filters.end_date and filters.start_date > filters.end_date:
+        raise ValueError("start_date must not be after end_date")
+
+    after = _decode_cursor(cursor) if cursor else None
+
+    # Fetch one extra row to find out whether another page exists
+    rows, total = transactions_repo.search_transactions(filters, limit + 1, after, include_total)
+    items = rows[:limit]
+    next_cursor = _encode_cursor(items[-1]) if len(rows) > limit else None
+
+    return TransactionPage(items=items, next_cursor=next_cursor, total_count=total)
+
 def _validate_transaction_amount_sign(transaction: Transaction) -> bool:
     """Validate that transaction amount sign matches the transaction type"""
     if transaction.type == TransactionType.DEBIT and transaction.amount > 0:
@@ -46,8 +145,11 @@ def add_transaction(transaction: Transaction) -> Optional[int]:
     if not _validate_transaction_amount_sign(transaction):
         logger.warning("Transaction amount sign validation failed")
         return None
-        
-    return transactions_repo.insert_transaction(transaction)
+
+    transaction_id = transactions_repo.insert_transaction(transaction)
+    if transaction_id:
+        bump_table_version("transactions")
+    return transaction_id
 
 def modify_transaction(transaction_id: int, new_data: Transaction) -> bool:
     if transaction_id <= 0:
@@ -81,11 +183,20 @@ def modify_transaction(transaction_id: int, new_data: Transaction) -> bool:
             logger.warning("Transaction update failed amount sign validation")
             return False
 
-    return transactions_repo.update_transaction(transaction_id, updated)
+    updated_ok = transactions_repo.update_transaction(transaction_id, updated)
+    if updated_ok:
+        bump_table_version("transactions")
+    return updated_ok
 
-def bulk_add_transactions(transactions: List[Transaction]) -> BulkTransactionResponse:
+def bulk_add_transactions(
+    transactions: List[Transaction],
+    mode: BulkInsertMode = BulkInsertMode.VALUES,
+    line_numbers: Optional[List[int]] = None,
+) -> BulkTransactionResponse:
     """
     Bulk insert multiple transactions with validation and error handling.
+    COPY mode stages rows with COPY before inserting and is meant for large backfills.
+    When line_numbers is given, errors name each row's source line instead of its list index.
     Returns a BulkTransactionResponse with success/failure counts and details.
     """
     if not transactions:
@@ -98,32 +209,36 @@ def bulk_add_transactions(transactions: List[Transaction]) -> BulkTransactionRes
             errors=["No transactions provided"]
         )
     
+    labels = [f"Line {n}" for n in line_numbers] if line_numbers else [f"Transaction {i}" for i in range(len(transactions))]
+
     # Pre-validate transactions
     valid_transactions = []
+    valid_labels = []
     pre_validation_errors = []
     
     for i, transaction in enumerate(transactions):
         if not transaction.user_id or not transaction.acc_id:
-            pre_validation_errors.append(f"Transaction {i}: Missing required user_id or acc_id")
+            pre_validation_errors.append(f"{labels[i]}: Missing required user_id or acc_id")
             continue
         
         if not transaction.transaction_time:
-            pre_validation_errors.append(f"Transaction {i}: Missing required transaction_time")
+            pre_validation_errors.append(f"{labels[i]}: Missing required transaction_time")
             continue
             
         if transaction.amount is None:
-            pre_validation_errors.append(f"Transaction {i}: Missing required amount")
+            pre_validation_errors.append(f"{labels[i]}: Missing required amount")
             continue
         
         if not transaction.reference_id:
-            pre_validation_errors.append(f"Transaction {i}: Missing required reference_id")
+            pre_validation_errors.append(f"{labels[i]}: Missing required reference_id")
             continue
             
         if not _validate_transaction_amount_sign(transaction):
-            pre_validation_errors.append(f"Transaction {i}: Amount sign doesn't match transaction type")
+            pre_validation_errors.append(f"{labels[i]}: Amount sign doesn't match transaction type")
             continue
             
         valid_transactions.append(transaction)
+        valid_labels.append(labels[i])
     
     if not valid_transactions:
         logger.warning("No valid transactions found after pre-validation")
@@ -136,26 +251,202 @@ def bulk_add_transactions(transactions: List[Transaction]) -> BulkTransactionRes
         )
     
     # Perform bulk insert
-    inserted_ids, db_errors = transactions_repo.bulk_insert_transactions(valid_transactions)
+    if mode == BulkInsertMode.COPY:
+        inserted_ids, db_errors = transactions_repo.copy_insert_transactions(valid_transactions)
+    else:
+        inserted_ids, db_errors = transactions_repo.bulk_insert_transactions(valid_transactions)
+    # The repository numbers rows within valid_transactions; map them back to the caller's rows
+    db_errors = [_relabel_row_error(error, valid_labels) for error in db_errors]
     
+    if inserted_ids:
+        bump_table_version("transactions")
+
     # Combine all errors
     all_errors = pre_validation_errors + db_errors
     
-    # Since we use ON CONFLICT DO NOTHING with execute_batch, we don't get inserted_ids
-    # We consider all valid transactions as successfully processed if no DB errors occurred
+    # Rows skipped by ON CONFLICT DO NOTHING are absent from inserted_ids
     if db_errors:
         success_count = 0
         failure_count = len(transactions)
+        duplicate_count = 0
     else:
-        success_count = len(valid_transactions)
+        success_count = len(inserted_ids)
         failure_count = len(pre_validation_errors)
+        duplicate_count = len(valid_transactions) - len(inserted_ids)
     
-    logger.info(f"Bulk transaction insert completed: {success_count} processed, {failure_count} failed validation")
+    logger.info(f"Bulk transaction insert completed: {success_count} inserted, {duplicate_count} duplicates skipped, {failure_count} failed")
     
     return BulkTransactionResponse(
         success_count=success_count,
         failure_count=failure_count,
+        duplicate_count=duplicate_count,
         total_processed=len(transactions),
-        inserted_ids=inserted_ids,  # Will be empty list
+        inserted_ids=inserted_ids,
         errors=all_errors if all_errors else None
     )
+
+def _relabel_row_error(error: str, labels: List[str]) -> str:
+    """Replace a leading 'Transaction <i>:' in a repository error with labels[i]."""
+    match = re.match(r"Transaction (\d+):", error)
+    if not match or int(match.group(1)) >= len(labels):
+        return error
+    return labels[int(match.group(1))] + error[match.end() - 1:]
+
+def _decompress(body: bytes, content_encoding: Optional[str]) -> bytes:
+    """Undo gzip/deflate Content-Encoding, refusing bodies that inflate past the size limit."""
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return body
+    if encoding not in ("gzip", "deflate"):
+        raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+
+    wbits = 16 + zlib.MAX_WBITS if encoding == "gzip" else zlib.MAX_WBITS
+    decompressor = zlib.decompressobj(wbits)
+    try:
+        raw = decompressor.decompress(body, COLUMNAR_MAX_DECOMPRESSED_BYTES)
+    except zlib.error as e:
+        raise ValueError(f"Invalid {encoding} body: {e}")
+    if decompressor.unconsumed_tail:
+        raise ValueError(f"Decompressed body exceeds {COLUMNAR_MAX_DECOMPRESSED_BYTES} bytes")
+    return raw
+
+def decode_columnar_transactions(body: bytes, content_encoding: Optional[str] = None) -> List[Transaction]:
+    """
+    Decode a columnar bulk payload into Transactions.
+
+    The body is a JSON object {"columns": {field: [values...]}, "constants": {field: value}},
+    optionally gzip/deflate compressed. Field names are sent once rather than per row
+    and constants apply to every row; the rows are then validated as one batch.
+    Raises ValueError describing the first problem found.
+    """
+    try:
+        document = json.loads(_decompress(body, content_encoding), parse_float=Decimal)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid columnar payload: {e}")
+    if not isinstance(document, dict) or not isinstance(document.get("columns"), dict):
+        raise ValueError("Columnar payload must be an object with a 'columns' object")
+
+    columns: Dict[str, Any] = document["columns"]
+    constants: Dict[str, Any] = document.get("constants") or {}
+    if not isinstance(constants, dict):
+        raise ValueError("'constants' must be an object")
+
+    unknown = sorted((set(columns) | set(constants)) - set(Transaction.model_fields))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    overlap = sorted(set(columns) & set(constants))
+    if overlap:
+        raise ValueError(f"Fields sent as both column and constant: {', '.join(overlap)}")
+    if not all(isinstance(values, list) for values in columns.values()):
+        raise ValueError("Every column must be a list")
+    if len({len(values) for values in columns.values()}) > 1:
+        raise ValueError("Every column must have the same length")
+
+    names = list(columns)
+    rows = [{**constants, **dict(zip(names, values))} for values in zip(*columns.values())]
+    try:
+        return _TRANSACTION_LIST_ADAPTER.validate_python(rows)
+    except ValidationError as e:
+        error = e.errors()[0]
+        index, *field = error["loc"]
+        raise ValueError(f"Transaction {index}: {'.'.join(str(part) for part in field)}: {error['msg']}")
+
+async def _iter_ndjson_lines(body: AsyncIterator[bytes], max_line_bytes: int = STREAM_MAX_LINE_BYTES) -> AsyncIterator[bytes]:
+    """
+    Split a streamed request body into NDJSON lines as the bytes arrive.
+    Raises ValueError if a single line grows beyond max_line_bytes.
+    """
+    buffer = b""
+    async for block in body:
+        buffer += block
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"NDJSON line exceeds {max_line_bytes} bytes")
+    if buffer:
+        yield buffer
+
+async def _insert_stream_chunk(
+    chunk_index: int,
+    first_line: int,
+    last_line: int,
+    transactions: List[Transaction],
+    line_numbers: List[int],
+    parse_errors: List[str],
+    mode: BulkInsertMode,
+) -> BulkChunkSummary:
+    """Insert one chunk of parsed transactions off the event loop and summarise it."""
+    if transactions:
+        result = await run_in_threadpool(bulk_add_transactions, transactions, mode, line_numbers)
+    else:
+        result = BulkTransactionResponse(success_count=0, failure_count=0, total_processed=0, inserted_ids=[])
+
+    errors = parse_errors + (result.errors or [])
+    return BulkChunkSummary(
+        chunk_index=chunk_index,
+        first_line=first_line,
+        last_line=last_line,
+        success_count=result.success_count,
+        failure_count=result.failure_count + len(parse_errors),
+        duplicate_count=result.duplicate_count,
+        inserted_ids=result.inserted_ids,
+        errors=errors if errors else None,
+    )
+
+async def stream_add_transactions(
+    body: AsyncIterator[bytes],
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    mode: BulkInsertMode = BulkInsertMode.VALUES,
+) -> BulkStreamResponse:
+    """
+    Ingest an NDJSON stream of transactions (one JSON object per line).
+    Lines are validated as they arrive and inserted every `chunk_size` lines, so only
+    one chunk is held in memory. Chunks already inserted stay committed if the stream
+    is aborted part-way; the abort reason is returned in `error`.
+    """
+    chunks: List[BulkChunkSummary] = []
+    pending: List[Transaction] = []
+    pending_lines: List[int] = []
+    parse_errors: List[str] = []
+    first_line = 1
+    line_no = 0
+    stream_error = None
+
+    try:
+        async for raw_line in _iter_ndjson_lines(body, STREAM_MAX_LINE_BYTES):
+            line_no += 1
+            if not raw_line.strip():
+                continue
+            try:
+                pending.append(Transaction.model_validate_json(raw_line))
+                pending_lines.append(line_no)
+            except ValidationError as e:
+                error = e.errors()[0]
+                field = ".".join(str(part) for part in error["loc"])
+                parse_errors.append(f"Line {line_no}: {field + ': ' if field else ''}{error['msg']}")
+
+            if len(pending) + len(parse_errors) >= chunk_size:
+                chunks.append(await _insert_stream_chunk(len(chunks), first_line, line_no, pending, pending_lines, parse_errors, mode))
+                pending, pending_lines, parse_errors = [], [], []
+                first_line = line_no + 1
+    except ValueError as e:
+        logger.warning(f"Aborting transaction stream at line {line_no + 1}: {e}")
+        stream_error = f"Line {line_no + 1}: {e}"
+
+    if pending or parse_errors:
+        chunks.append(await _insert_stream_chunk(len(chunks), first_line, line_no, pending, pending_lines, parse_errors, mode))
+
+    success_count = sum(c.success_count for c in chunks)
+    failure_count = sum(c.failure_count for c in chunks)
+    duplicate_count = sum(c.duplicate_count for c in chunks)
+    logger.info(f"Streamed {len(chunks)} chunks: {success_count} inserted, {duplicate_count} duplicates, {failure_count} failed")
+
+    return BulkStreamResponse(
+        success_count=success_count,
+        failure_count=failure_count,
+        duplicate_count=duplicate_count,
+        total_processed=success_count + failure_count + duplicate_count,
+        chunks=chunks,
+        error=stream_error,
+    )
@@ -2,10 +2,30 @@ from typing import Optional, Dict
 import re
 
 from utils.logger import logger
+from utils.cache import get_cache
 from utils.security import hash_password, verify_password
 from models.user import UserCreate, UserAuth
 import repositories.users_repository as users_repository
 
+# Active user records by id/username/email; every write below drops that user's entries
+_user_cache = get_cache("users")
+
+
+def _user_keys(user_id: int) -> Optional[Dict]:
+    """
+    The user's current record, cached or read by primary key, for _invalidate_user.
+    Read it before the write: after a deactivation or email change the old keys are gone.
+    """
+    return _user_cache.get(("id", user_id)) or users_repository.get_user_by_id(user_id)
+
+
+def _invalidate_user(user_id: int, user: Optional[Dict]) -> None:
+    """Drop one user's cache entries under all three keys (id, username, email)."""
+    _user_cache.invalidate(("id", user_id))
+    if user:
+        _user_cache.invalidate(("username", user["username"]))
+        _user_cache.invalidate(("email", user["email"]))
+
 def get_user_by_id(user_id: int) -> Optional[Dict]:
     """
     Fetches a user by their ID.
@@ -20,7 +40,7 @@ def get_user_by_id(user_id: int) -> Optional[Dict]:
         logger.warning(f"Invalid user_id: {user_id}")
         return None
 
-    return users_repository.get_user_by_id(user_id)
+    return _user_cache.get_or_load(("id", user_id), lambda: users_repository.get_user_by_id(user_id))
 
 
 def get_user_by_username(username: str) -> Optional[Dict]:
@@ -37,7 +57,8 @@ def get_user_by_username(username: str) -> Optional[Dict]:
         logger.warning("Empty username provided.")
         return None
 
-    return users_repository.get_user_by_username(username.strip())
+    username = username.strip()
+    return _user_cache.get_or_load(("username", username), lambda: users_repository.get_user_by_username(username))
 
 
 def get_user_by_email(email: str) -> Optional[Dict]:
@@ -54,7 +75,8 @@ def get_user_by_email(email: str) -> Optional[Dict]:
         logger.warning(f"Invalid email format: {email}")
         return None
 
-    return users_repository.get_user_by_email(email.lower())
+    email = email.lower()
+    return _user_cache.get_or_load(("email", email), lambda: users_repository.get_user_by_email(email))
 
 
 def create_user(user_data: UserCreate) -> Optional[int]:
@@ -92,7 +114,10 @@ def update_last_login(user_id: int) -> bool:
     Returns:
         bool: True if updated, False otherwise.
     """
-    return users_repository.update_last_login(user_id)
+    user = _user_keys(user_id)
+    updated = users_repository.update_last_login(user_id)
+    _invalidate_user(user_id, user)
+    return updated
 
 
 def update_email(user_id: int, email: str) -> bool:
@@ -110,7 +135,10 @@ def update_email(user_id: int, email: str) -> bool:
         logger.warning(f"Invalid email: {email}")
         return False
 
-    return users_repository.update_email(user_id, email.lower())
+    user = _user_keys(user_id)
+    updated = users_repository.update_email(user_id, email.lower())
+    _invalidate_user(user_id, user)
+    return updated
 
 
 def update_password(user_id: int, password: str) -> bool:
@@ -129,7 +157,10 @@ def update_password(user_id: int, password: str) -> bool:
         return False
 
     hashed_pwd = hash_password(password)
-    return users_repository.update_password(user_id, hashed_pwd)
+    user = _user_keys(user_id)
+    updated = users_repository.update_password(user_id, hashed_pwd)
+    _invalidate_user(user_id, user)
+    return updated
 
 
 def deactivate_user(user_id: int) -> bool:
@@ -142,7 +173,10 @@ def deactivate_user(user_id: int) -> bool:
     Returns:
         bool: True if deactivated, False otherwise.
     """
-    return users_repository.deactivate_user(user_id)
+    user = _user_keys(user_id)
+    deactivated = users_repository.deactivate_user(user_id)
+    _invalidate_user(user_id, user)
+    return deactivated
 
 def is_valid_email(email: str) -> bool:
     """
@@ -0,0 +1,56 @@
+"""Tests for analytics API endpoints."""
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from decimal import Decimal
+from datetime import date
+
+from app import app
+from models.analytics import SpendingBucket, SpendingGroupBy, SpendingPeriod, SpendingReport
+
+client = TestClient(app)
+
+
+class TestAnalyticsAPI:
+    """Test cases for analytics API endpoints."""
+
+    @patch('services.analytics_service.fetch_spending_report')
+    def test_get_spending_success(self, mock_fetch_report):
+        """Test the report is returned with parsed query parameters."""
+        # Setup mock
+        mock_fetch_report.return_value = SpendingReport(
+            user_id=1,
+            group_by=SpendingGroupBy.TAG,
+            period=SpendingPeriod.WEEK,
+            start_date=date(2025, 1, 1),
+            total_spending=Decimal("300.25"),
+            total_income=Decimal("0"),
+            buckets=[SpendingBucket(period_start=date(2025, 1, 6), group_id=2, group_name="Groceries",
+                                    spending=Decimal("300.25"), income=Decimal("0"), transaction_count=3)],
+        )
+
+        # Execute
+        response = client.get("/analytics/1/spending?group_by=tag&period=week&start_date=2025-01-01")
+
+        # Assertions
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_spending"] == "300.25"
+        assert data["buckets"][0]["group_name"] == "Groceries"
+        mock_fetch_report.assert_called_once_with(1, SpendingGroupBy.TAG, SpendingPeriod.WEEK, date(2025, 1, 1), None)
+
+    @patch('services.analytics_service.fetch_spending_report')
+    def test_get_spending_invalid_range(self, mock_fetch_report):
+        """Test service validation errors map to 400."""
+        mock_fetch_report.side_effect = ValueError("start_date must not be after end_date")
+
+        response = client.get("/analytics/1/spending?start_date=2025-02-01&end_date=2025-01-01")
+
+        assert response.status_code == 400
+
+    def test_get_spending_unknown_grouping(self):
+        """Test unsupported group_by values are rejected."""
+        response = client.get("/analytics/1/spending?group_by=merchant")
+
+        assert response.status_code == 422
@@ -0,0 +1,91 @@
+"""Tests for conditional GETs on read-mostly reference endpoints."""
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app import app
+from utils.etag import bump_table_version, table_etag
+
+client = TestClient(app)
+
+
+class TestReferenceETagAPI:
+    """Test cases for ETag / If-None-Match handling."""
+
+    @patch('services.banks_service.fetch_all_banks')
+    def test_get_all_banks_sends_etag(self, mock_fetch):
+        """Test the list response carries a weak ETag, shared by every content coding."""
+        # Setup mock
+        mock_fetch.return_value = [[1, "HDFC"]]
+
+        # Execute
+        response = client.get("/banks/")
+
+        # Assertions
+        assert response.status_code == 200
+        assert response.json() == [[1, "HDFC"]]
+        assert response.headers["etag"].startswith('W/"')
+
+    @patch('services.tag_rules_service.fetch_all_tagging_rules')
+    def test_get_all_rules_not_modified(self, mock_fetch):
+        """Test a matching If-None-Match returns 304 without loading the rules."""
+        mock_fetch.return_value = [{"rule_id": 1, "keyword": "swiggy", "tag_name": "Food", "tag_id": 2}]
+        etag = client.get("/tagging_rules/").headers["etag"]
+        mock_fetch.reset_mock()
+
+        response = client.get("/tagging_rules/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        mock_fetch.assert_not_called()
+
+    @patch('services.tag_rules_service.fetch_all_tagging_rules')
+    def test_get_all_rules_after_write(self, mock_fetch):
+        """Test a write to a dependent table changes the ETag."""
+        mock_fetch.return_value = []
+        etag = client.get("/tagging_rules/").headers["etag"]
+
+        bump_table_version("tags")
+        response = client.get("/tagging_rules/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    @patch('services.categories_service.fetch_all_categories')
+    def test_get_all_categories_weak_validator(self, mock_fetch):
+        """Test If-None-Match uses weak comparison."""
+        mock_fetch.return_value = []
+        etag = client.get("/categories/").headers["etag"]
+
+        response = client.get("/categories/", headers={"If-None-Match": f'"other", {etag.removeprefix("W/")}'})
+
+        assert response.status_code == 304
+
+    @patch('utils.etag.table_versions_repo.get_table_versions')
+    @patch('services.banks_service.fetch_all_banks')
+    def test_etag_follows_database_versions(self, mock_fetch, mock_get_versions):
+        """Test the ETag comes from the database write versions, so writes from any process change it."""
+        mock_fetch.return_value = [[1, "HDFC"]]
+        mock_get_versions.return_value = {"banks": 4}
+        etag = client.get("/banks/").headers["etag"]
+        assert etag == 'W/"banks.4"'
+
+        # A write made by another worker or cli.py bumps only the database version
+        mock_get_versions.return_value = {"banks": 5}
+        response = client.get("/banks/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] == 'W/"banks.5"'
+
+    @patch('utils.etag.table_versions_repo.get_table_versions')
+    def test_only_reference_tables_use_database_versions(self, mock_get_versions):
+        """Test tables without a version trigger keep using this process's counters."""
+        mock_get_versions.return_value = {"categories": 2}
+        etag = table_etag("categories", "category_targets")
+
+        bump_table_version("category_targets")
+
+        mock_get_versions.assert_called_with(["categories"])
+        assert etag.startswith('W/"categories.2-')
+        assert table_etag("categories", "category_targets") != etag
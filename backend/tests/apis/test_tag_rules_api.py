@@ -0,0 +1,57 @@
+"""Tests for tagging rule API endpoints."""
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app import app
+from models.tag_rule import RetagJob
+
+client = TestClient(app)
+
+
+class TestTagRulesAPI:
+    """Test cases for tagging rule API endpoints."""
+
+    @patch('services.tag_rules_service.run_retag_job')
+    @patch('services.tag_rules_service.queue_retag_after_rule_change')
+    @patch('services.tag_rules_service.create_tagging_rule')
+    def test_create_rule_schedules_retag(self, mock_create_rule, mock_queue_retag, mock_run_retag):
+        """Test creating a rule retags stored transactions in the background."""
+        # Setup mock
+        mock_create_rule.return_value = 12
+        mock_queue_retag.return_value = RetagJob(job_id="abc", created_at="2025-03-01T10:00:00")
+
+        # Execute
+        response = client.post("/tagging_rules/", json={"keyword": "swiggy", "tag_name": "Food"})
+
+        # Assertions
+        assert response.status_code == 201
+        assert response.json() == 12
+        mock_run_retag.assert_called_once_with("abc")
+
+    @patch('services.tag_rules_service.run_retag_job')
+    @patch('services.tag_rules_service.queue_retag_after_rule_change')
+    @patch('services.tag_rules_service.delete_tagging_rule')
+    def test_failed_delete_does_not_retag(self, mock_delete_rule, mock_queue_retag, mock_run_retag):
+        """Test no retag is queued when the rule does not exist."""
+        mock_delete_rule.return_value = False
+
+        response = client.delete("/tagging_rules/99")
+
+        assert response.status_code == 404
+        mock_queue_retag.assert_not_called()
+        mock_run_retag.assert_not_called()
+
+    @patch('services.tag_rules_service.run_retag_job')
+    @patch('services.tag_rules_service.queue_retag_after_rule_change')
+    @patch('services.tag_rules_service.delete_tagging_rule')
+    def test_delete_folded_into_active_retag(self, mock_delete_rule, mock_queue_retag, mock_run_retag):
+        """Test no extra job runs when an active retag will pick up the change."""
+        mock_delete_rule.return_value = True
+        mock_queue_retag.return_value = None
+
+        response = client.delete("/tagging_rules/3")
+
+        assert response.status_code == 204
+        mock_run_retag.assert_not_called()
@@ -1,5 +1,7 @@
 """Tests for Transaction API endpoints."""
 
+import gzip
+import json
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, ANY
@@ -7,7 +9,7 @@ from decimal import Decimal
 from datetime import datetime
 
 from app import app
-from models.transaction import Transaction, TransactionType, BulkTransactionRequest, BulkTransactionResponse
+from models.transaction import Transaction, TransactionType, BulkTransactionRequest, BulkTransactionResponse, TransactionPage, BulkInsertMode, BulkStreamResponse
 from tests.test_utils import TestDataFactory
 
 client = TestClient(app)
@@ -381,3 +383,152 @@ class TestTransactionsAPI:
         assert response.status_code == 422  # Pydantic validation error
         # The request fails validation before reaching our service
         mock_bulk_add.assert_not_called()
+    
+    @patch('services.transactions_service.search_transactions')
+    def test_search_transactions_success(self, mock_search):
+        """Test searching transactions passes the filters through."""
+        # Setup mock
+        mock_search.return_value = TransactionPage(
+            items=[TestDataFactory.create_test_transaction(transaction_id=1)],
+            next_cursor="abc",
+            total_count=10
+        )
+        
+        # Execute
+        response = client.get(
+            "/transactions/search",
+            params={"user_id": 1, "acc_id": 2, "type": "debit", "min_amount": "10", "end_date": "2024-01-31", "limit": 1, "include_total": True}
+        )
+        
+        # Assertions
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) == 1
+        assert data["next_cursor"] == "abc"
+        assert data["total_count"] == 10
+        filters, limit, cursor, include_total = mock_search.call_args[0]
+        assert filters.user_id == 1
+        assert filters.acc_id == 2
+        assert filters.type == TransactionType.DEBIT
+        assert filters.min_amount == Decimal("10")
+        assert limit == 1
+        assert cursor is None
+        assert include_total is True
+    
+    @patch('services.transactions_service.search_transactions')
+    def test_search_transactions_invalid_cursor(self, mock_search):
+        """Test service validation errors are returned as 400."""
+        # Setup mock
+        mock_search.side_effect = ValueError("Invalid cursor")
+        
+        # Execute
+        response = client.get("/transactions/search", params={"user_id": 1, "cursor": "garbage"})
+        
+        # Assertions
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+    
+    @patch('services.transactions_service.bulk_add_transactions')
+    def test_bulk_create_transactions_copy_mode_allows_large_batches(self, mock_bulk_add):
+        """Test mode=copy lifts the 1000 transaction limit."""
+        # Setup mock
+        mock_bulk_add.return_value = BulkTransactionResponse(
+            success_count=1001, failure_count=0, total_processed=1001, inserted_ids=[]
+        )
+        transactions = [
+            {
+                "transaction_time": "2023-01-01T12:00:00",
+                "amount": "-1.00",
+                "reference_id": f"TXN{i}",
+                "type": "debit",
+                "acc_id": 1,
+                "user_id": 1
+            }
+            for i in range(1001)
+        ]
+        
+        # Execute
+        response = client.post("/transactions/bulk?mode=copy", json={"transactions": transactions})
+        
+        # Assertions
+        assert response.status_code == 200
+        assert mock_bulk_add.call_args.kwargs["mode"] == BulkInsertMode.COPY
+    
+    @patch('services.transactions_service.stream_add_transactions')
+    def test_stream_bulk_create_transactions(self, mock_stream_add):
+        """Test the NDJSON endpoint hands the body stream to the service."""
+        # Setup mock
+        async def fake_stream_add(body, chunk_size, mode):
+            received = b"".join([block async for block in body])
+            assert received.count(b"\n") == 2
+            return BulkStreamResponse(
+                success_count=2, failure_count=0, duplicate_count=0, total_processed=2, chunks=[]
+            )
+        mock_stream_add.side_effect = fake_stream_add
+        body = b'{"a": 1}\n{"b": 2}\n'
+        
+        # Execute
+        response = client.post(
+            "/transactions/bulk/stream?chunk_size=500",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+        
+        # Assertions
+        assert response.status_code == 200
+        assert response.json()["success_count"] == 2
+        assert mock_stream_add.call_args[0][1] == 500
+    
+    @patch('services.transactions_service.stream_add_transactions')
+    def test_stream_bulk_create_transactions_empty_body(self, mock_stream_add):
+        """Test an empty stream is rejected."""
+        async def fake_stream_add(body, chunk_size, mode):
+            return BulkStreamResponse(success_count=0, failure_count=0, duplicate_count=0, total_processed=0, chunks=[])
+        mock_stream_add.side_effect = fake_stream_add
+        
+        response = client.post("/transactions/bulk/stream", content=b"")
+        
+        assert response.status_code == 400
+
+    @patch('services.transactions_service.bulk_add_transactions')
+    def test_bulk_create_transactions_columnar(self, mock_bulk_add):
+        """Test the bulk endpoint accepts a gzip columnar payload by content type."""
+        # Setup mock
+        mock_bulk_add.return_value = BulkTransactionResponse(
+            success_count=2, failure_count=0, total_processed=2, inserted_ids=[1, 2]
+        )
+        document = {
+            "columns": {
+                "transaction_time": ["2023-01-01T12:00:00", "2023-01-02T12:00:00"],
+                "amount": ["-100.50", "-20.00"],
+                "reference_id": ["TXN1", "TXN2"],
+            },
+            "constants": {"type": "debit", "acc_id": 1, "user_id": 1},
+        }
+        
+        # Execute
+        response = client.post(
+            "/transactions/bulk",
+            content=gzip.compress(json.dumps(document).encode()),
+            headers={
+                "Content-Type": "application/vnd.finance.transactions.columnar+json",
+                "Content-Encoding": "gzip",
+            },
+        )
+        
+        # Assertions
+        assert response.status_code == 200
+        transactions = mock_bulk_add.call_args[0][0]
+        assert [t.reference_id for t in transactions] == ["TXN1", "TXN2"]
+        assert transactions[0].amount == Decimal("-100.50")
+    
+    def test_bulk_create_transactions_columnar_invalid(self):
+        """Test a malformed columnar payload is rejected with 400."""
+        response = client.post(
+            "/transactions/bulk",
+            content=b'{"columns": {"amount": ["1"]}}',
+            headers={"Content-Type": "application/vnd.finance.transactions.columnar+json"},
+        )
+        
+        assert response.status_code == 400
+        assert "Field required" in response.json()["detail"]
@@ -8,6 +8,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pytest
 from tests.test_utils import TestDataFactory, MockDatabase
+from utils.cache import clear_all_caches
 
 
 @pytest.fixture(scope="session")
@@ -22,5 +23,20 @@ def mock_database():
     return MockDatabase()
 
 
+@pytest.fixture(autouse=True)
+def clear_reference_caches():
+    """Reference-data caches are process-wide; start every test with them empty."""
+    clear_all_caches()
+    yield
+    clear_all_caches()
+
+
+@pytest.fixture(autouse=True)
+def no_database_table_versions(monkeypatch):
+    """ETags and per-user cache keys fall back to in-process versions instead of querying the database; tests patch them to cover that path."""
+    monkeypatch.setattr("repositories.table_versions_repository.get_table_versions", lambda tables: None)
+    monkeypatch.setattr("repositories.rollups_repository.get_user_rollup_version", lambda user_id: None)
+
+
 # Add any global test configuration here
 pytest_plugins = []
\ No newline at end of file
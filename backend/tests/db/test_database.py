@@ -0,0 +1,180 @@
+"""Tests for the pooled database connection layer."""
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+import psycopg2
+from psycopg2 import pool as pg_pool
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+
+from db import database
+
+
+def _make_conn():
+    conn = MagicMock()
+    conn.closed = 0
+    conn.get_transaction_status.return_value = TRANSACTION_STATUS_IDLE
+    return conn
+
+
+@pytest.fixture
+def pool():
+    """ConnectionPool backed by a mocked ThreadedConnectionPool."""
+    with patch('db.database.pg_pool.ThreadedConnectionPool') as mock_pool_cls:
+        inner = MagicMock()
+        inner._pool = []
+        inner._used = {}
+        mock_pool_cls.return_value = inner
+        yield database.ConnectionPool("postgresql://test", min_size=1, max_size=2, timeout=0.01, healthcheck_interval=30)
+
+
+class TestConnectionPool:
+    """Test cases for ConnectionPool."""
+
+    def test_getconn_sets_cursor_factory(self, pool):
+        """Test checkout applies the requested cursor factory."""
+        conn = _make_conn()
+        pool._pool.getconn.return_value = conn
+
+        pooled = pool.getconn("factory")
+
+        assert conn.cursor_factory == "factory"
+        assert pool.stats()["in_use"] == 1
+        assert pool.stats()["checkouts"] == 1
+        pooled.close()
+
+    def test_close_returns_connection_to_pool(self, pool):
+        """Test close() gives the connection back instead of closing it."""
+        conn = _make_conn()
+        pool._pool.getconn.return_value = conn
+
+        pooled = pool.getconn()
+        pooled.close()
+        pooled.close()  # second close is a no-op
+
+        pool._pool.putconn.assert_called_once_with(conn, close=False)
+        conn.close.assert_not_called()
+        assert pool.stats()["in_use"] == 0
+
+    def test_release_rolls_back_open_transaction(self, pool):
+        """Test an open transaction is rolled back before reuse."""
+        conn = _make_conn()
+        conn.get_transaction_status.return_value = TRANSACTION_STATUS_INTRANS
+        pool._pool.getconn.return_value = conn
+
+        pool.getconn().close()
+
+        conn.rollback.assert_called_once()
+        assert conn.cursor_factory is None
+
+    def test_closed_connection_is_discarded_on_checkout(self, pool):
+        """Test broken connections are replaced on checkout."""
+        broken = _make_conn()
+        broken.closed = 1
+        healthy = _make_conn()
+        pool._pool.getconn.side_effect = [broken, healthy]
+
+        pooled = pool.getconn()
+
+        assert pooled._conn is healthy
+        pool._pool.putconn.assert_called_once_with(broken, close=True)
+        assert pool.stats()["discarded"] == 1
+
+    def test_stale_connection_is_pinged(self, pool):
+        """Test connections idle past the interval are health checked."""
+        conn = _make_conn()
+        conn.cursor.return_value.__enter__.return_value.execute.side_effect = psycopg2.OperationalError("gone")
+        fresh = _make_conn()
+        pool._pool.getconn.side_effect = [conn, fresh]
+        pool._last_used[id(conn)] = 0.0
+
+        pooled = pool.getconn()
+
+        assert pooled._conn is fresh
+        assert pool.stats()["discarded"] == 1
+
+    def test_getconn_times_out_when_exhausted(self, pool):
+        """Test checkout raises PoolError once every slot is in use."""
+        pool._pool.getconn.side_effect = [_make_conn(), _make_conn()]
+        pool.getconn()
+        pool.getconn()
+
+        with pytest.raises(pg_pool.PoolError):
+            pool.getconn()
+
+        stats = pool.stats()
+        assert stats["waits"] == 1
+        assert stats["timeouts"] == 1
+
+    def test_returned_connection_rejects_use(self, pool):
+        """Test a released proxy cannot be used again."""
+        pool._pool.getconn.return_value = _make_conn()
+        pooled = pool.getconn()
+        pooled.close()
+
+        assert pooled.closed == 1
+        with pytest.raises(psycopg2.InterfaceError):
+            pooled.cursor()
+
+
+    def test_attribute_assignment_reaches_connection(self, pool):
+        """Test setting attributes on the proxy sets them on the psycopg2 connection."""
+        conn = _make_conn()
+        pool._pool.getconn.return_value = conn
+        pooled = pool.getconn()
+
+        pooled.autocommit = True
+
+        assert conn.autocommit is True
+        assert "autocommit" not in vars(pooled)
+        pooled.close()
+        with pytest.raises(psycopg2.InterfaceError):
+            pooled.autocommit = False
+
+    def test_stats_track_open_and_idle_connections(self, pool):
+        """Test open/idle counts follow checkouts without reading the inner pool."""
+        pool._pool.getconn.side_effect = [_make_conn(), _make_conn()]
+
+        first = pool.getconn()
+        second = pool.getconn()
+        assert (pool.stats()["open"], pool.stats()["idle"]) == (2, 0)
+
+        first.close()
+        second.close()
+        # min_size is 1, so the second returned connection is closed by the pool
+        assert (pool.stats()["open"], pool.stats()["idle"]) == (1, 1)
+
+
+class TestDbConnection:
+    """Test cases for the db_connection context manager."""
+
+    @patch('db.database.get_connection')
+    def test_commits_on_success(self, mock_get_connection):
+        """Test the block's work is committed and the connection released."""
+        conn = MagicMock()
+        mock_get_connection.return_value = conn
+
+        with database.db_connection() as c:
+            assert c is conn
+
+        conn.commit.assert_called_once()
+        conn.close.assert_called_once()
+
+    @patch('db.database.get_connection')
+    def test_rolls_back_on_error(self, mock_get_connection):
+        """Test errors roll back and propagate."""
+        conn = MagicMock()
+        mock_get_connection.return_value = conn
+
+        with pytest.raises(ValueError):
+            with database.db_connection():
+                raise ValueError("boom")
+
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+        conn.close.assert_called_once()
+
+    def test_pool_stats_before_init(self):
+        """Test stats are reported without creating the pool."""
+        with patch('db.database._pool', None):
+            assert database.get_pool_stats() == {"initialized": False}
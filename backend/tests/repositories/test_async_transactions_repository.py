@@ -0,0 +1,73 @@
+"""Tests for the asyncpg-backed transactions repository."""
+
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import patch, AsyncMock
+from decimal import Decimal
+from datetime import datetime
+
+from models.transaction import TransactionType
+from repositories import async_transactions_repository
+
+
+def _connection_factory(conn):
+    @asynccontextmanager
+    async def _connection():
+        yield conn
+    return _connection
+
+
+def _row(transaction_id: int):
+    return {
+        'transaction_id': transaction_id,
+        'transaction_time': datetime.now(),
+        'description': 'Test transaction',
+        'old_description': None,
+        'amount': Decimal('-100.50'),
+        'reference_id': f'TXN{transaction_id}',
+        'type': 'debit',
+        'created_at': datetime.now(),
+        'modified_at': None,
+        'tag_id': 1,
+        'acc_id': 1,
+        'user_id': 1
+    }
+
+
+class TestAsyncTransactionsRepository:
+    """Test cases for async transactions repository."""
+
+    @pytest.mark.asyncio
+    async def test_get_transaction_by_id_success(self):
+        """Test fetching a transaction uses a positional parameter."""
+        conn = AsyncMock()
+        conn.fetchrow.return_value = _row(1)
+
+        with patch('repositories.async_transactions_repository.async_db_connection', _connection_factory(conn)):
+            result = await async_transactions_repository.get_transaction_by_id(1)
+
+        assert result.transaction_id == 1
+        assert result.type == TransactionType.DEBIT
+        conn.fetchrow.assert_awaited_once_with("SELECT * FROM transactions WHERE transaction_id = $1", 1)
+
+    @pytest.mark.asyncio
+    async def test_get_all_transaction_for_user_success(self):
+        """Test fetching all transactions for a user."""
+        conn = AsyncMock()
+        conn.fetch.return_value = [_row(1), _row(2)]
+
+        with patch('repositories.async_transactions_repository.async_db_connection', _connection_factory(conn)):
+            result = await async_transactions_repository.get_all_transaction_for_user(1)
+
+        assert [t.transaction_id for t in result] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_get_all_transaction_for_user_database_error(self):
+        """Test database errors return an empty list."""
+        conn = AsyncMock()
+        conn.fetch.side_effect = Exception("Database error")
+
+        with patch('repositories.async_transactions_repository.async_db_connection', _connection_factory(conn)):
+            result = await async_transactions_repository.get_all_transaction_for_user(1)
+
+        assert result == []
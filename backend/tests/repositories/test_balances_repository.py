@@ -0,0 +1,142 @@
+"""Tests for the account balance checkpoint repository."""
+
+import pytest
+from unittest.mock import patch, MagicMock
+from decimal import Decimal
+from datetime import date, datetime
+
+from models.balance import BalanceGranularity
+from repositories import balances_repository
+
+
+class TestBalancesRepository:
+    """Test cases for balances repository."""
+
+    def test_checkpoint_adjust_only_moves_later_checkpoints(self):
+        """Test a row shifts only checkpoints dated after it, by amount times delta."""
+        # Execute
+        sql = balances_repository.checkpoint_adjust_sql("changed")
+
+        # Assertions
+        assert "UPDATE account_balance_checkpoints AS cp" in sql
+        assert "changed.transaction_time < c.checkpoint_date" in sql
+        assert "SUM(changed.amount * changed.delta)" in sql
+        # Net-zero changes (retags, updates keeping amount/time/account) write nothing
+        assert "HAVING SUM(changed.amount * changed.delta) <> 0" in sql
+
+    def test_checkpoint_adjust_locks_rows_in_key_order(self):
+        """Test affected checkpoints are locked in (acc_id, checkpoint_date) order before the update."""
+        sql = balances_repository.checkpoint_adjust_sql("changed")
+
+        lock = sql.index("ORDER BY l.acc_id, l.checkpoint_date")
+        assert sql.index("FOR UPDATE", lock) < sql.index("GROUP BY 1, 2")
+
+    @patch('repositories.balances_repository.get_connection')
+    def test_get_account_balance_success(self, mock_get_connection):
+        """Test the balance is read from checkpoint plus delta."""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = {"acc_id": 1, "checkpoint_date": date(2025, 3, 1), "balance": Decimal("1500.00")}
+
+        # Execute
+        result = balances_repository.get_account_balance(1, datetime(2025, 3, 16))
+
+        # Assertions
+        assert result["balance"] == Decimal("1500.00")
+        query, params = mock_cursor.execute.call_args[0]
+        assert "FROM account_balance_checkpoints" in query
+        assert "ORDER BY checkpoint_date DESC" in query
+        assert params == {"acc_id": 1, "at": datetime(2025, 3, 16)}
+
+    @patch('repositories.balances_repository.get_connection')
+    def test_get_balance_series_uses_window_function(self, mock_get_connection):
+        """Test the series query is a running SUM over the requested range."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = {"acc_id": 1, "checkpoint_date": None, "balance": Decimal("100")}
+        mock_cursor.fetchall.return_value = [
+            {"point_time": date(2025, 3, 2), "transaction_id": None, "amount": Decimal("-40"), "transaction_count": 2, "balance": Decimal("60")},
+        ]
+
+        result = balances_repository.get_balance_series(1, date(2025, 3, 1), date(2025, 3, 31), BalanceGranularity.DAY)
+
+        assert result["balance"] == Decimal("100")
+        assert result["points"][0]["balance"] == Decimal("60")
+        series_sql, params = mock_cursor.execute.call_args[0]
+        assert "SUM(daily.amount) OVER (ORDER BY daily.day)" in series_sql
+        assert params["end"] == date(2025, 4, 1)
+
+    @patch('repositories.balances_repository.get_connection')
+    def test_get_balance_series_unknown_account(self, mock_get_connection):
+        """Test a missing account returns None without running the series query."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = None
+
+        result = balances_repository.get_balance_series(99, date(2025, 3, 1), date(2025, 3, 31), BalanceGranularity.TRANSACTION)
+
+        assert result is None
+        assert mock_cursor.execute.call_count == 1
+
+    @patch('repositories.balances_repository.get_connection')
+    def test_rebuild_balance_checkpoints_one_account(self, mock_get_connection):
+        """Test a per-account rebuild clears and refills only that account."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.rowcount = 12
+
+        result = balances_repository.rebuild_balance_checkpoints(3)
+
+        assert result == 12
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert "CREATE TABLE IF NOT EXISTS account_balance_checkpoints" in statements[0]
+        assert statements[2] == "DELETE FROM account_balance_checkpoints WHERE acc_id = %(acc_id)s"
+        assert "generate_series" in statements[3]
+        mock_conn.commit.assert_called_once()
+
+    @patch('repositories.balances_repository.get_connection')
+    def test_advance_balance_checkpoints_appends_missing_months(self, mock_get_connection):
+        """Test missing months are inserted under the table lock, carried forward from the latest checkpoint."""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (True,)
+        mock_cursor.rowcount = 2
+
+        # Execute
+        result = balances_repository.advance_balance_checkpoints()
+
+        # Assertions
+        assert result == 2
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert statements[1] == "LOCK TABLE account_balance_checkpoints IN EXCLUSIVE MODE"
+        assert "m.net_total + COALESCE" in statements[2]
+        assert "t.transaction_time >= m.from_date AND t.transaction_time < m.checkpoint_date" in statements[2]
+        assert "ON CONFLICT (acc_id, checkpoint_date) DO NOTHING" in statements[2]
+        mock_conn.commit.assert_called_once()
+
+    @patch('repositories.balances_repository.get_connection')
+    def test_advance_balance_checkpoints_noop_when_current(self, mock_get_connection):
+        """Test nothing is locked or written when every account already has this month's checkpoint."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (False,)
+
+        result = balances_repository.advance_balance_checkpoints()
+
+        assert result == 0
+        assert mock_cursor.execute.call_count == 1
+        mock_conn.commit.assert_not_called()
@@ -0,0 +1,56 @@
+"""Tests for the category targets repository."""
+
+import pytest
+from unittest.mock import patch, MagicMock
+from datetime import date
+
+from repositories import category_targets_repository
+
+
+class TestCategoryTargetsRepository:
+    """Test cases for budget evaluation queries."""
+
+    @patch('repositories.category_targets_repository.get_connection')
+    def test_budget_evaluation_reads_rollups_for_whole_months(self, mock_get_connection):
+        """Test a whole-month period is summed from the monthly rollups."""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = []
+
+        # Execute
+        result = category_targets_repository.get_budget_evaluation(1, date(2024, 3, 1), date(2024, 3, 31))
+
+        # Assertions
+        assert result == []
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "FROM transaction_monthly_rollups r" in sql
+        assert "FROM transactions t" not in sql
+        assert params == {"user_id": 1, "start": date(2024, 3, 1), "end": date(2024, 4, 1)}
+
+    @patch('repositories.category_targets_repository.get_connection')
+    def test_budget_evaluation_scans_transactions_for_partial_months(self, mock_get_connection):
+        """Test a period that splits a month falls back to the transaction rows."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = []
+
+        category_targets_repository.get_budget_evaluation(1, date(2024, 3, 1), date(2024, 3, 15))
+
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "FROM transactions t" in sql
+        assert "transaction_monthly_rollups" not in sql
+        assert params["end"] == date(2024, 3, 16)
+
+    @patch('repositories.category_targets_repository.get_connection')
+    def test_budget_evaluation_database_error(self, mock_get_connection):
+        """Test a failed query returns None."""
+        mock_conn = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value.execute.side_effect = Exception("connection lost")
+
+        assert category_targets_repository.get_budget_evaluation(1, date(2024, 3, 1), date(2024, 3, 31)) is None
@@ -0,0 +1,116 @@
+"""Tests for the monthly rollup and analytics repositories."""
+
+import pytest
+from unittest.mock import patch, MagicMock
+from datetime import date
+
+from models.analytics import SpendingGroupBy, SpendingPeriod
+from repositories import rollups_repository, analytics_repository
+
+
+class TestRollupsRepository:
+    """Test cases for rollups repository."""
+
+    @patch('repositories.rollups_repository.get_connection')
+    def test_rebuild_monthly_rollups_all_users(self, mock_get_connection):
+        """Test a full rebuild creates, locks, clears and refills the table in one transaction."""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.rowcount = 42
+
+        # Execute
+        result = rollups_repository.rebuild_monthly_rollups()
+
+        # Assertions
+        assert result == 42
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert "CREATE TABLE IF NOT EXISTS transaction_monthly_rollups" in statements[0]
+        assert statements[1] == "LOCK TABLE transaction_monthly_rollups IN EXCLUSIVE MODE"
+        assert statements[2] == "DELETE FROM transaction_monthly_rollups"
+        assert "FROM transactions t)" in statements[3]
+        mock_conn.commit.assert_called_once()
+
+    @patch('repositories.rollups_repository.get_connection')
+    def test_rebuild_monthly_rollups_one_user(self, mock_get_connection):
+        """Test a per-user rebuild only touches that user's rows."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        rollups_repository.rebuild_monthly_rollups(7)
+
+        delete_sql, delete_params = mock_cursor.execute.call_args_list[2][0]
+        refill_sql, refill_params = mock_cursor.execute.call_args_list[3][0]
+        assert "WHERE user_id = %(user_id)s" in delete_sql
+        assert "WHERE t.user_id = %(user_id)s" in refill_sql
+        assert delete_params == refill_params == {"user_id": 7}
+
+    @patch('repositories.rollups_repository.get_connection')
+    def test_rebuild_monthly_rollups_database_error(self, mock_get_connection):
+        """Test a failed rebuild rolls back and returns None."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.execute.side_effect = Exception("lock timeout")
+
+        assert rollups_repository.rebuild_monthly_rollups() is None
+        mock_conn.rollback.assert_called_once()
+
+    @patch('repositories.rollups_repository.get_connection')
+    def test_ensure_rollup_table_reports_creation(self, mock_get_connection):
+        """Test the table is created idempotently and a missing table is reported."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (True,)
+
+        assert rollups_repository.ensure_rollup_table() is True
+        ddl = mock_cursor.execute.call_args_list[1][0][0]
+        assert "CREATE TABLE IF NOT EXISTS transaction_monthly_rollups" in ddl
+        assert "(COALESCE(tag_id, 0))" in ddl
+        assert "NULLS NOT DISTINCT" not in ddl
+        mock_conn.commit.assert_called_once()
+
+
+class TestAnalyticsRepository:
+    """Test cases for analytics repository."""
+
+    @patch('repositories.analytics_repository.get_connection')
+    def test_whole_month_reports_read_rollups(self, mock_get_connection):
+        """Test monthly reports over whole months do not scan transactions."""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = []
+
+        # Execute
+        analytics_repository.get_spending_buckets(1, SpendingGroupBy.TAG, SpendingPeriod.MONTH, date(2025, 1, 1), date(2025, 3, 31))
+
+        # Assertions
+        query, params = mock_cursor.execute.call_args[0]
+        assert "FROM transaction_monthly_rollups t" in query
+        assert params == {"user_id": 1, "start": date(2025, 1, 1), "end": date(2025, 3, 1)}
+
+    @patch('repositories.analytics_repository.get_connection')
+    def test_partial_month_reports_scan_transactions(self, mock_get_connection):
+        """Test ranges that split a month fall back to transactions."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = []
+
+        analytics_repository.get_spending_buckets(1, SpendingGroupBy.TAG, SpendingPeriod.MONTH, date(2025, 1, 15), None)
+
+        query, params = mock_cursor.execute.call_args[0]
+        assert "FROM transactions t" in query
+        assert "date_trunc(%(period)s" in query
+        assert params["period"] == "month"
@@ -1,11 +1,13 @@
 """Tests for Transaction repository functionality."""
 
 import pytest
+import psycopg2
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 from decimal import Decimal
 from datetime import datetime
 
-from models.transaction import Transaction, TransactionType
+from models.transaction import Transaction, TransactionType, TransactionSearchFilters
 from repositories import transactions_repository
 from tests.test_utils import TestDataFactory
 
@@ -168,6 +170,27 @@ class TestTransactionsRepository:
         mock_cursor.close.assert_called_once()
         mock_conn.close.assert_called_once()
     
+    @patch('repositories.transactions_repository.get_connection')
+    def test_insert_transaction_updates_derived_tables_in_same_statement(self, mock_get_connection):
+        """Test rollups and balance checkpoints are maintained by the insert statement."""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = [123]
+
+        # Execute
+        transactions_repository.insert_transaction(TestDataFactory.create_test_transaction())
+
+        # Assertions
+        query = mock_cursor.execute.call_args[0][0]
+        assert "WITH inserted AS" in query
+        assert "INSERT INTO transaction_monthly_rollups" in query
+        assert "UPDATE account_balance_checkpoints" in query
+        assert "1 AS delta FROM inserted" in query
+        mock_conn.commit.assert_called_once()
+    
     @patch('repositories.transactions_repository.get_connection')
     def test_insert_transaction_database_error(self, mock_get_connection):
         """Test handling database errors when inserting transaction."""
@@ -211,6 +234,26 @@ class TestTransactionsRepository:
         mock_cursor.execute.assert_called_once()
         mock_conn.commit.assert_called_once()
     
+    @patch('repositories.transactions_repository.get_connection')
+    def test_update_transaction_moves_rollup_totals(self, mock_get_connection):
+        """Test the old row is subtracted from and the new row added to the rollups."""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.rowcount = 1
+
+        # Execute
+        transactions_repository.update_transaction(5, TestDataFactory.create_test_transaction(tag_id=9))
+
+        # Assertions
+        query, params = mock_cursor.execute.call_args[0]
+        assert "-1 AS delta FROM old JOIN updated" in query
+        assert "1 AS delta FROM updated" in query
+        assert params["transaction_id"] == 5
+        assert params["tag_id"] == 9
+    
     @patch('repositories.transactions_repository.get_connection')
     def test_update_transaction_not_found(self, mock_get_connection):
         """Test updating a non-existent transaction."""
@@ -230,9 +273,58 @@ class TestTransactionsRepository:
         # Assertions
         assert result is False
     
-    @patch('repositories.transactions_repository.execute_batch')
     @patch('repositories.transactions_repository.get_connection')
-    def test_bulk_insert_transactions_success(self, mock_get_connection, mock_execute_batch):
+    def test_search_transactions_builds_filters(self, mock_get_connection):
+        """Test search pushes every filter and the keyset position into SQL."""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = []
+        mock_cursor.fetchone.return_value = {"total": 7}
+        
+        filters = TransactionSearchFilters(
+            user_id=1, acc_id=2, tag_id=3, type=TransactionType.CREDIT,
+            min_amount=Decimal("10"), max_amount=Decimal("20"),
+            start_date=datetime(2024, 1, 1).date(), end_date=datetime(2024, 1, 31).date(),
+            query="50%_off"
+        )
+        after = (datetime(2024, 1, 15), 99)
+        
+        # Execute
+        items, total = transactions_repository.search_transactions(filters, 51, after, include_total=True)
+        
+        # Assertions
+        assert items == []
+        assert total == 7
+        page_query, page_params = mock_cursor.execute.call_args_list[0][0]
+        assert "(transaction_time, transaction_id) < (%s, %s)" in page_query
+        assert "ORDER BY transaction_time DESC, transaction_id DESC" in page_query
+        assert page_params == (
+            1, 2, 3, "credit", Decimal("10"), Decimal("20"),
+            datetime(2024, 1, 1).date(), datetime(2024, 2, 1).date(),
+            "%50\\%\\_off%", datetime(2024, 1, 15), 99, 51
+        )
+        count_query, count_params = mock_cursor.execute.call_args_list[1][0]
+        assert "COUNT(*)" in count_query
+        assert "transaction_id) <" not in count_query
+        assert len(count_params) == 9
+        mock_conn.close.assert_called_once()
+    
+    @patch('repositories.transactions_repository.get_connection')
+    def test_search_transactions_database_error(self, mock_get_connection):
+        """Test search returns an empty page on database errors."""
+        mock_get_connection.side_effect = Exception("Database error")
+        
+        items, total = transactions_repository.search_transactions(TransactionSearchFilters(user_id=1), 10)
+        
+        assert items == []
+        assert total is None
+    
+    @patch('repositories.transactions_repository.execute_values')
+    @patch('repositories.transactions_repository.get_connection')
+    def test_bulk_insert_transactions_success(self, mock_get_connection, mock_execute_values):
         """Test successfully bulk inserting transactions."""
         # Setup mock
         mock_conn = MagicMock()
@@ -240,8 +332,8 @@ class TestTransactionsRepository:
         mock_get_connection.return_value = mock_conn
         mock_conn.cursor.return_value = mock_cursor
         
-        # Mock the returned transaction IDs
-        mock_cursor.fetchall.return_value = [(3,), (2,), (1,)]
+        # Mock the rows returned by RETURNING
+        mock_execute_values.return_value = [(1, "TXN123"), (2, "TXN124"), (3, "TXN125")]
         
         # Create test transactions
         transactions = [
@@ -254,23 +346,81 @@ class TestTransactionsRepository:
         inserted_ids, errors = transactions_repository.bulk_insert_transactions(transactions)
         
         # Assertions
-        assert len(inserted_ids) == 3
-        assert inserted_ids == [1, 2, 3]  # Should be reversed
+        assert inserted_ids == [1, 2, 3]
         assert len(errors) == 0
+        query = mock_execute_values.call_args[0][1]
+        assert "RETURNING transaction_id, reference_id" in query
+        assert mock_execute_values.call_args.kwargs["fetch"] is True
         
         # Verify database calls
         mock_conn.commit.assert_called_once()
     
-    @patch('repositories.transactions_repository.execute_batch')
+    @patch('repositories.transactions_repository.execute_values')
+    @patch('repositories.transactions_repository.get_connection')
+    def test_concurrent_bulk_inserts_lock_derived_rows_in_key_order(self, mock_get_connection, mock_execute_values):
+        """Test parallel chunk uploads each write their batch in one statement that locks rollups and checkpoints in key order."""
+        # Setup mock
+        connections = []
+        def new_connection():
+            conn = MagicMock()
+            connections.append(conn)
+            return conn
+        mock_get_connection.side_effect = new_connection
+        mock_execute_values.side_effect = lambda cursor, query, rows, page_size, fetch: [
+            (i, row[4]) for i, row in enumerate(rows)
+        ]
+        chunks = [
+            [TestDataFactory.create_test_transaction(reference_id=f"TXN{chunk}-{i}") for i in range(1500)]
+            for chunk in range(4)
+        ]
+
+        # Execute
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(transactions_repository.bulk_insert_transactions, chunks))
+
+        # Assertions
+        assert [len(ids) for ids, errors in results] == [1500] * 4
+        assert mock_execute_values.call_count == 4
+        for call in mock_execute_values.call_args_list:
+            query, rows = call[0][1], call[0][2]
+            assert call.kwargs["page_size"] == len(rows)
+            assert "ORDER BY 1, 2, 3, 4" in query
+            assert "ORDER BY l.acc_id, l.checkpoint_date" in query and "FOR UPDATE" in query
+        for conn in connections:
+            conn.commit.assert_called_once()
+            conn.close.assert_called_once()
+
+    @patch('repositories.transactions_repository.execute_values')
+    @patch('repositories.transactions_repository.get_connection')
+    def test_bulk_insert_transactions_skips_duplicates(self, mock_get_connection, mock_execute_values):
+        """Test rows dropped by ON CONFLICT are not reported as inserted."""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_execute_values.return_value = [(7, "TXN124")]
+        
+        transactions = [
+            TestDataFactory.create_test_transaction(reference_id="TXN123"),
+            TestDataFactory.create_test_transaction(reference_id="TXN124"),
+        ]
+        
+        # Execute
+        inserted_ids, errors = transactions_repository.bulk_insert_transactions(transactions)
+        
+        # Assertions
+        assert inserted_ids == [7]
+        assert errors == []
+    
+    @patch('repositories.transactions_repository.execute_values')
     @patch('repositories.transactions_repository.get_connection')
-    def test_bulk_insert_transactions_with_invalid_data(self, mock_get_connection, mock_execute_batch):
+    def test_bulk_insert_transactions_with_invalid_data(self, mock_get_connection, mock_execute_values):
         """Test bulk inserting with some invalid transactions."""
         # Setup mock
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_get_connection.return_value = mock_conn
         mock_conn.cursor.return_value = mock_cursor
-        mock_cursor.fetchall.return_value = [(1,)]
+        mock_execute_values.return_value = [(1, "TXN123")]
         
         # Create test transactions with one invalid
         transactions = [
@@ -295,4 +445,101 @@ class TestTransactionsRepository:
         
         # Assertions
         assert len(inserted_ids) == 0
-        assert len(errors) == 0
\ No newline at end of file
+        assert len(errors) == 0
+    
+    @patch('repositories.transactions_repository.get_connection')
+    def test_copy_insert_transactions_success(self, mock_get_connection):
+        """Test COPY ingestion stages rows and returns the inserted IDs."""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [(10, "TXN1")]
+        
+        transactions = [
+            TestDataFactory.create_test_transaction(reference_id="TXN1", description="Tab\there", tag_id=None),
+            TestDataFactory.create_test_transaction(reference_id="TXN2"),
+            TestDataFactory.create_test_transaction(reference_id="TXN3", user_id=None),  # Invalid
+        ]
+        
+        # Execute
+        inserted_ids, errors = transactions_repository.copy_insert_transactions(transactions)
+        
+        # Assertions
+        assert inserted_ids == [10]
+        assert len(errors) == 1
+        assert "Missing required user_id or acc_id" in errors[0]
+        copy_sql, buffer = mock_cursor.copy_expert.call_args[0]
+        assert copy_sql.startswith("COPY transactions_staging")
+        lines = buffer.getvalue().splitlines()
+        assert len(lines) == 2
+        fields = lines[0].split("\t")
+        assert fields[1] == "Tab\\there"
+        assert fields[6] == "\\N"
+        insert_sql = mock_cursor.execute.call_args_list[-1][0][0]
+        assert "ON CONFLICT ON CONSTRAINT unique_reference_per_account DO NOTHING" in insert_sql
+        mock_conn.commit.assert_called_once()
+    
+    @patch('repositories.transactions_repository.get_connection')
+    def test_copy_insert_transactions_database_error(self, mock_get_connection):
+        """Test COPY ingestion rolls back and reports database errors."""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.copy_expert.side_effect = psycopg2.Error("copy failed")
+        
+        # Execute
+        inserted_ids, errors = transactions_repository.copy_insert_transactions(
+            [TestDataFactory.create_test_transaction()]
+        )
+        
+        # Assertions
+        assert inserted_ids == []
+        assert "Database error" in errors[0]
+        mock_conn.rollback.assert_called_once()
+        mock_conn.close.assert_called_once()
+    
+    @patch('repositories.transactions_repository.get_connection')
+    def test_retag_transactions_batch_first_match_by_rule_id(self, mock_get_connection):
+        """Test retagging picks the lowest rule_id match and keeps rollups in step."""
+        # Setup mock
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (500, 12)
+        
+        # Execute
+        result = transactions_repository.retag_transactions_batch(1, 500, user_id=3)
+        
+        # Assertions
+        assert result == (500, 12)
+        query, params = mock_cursor.execute.call_args[0]
+        assert "strpos(upper(t.description), r.keyword) > 0" in query
+        assert "ORDER BY r.rule_id" in query
+        assert "AND t.user_id = %(user_id)s" in query
+        assert "INSERT INTO transaction_monthly_rollups" in query
+        assert "account_balance_checkpoints" not in query
+        assert params == {"first_id": 1, "last_id": 500, "user_id": 3, "clear_unmatched": False, "clear_tag_ids": []}
+        mock_conn.commit.assert_called_once()
+
+    @patch('repositories.transactions_repository.get_connection')
+    def test_retag_transactions_batch_clears_given_tags(self, mock_get_connection):
+        """Test unmatched rows lose a tag listed in clear_tag_ids while other unmatched tags stay."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (500, 3)
+
+        transactions_repository.retag_transactions_batch(1, 500, clear_tag_ids=[5])
+
+        query, params = mock_cursor.execute.call_args[0]
+        assert "new_tag_id IS NULL AND tag_id IS NOT NULL" in query
+        assert "tag_id = ANY(%(clear_tag_ids)s::integer[])" in query
+        assert params["clear_tag_ids"] == [5]
+        assert params["clear_unmatched"] is False
+
@@ -0,0 +1,137 @@
+"""Tests for the spending analytics service."""
+
+import pytest
+from unittest.mock import patch
+from decimal import Decimal
+from datetime import date
+
+from models.analytics import SpendingGroupBy, SpendingPeriod
+from services import analytics_service
+from utils.etag import bump_table_version
+
+
+def _bucket(**overrides):
+    row = {
+        "period_start": date(2025, 10, 1),
+        "group_id": 3,
+        "group_name": "Food",
+        "spending": Decimal("1250.50"),
+        "income": Decimal("0"),
+        "transaction_count": 4,
+    }
+    row.update(overrides)
+    return row
+
+
+class TestAnalyticsService:
+    """Test cases for analytics service."""
+
+    @patch('services.analytics_service.analytics_repo.get_spending_buckets')
+    def test_fetch_spending_report_totals(self, mock_get_buckets):
+        """Test buckets are returned with overall totals."""
+        # Setup mock
+        mock_get_buckets.return_value = [
+            _bucket(),
+            _bucket(group_id=None, group_name=None, spending=Decimal("49.50"), income=Decimal("5000"), transaction_count=2),
+        ]
+
+        # Execute
+        report = analytics_service.fetch_spending_report(1, SpendingGroupBy.CATEGORY, SpendingPeriod.MONTH)
+
+        # Assertions
+        assert report.total_spending == Decimal("1300.00")
+        assert report.total_income == Decimal("5000")
+        assert len(report.buckets) == 2
+        assert report.buckets[1].group_name is None
+        mock_get_buckets.assert_called_once_with(1, SpendingGroupBy.CATEGORY, SpendingPeriod.MONTH, None, None)
+
+    @patch('services.analytics_service.analytics_repo.get_spending_buckets')
+    def test_fetch_spending_report_is_cached_per_params(self, mock_get_buckets):
+        """Test repeated requests hit the cache and different params do not."""
+        mock_get_buckets.return_value = [_bucket()]
+
+        first = analytics_service.fetch_spending_report(1, SpendingGroupBy.TAG, SpendingPeriod.WEEK)
+        second = analytics_service.fetch_spending_report(1, SpendingGroupBy.TAG, SpendingPeriod.WEEK)
+        analytics_service.fetch_spending_report(1, SpendingGroupBy.TAG, SpendingPeriod.DAY)
+
+        assert first is second
+        assert mock_get_buckets.call_count == 2
+
+    @patch('services.analytics_service.analytics_repo.get_spending_buckets')
+    def test_transaction_writes_invalidate_cached_reports(self, mock_get_buckets):
+        """Test a transactions write makes the next request recompute."""
+        mock_get_buckets.return_value = [_bucket()]
+
+        analytics_service.fetch_spending_report(1)
+        bump_table_version("transactions")
+        analytics_service.fetch_spending_report(1)
+
+        assert mock_get_buckets.call_count == 2
+
+    @patch('services.analytics_service.analytics_repo.get_spending_buckets')
+    def test_account_renames_invalidate_cached_reports(self, mock_get_buckets):
+        """Test an accounts write recomputes reports, which carry account names."""
+        mock_get_buckets.return_value = [_bucket()]
+
+        analytics_service.fetch_spending_report(1, SpendingGroupBy.ACCOUNT)
+        bump_table_version("accounts")
+        analytics_service.fetch_spending_report(1, SpendingGroupBy.ACCOUNT)
+
+        assert mock_get_buckets.call_count == 2
+
+    @patch('utils.etag.rollups_repo.get_user_rollup_version')
+    @patch('services.analytics_service.analytics_repo.get_spending_buckets')
+    def test_reports_are_keyed_on_the_users_rollup_version(self, mock_get_buckets, mock_get_version):
+        """Test another user's writes leave a report cached while the user's own writes invalidate it."""
+        # Setup mock
+        mock_get_buckets.return_value = [_bucket()]
+        versions = {1: (3, 10, None), 2: (1, 1, None)}
+        mock_get_version.side_effect = lambda user_id: versions[user_id]
+
+        # Execute
+        analytics_service.fetch_spending_report(1)
+        versions[2] = (1, 2, None)
+        analytics_service.fetch_spending_report(1)
+        versions[1] = (3, 11, None)
+        analytics_service.fetch_spending_report(1)
+
+        # Assertions
+        assert mock_get_buckets.call_count == 2
+
+    @patch('services.analytics_service.analytics_repo.get_spending_buckets')
+    def test_failed_query_is_not_cached(self, mock_get_buckets):
+        """Test a repository failure returns None and is retried next time."""
+        mock_get_buckets.return_value = None
+
+        assert analytics_service.fetch_spending_report(1) is None
+        assert analytics_service.fetch_spending_report(1) is None
+        assert mock_get_buckets.call_count == 2
+
+    @patch('services.analytics_service.analytics_repo.get_spending_buckets')
+    def test_fetch_spending_report_invalid_range(self, mock_get_buckets):
+        """Test start_date after end_date is rejected."""
+        with pytest.raises(ValueError):
+            analytics_service.fetch_spending_report(1, start_date=date(2025, 2, 1), end_date=date(2025, 1, 1))
+        with pytest.raises(ValueError):
+            analytics_service.fetch_spending_report(0)
+        mock_get_buckets.assert_not_called()
+
+    @patch('services.analytics_service.rollups_repo.rebuild_monthly_rollups')
+    @patch('services.analytics_service.rollups_repo.ensure_rollup_table')
+    def test_ensure_monthly_rollups_backfills_new_table(self, mock_ensure_table, mock_rebuild):
+        """Test a newly created rollup table is backfilled and an existing one is left alone."""
+        # Setup mock
+        mock_ensure_table.return_value = True
+        mock_rebuild.return_value = 12
+
+        # Execute / Assertions
+        assert analytics_service.ensure_monthly_rollups() is True
+        mock_rebuild.assert_called_once_with(None)
+
+        mock_ensure_table.return_value = False
+        assert analytics_service.ensure_monthly_rollups() is True
+        mock_rebuild.assert_called_once()
+
+        mock_ensure_table.return_value = None
+        assert analytics_service.ensure_monthly_rollups() is False
+
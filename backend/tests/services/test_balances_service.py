@@ -0,0 +1,82 @@
+"""Tests for the account balance service."""
+
+import pytest
+from unittest.mock import patch
+from decimal import Decimal
+from datetime import date, datetime
+
+from models.balance import BalanceGranularity
+from services import balances_service
+
+
+class TestBalancesService:
+    """Test cases for balances service."""
+
+    @patch('services.balances_service.balances_repo.get_account_balance')
+    def test_fetch_account_balance_includes_whole_day(self, mock_get_balance):
+        """Test as_of is the closing balance, i.e. everything before the next midnight."""
+        # Setup mock
+        mock_get_balance.return_value = {"acc_id": 1, "checkpoint_date": date(2025, 3, 1), "balance": Decimal("2500.75")}
+
+        # Execute
+        result = balances_service.fetch_account_balance(1, date(2025, 3, 15))
+
+        # Assertions
+        assert result.balance == Decimal("2500.75")
+        assert result.as_of == date(2025, 3, 15)
+        mock_get_balance.assert_called_once_with(1, datetime(2025, 3, 16))
+
+    @patch('services.balances_service.balances_repo.get_account_balance')
+    def test_fetch_account_balance_not_found(self, mock_get_balance):
+        """Test an unknown account returns None."""
+        mock_get_balance.return_value = None
+
+        assert balances_service.fetch_account_balance(99) is None
+
+    @patch('services.balances_service.balances_repo.get_balance_series')
+    def test_fetch_balance_series_success(self, mock_get_series):
+        """Test the repository result becomes a BalanceSeries."""
+        mock_get_series.return_value = {
+            "acc_id": 1,
+            "checkpoint_date": date(2025, 3, 1),
+            "balance": Decimal("1000"),
+            "points": [
+                {"point_time": datetime(2025, 3, 5, 9, 30), "transaction_id": 11, "amount": Decimal("-200"),
+                 "transaction_count": 1, "balance": Decimal("800")},
+            ],
+        }
+
+        series = balances_service.fetch_balance_series(1, date(2025, 3, 1), date(2025, 3, 31), BalanceGranularity.TRANSACTION)
+
+        assert series.opening_balance == Decimal("1000")
+        assert series.points[0].point_time == datetime(2025, 3, 5, 9, 30)
+        assert series.points[0].balance == Decimal("800")
+
+    @patch('services.balances_service.balances_repo.get_balance_series')
+    def test_fetch_balance_series_invalid_range(self, mock_get_series):
+        """Test reversed ranges and bad account IDs are rejected."""
+        with pytest.raises(ValueError):
+            balances_service.fetch_balance_series(1, date(2025, 4, 1), date(2025, 3, 1))
+        with pytest.raises(ValueError):
+            balances_service.fetch_balance_series(0)
+        mock_get_series.assert_not_called()
+
+    @patch('services.balances_service.balances_repo.rebuild_balance_checkpoints')
+    @patch('services.balances_service.balances_repo.ensure_checkpoint_table')
+    def test_ensure_balance_checkpoints_backfills_new_table(self, mock_ensure_table, mock_rebuild):
+        """Test a newly created checkpoint table is backfilled and an existing one is left alone."""
+        # Setup mock
+        mock_ensure_table.return_value = True
+        mock_rebuild.return_value = 30
+
+        # Execute / Assertions
+        assert balances_service.ensure_balance_checkpoints() is True
+        mock_rebuild.assert_called_once_with(None)
+
+        mock_ensure_table.return_value = False
+        assert balances_service.ensure_balance_checkpoints() is True
+        mock_rebuild.assert_called_once()
+
+        mock_ensure_table.return_value = None
+        assert balances_service.ensure_balance_checkpoints() is False
+
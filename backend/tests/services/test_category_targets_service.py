@@ -0,0 +1,83 @@
+"""Tests for the category target budget evaluation."""
+
+import pytest
+from unittest.mock import patch
+from decimal import Decimal
+from datetime import date
+
+from models.category_target import CategoryTarget
+from services import category_targets_service
+
+
+def _row(**overrides):
+    row = {
+        "category_id": 2,
+        "category_name": "Food",
+        "target_percentage": 20.0,
+        "target_start_date": None,
+        "spending": Decimal("12000.00"),
+        "income": Decimal("50000.00"),
+        "actual_percentage": Decimal("24.00"),
+        "variance": Decimal("4.00"),
+    }
+    row.update(overrides)
+    return row
+
+
+class TestCategoryTargetsService:
+    """Test cases for category targets service."""
+
+    @patch('services.category_targets_service.category_target_repo.get_budget_evaluation')
+    def test_evaluate_budget_success(self, mock_get_evaluation):
+        """Test rows become per-category statuses with the period income."""
+        # Setup mock
+        mock_get_evaluation.return_value = [
+            _row(),
+            _row(category_id=5, category_name="Travel", target_percentage=None, spending=Decimal("800.00"),
+                 actual_percentage=Decimal("1.60"), variance=None),
+        ]
+
+        # Execute
+        evaluation = category_targets_service.evaluate_budget(1, date(2025, 3, 1), date(2025, 3, 31))
+
+        # Assertions
+        assert evaluation.income == Decimal("50000.00")
+        assert evaluation.categories[0].variance == 4.0
+        assert evaluation.categories[1].target_percentage is None
+        mock_get_evaluation.assert_called_once_with(1, date(2025, 3, 1), date(2025, 3, 31))
+
+    @patch('services.category_targets_service.category_target_repo.get_budget_evaluation')
+    def test_evaluate_budget_defaults_to_current_month(self, mock_get_evaluation):
+        """Test the period defaults to the whole current month."""
+        mock_get_evaluation.return_value = []
+
+        evaluation = category_targets_service.evaluate_budget(1)
+
+        start, end = mock_get_evaluation.call_args[0][1:]
+        assert start == date.today().replace(day=1)
+        assert end.month == start.month and (end.day >= 28)
+        assert evaluation.income == Decimal(0)
+
+    @patch('services.category_targets_service.category_target_repo.insert_category_target')
+    @patch('services.category_targets_service.category_target_repo.get_budget_evaluation')
+    def test_evaluate_budget_memoized_until_targets_change(self, mock_get_evaluation, mock_insert_target):
+        """Test a period is computed once and recomputed after a new target."""
+        mock_get_evaluation.return_value = [_row()]
+        mock_insert_target.return_value = 9
+
+        category_targets_service.evaluate_budget(1, date(2025, 3, 1), date(2025, 3, 31))
+        category_targets_service.evaluate_budget(1, date(2025, 3, 1), date(2025, 3, 31))
+        assert mock_get_evaluation.call_count == 1
+
+        category_targets_service.add_category_target(CategoryTarget(target_id=0, percentage=25, category_id=2, user_id=1))
+        category_targets_service.evaluate_budget(1, date(2025, 3, 1), date(2025, 3, 31))
+        assert mock_get_evaluation.call_count == 2
+
+    @patch('services.category_targets_service.category_target_repo.get_budget_evaluation')
+    def test_evaluate_budget_invalid_period(self, mock_get_evaluation):
+        """Test reversed periods and bad user IDs are rejected."""
+        with pytest.raises(ValueError):
+            category_targets_service.evaluate_budget(1, date(2025, 4, 1), date(2025, 3, 1))
+        with pytest.raises(ValueError):
+            category_targets_service.evaluate_budget(-1)
+        mock_get_evaluation.assert_not_called()
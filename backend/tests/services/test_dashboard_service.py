@@ -0,0 +1,73 @@
+"""Tests for Dashboard service functionality."""
+
+import pytest
+from unittest.mock import patch
+from decimal import Decimal
+from datetime import date
+
+from models.dashboard import DashboardSummary
+from services import dashboard_service
+
+
+class TestDashboardService:
+    """Test cases for dashboard service."""
+    
+    @pytest.mark.parametrize("today, expected", [
+        (date(2025, 10, 17), (date(2025, 10, 1), date(2025, 11, 1))),
+        (date(2025, 12, 31), (date(2025, 12, 1), date(2026, 1, 1))),
+    ])
+    def test_month_bounds(self, today, expected):
+        """Test month bounds roll over the year correctly."""
+        assert dashboard_service._month_bounds(today) == expected
+    
+    @patch('services.dashboard_service.dashboard_repo.get_dashboard_summary')
+    def test_fetch_dashboard_summary_success(self, mock_get_summary):
+        """Test the repository result is returned as a DashboardSummary."""
+        # Setup mock
+        mock_get_summary.return_value = {
+            "account_count": 1,
+            "transaction_count": 2,
+            "accounts": [{"acc_id": 1, "acc_name": "Savings", "bank_name": "HDFC", "currency": "INR", "balance": Decimal("1500.25")}],
+            "monthly_spending": Decimal("100.50"),
+            "monthly_income": Decimal("2000"),
+            "recent_transactions": [{
+                "transaction_id": 1,
+                "transaction_time": "2025-10-01T00:00:00",
+                "description": "Salary",
+                "amount": Decimal("2000"),
+                "reference_id": "REF1",
+                "type": "credit",
+                "acc_id": 1,
+                "user_id": 1
+            }]
+        }
+        
+        # Execute
+        result = dashboard_service.fetch_dashboard_summary(1, recent_limit=5)
+        
+        # Assertions
+        assert isinstance(result, DashboardSummary)
+        assert result.accounts[0].balance == Decimal("1500.25")
+        assert result.recent_transactions[0].reference_id == "REF1"
+        assert result.month_start.day == 1
+        user_id, month_start, month_end, recent_limit = mock_get_summary.call_args[0]
+        assert user_id == 1
+        assert month_start < month_end
+        assert recent_limit == 5
+    
+    @patch('services.dashboard_service.dashboard_repo.get_dashboard_summary')
+    def test_fetch_dashboard_summary_invalid_user(self, mock_get_summary):
+        """Test invalid user IDs return None without querying."""
+        assert dashboard_service.fetch_dashboard_summary(0) is None
+        mock_get_summary.assert_not_called()
+    
+    def test_fetch_dashboard_summary_invalid_limit(self):
+        """Test out-of-range recent limits are rejected."""
+        with pytest.raises(ValueError):
+            dashboard_service.fetch_dashboard_summary(1, recent_limit=1000)
+    
+    @patch('services.dashboard_service.dashboard_repo.get_dashboard_summary')
+    def test_fetch_dashboard_summary_repository_failure(self, mock_get_summary):
+        """Test repository failures return None."""
+        mock_get_summary.return_value = None
+        assert dashboard_service.fetch_dashboard_summary(1) is None
@@ -0,0 +1,248 @@
+"""Tests for the retag job and rule preview in the tagging rules service."""
+
+import pytest
+from unittest.mock import patch
+from datetime import datetime
+from decimal import Decimal
+
+from models.tag_rule import RetagJobStatus, TagRuleBase
+from services import tag_rules_service
+from utils.etag import bump_table_version
+
+
+@pytest.fixture(autouse=True)
+def clear_retag_jobs():
+    """Retag jobs are tracked process-wide; start every test without any."""
+    tag_rules_service._retag_jobs.clear()
+    tag_rules_service._retag_rerun_requested = False
+    tag_rules_service._retag_pending_clear_tag_ids.clear()
+    yield
+    tag_rules_service._retag_jobs.clear()
+    tag_rules_service._retag_rerun_requested = False
+    tag_rules_service._retag_pending_clear_tag_ids.clear()
+
+
+class TestRetagJobs:
+    """Test cases for retag jobs."""
+
+    @patch('services.tag_rules_service.transactions_repo.retag_transactions_batch')
+    @patch('services.tag_rules_service.transactions_repo.get_retag_scope')
+    def test_run_retag_job_in_batches(self, mock_get_scope, mock_retag_batch):
+        """Test the ID range is walked in batches and progress is accumulated."""
+        # Setup mock
+        mock_get_scope.return_value = (25, 1, 25)
+        mock_retag_batch.side_effect = [(10, 3), (10, 0), (5, 1)]
+
+        # Execute
+        job = tag_rules_service.start_retag_job(user_id=4)
+        tag_rules_service.run_retag_job(job.job_id, batch_size=10)
+
+        # Assertions
+        result = tag_rules_service.fetch_retag_job(job.job_id)
+        assert result.status == RetagJobStatus.COMPLETED
+        assert (result.total, result.processed, result.updated) == (25, 25, 4)
+        assert result.finished_at is not None
+        assert [c.args for c in mock_retag_batch.call_args_list] == [
+            (1, 10, 4, False, []), (11, 20, 4, False, []), (21, 30, 4, False, []),
+        ]
+
+    @patch('services.tag_rules_service.transactions_repo.retag_transactions_batch')
+    @patch('services.tag_rules_service.transactions_repo.get_retag_scope')
+    def test_run_retag_job_failure_is_reported(self, mock_get_scope, mock_retag_batch):
+        """Test a failed batch marks the job failed and keeps earlier progress."""
+        mock_get_scope.return_value = (20, 1, 20)
+        mock_retag_batch.side_effect = [(10, 2), None]
+
+        job = tag_rules_service.start_retag_job()
+        tag_rules_service.run_retag_job(job.job_id, batch_size=10)
+
+        result = tag_rules_service.fetch_retag_job(job.job_id)
+        assert result.status == RetagJobStatus.FAILED
+        assert result.processed == 10
+        assert "transaction_id 11" in result.error
+
+    @patch('services.tag_rules_service.transactions_repo.get_retag_scope')
+    def test_empty_scope_completes_immediately(self, mock_get_scope):
+        """Test a user without transactions completes without running batches."""
+        mock_get_scope.return_value = (0, None, None)
+
+        job = tag_rules_service.start_retag_job(user_id=9)
+        tag_rules_service.run_retag_job(job.job_id)
+
+        assert tag_rules_service.fetch_retag_job(job.job_id).status == RetagJobStatus.COMPLETED
+
+    def test_only_one_retag_job_at_a_time(self):
+        """Test a second job is refused while one is pending."""
+        tag_rules_service.start_retag_job()
+
+        with pytest.raises(RuntimeError):
+            tag_rules_service.start_retag_job()
+
+    def test_invalid_user_id(self):
+        """Test invalid user IDs are rejected."""
+        with pytest.raises(ValueError):
+            tag_rules_service.start_retag_job(user_id=0)
+
+    def test_rule_change_queues_retag(self):
+        """Test a rule change starts a job when idle and reuses a pending one."""
+        job = tag_rules_service.queue_retag_after_rule_change()
+        assert job is not None
+        assert job.user_id is None
+
+        assert tag_rules_service.queue_retag_after_rule_change() is None
+        assert tag_rules_service._retag_rerun_requested is False
+
+    @patch('services.tag_rules_service.transactions_repo.retag_transactions_batch')
+    @patch('services.tag_rules_service.transactions_repo.get_retag_scope')
+    def test_rule_change_during_run_reruns_job(self, mock_get_scope, mock_retag_batch):
+        """Test a rule change while a job runs makes it run once more afterwards."""
+        mock_get_scope.return_value = (10, 1, 10)
+        job = tag_rules_service.start_retag_job()
+
+        def change_rules_mid_run(*args):
+            if mock_retag_batch.call_count == 1:
+                assert tag_rules_service.queue_retag_after_rule_change() is None
+            return (10, 0)
+        mock_retag_batch.side_effect = change_rules_mid_run
+
+        tag_rules_service.run_retag_job(job.job_id)
+
+        assert mock_retag_batch.call_count == 2
+        assert len(tag_rules_service._retag_jobs) == 2
+        assert all(j.status == RetagJobStatus.COMPLETED for j in tag_rules_service._retag_jobs.values())
+
+
+    @patch('services.tag_rules_service.transactions_repo.retag_transactions_batch')
+    @patch('services.tag_rules_service.transactions_repo.get_retag_scope')
+    @patch('services.tag_rules_service.tag_rules_repo')
+    def test_deleted_rule_tag_is_cleared_by_retag(self, mock_rules_repo, mock_get_scope, mock_retag_batch):
+        """Test the retag after a delete removes the deleted rule's tag where no rule matches any more."""
+        # Setup mock
+        mock_rules_repo.get_tagging_rule_by_id.return_value = {"rule_id": 7, "keyword": "uber", "tag_id": 5}
+        mock_rules_repo.delete_tagging_rule.return_value = True
+        mock_get_scope.return_value = (10, 1, 10)
+        mock_retag_batch.return_value = (10, 2)
+
+        # Execute
+        assert tag_rules_service.delete_tagging_rule(7) is True
+        job = tag_rules_service.queue_retag_after_rule_change()
+        tag_rules_service.run_retag_job(job.job_id)
+
+        # Assertions
+        assert job.clear_unmatched is False
+        assert job.clear_tag_ids == [5]
+        assert mock_retag_batch.call_args.args == (1, 5000, None, False, [5])
+        assert tag_rules_service._retag_pending_clear_tag_ids == set()
+
+    @patch('services.tag_rules_service.fetch_tag_by_name')
+    @patch('services.tag_rules_service.tag_rules_repo')
+    def test_rule_update_clears_old_tag_only_when_rule_changes(self, mock_rules_repo, mock_fetch_tag):
+        """Test a retargeted rule hands its old tag to the pending job and a no-op update does not."""
+        mock_rules_repo.get_tagging_rule_by_id.return_value = {"rule_id": 7, "keyword": "uber", "tag_id": 5}
+        mock_rules_repo.update_tagging_rule.return_value = True
+        pending = tag_rules_service.queue_retag_after_rule_change()
+
+        mock_fetch_tag.return_value = 5
+        tag_rules_service.update_tagging_rule(7, TagRuleBase(keyword="uber", tag_name="Travel"))
+        tag_rules_service.queue_retag_after_rule_change()
+        assert pending.clear_tag_ids == []
+
+        mock_fetch_tag.return_value = 6
+        tag_rules_service.update_tagging_rule(7, TagRuleBase(keyword="uber", tag_name="Commute"))
+        tag_rules_service.queue_retag_after_rule_change()
+        assert pending.clear_tag_ids == [5]
+
+
+RULES = [
+    {"rule_id": 1, "keyword": "swiggy", "tag_id": 2, "tag_name": "Food"},
+    {"rule_id": 4, "keyword": "amazon", "tag_id": 3, "tag_name": "Shopping"},
+    {"rule_id": 7, "keyword": "amazon prime", "tag_id": 5, "tag_name": "Subscriptions"},
+]
+
+DESCRIPTIONS = [
+    ("UPI/SWIGGY/ORDER", 5),
+    ("AMAZON PRIME VIDEO", 2),
+    ("AMAZON PAY", 3),
+    ("NETFLIX.COM", 4),
+]
+
+
+@patch('services.tag_rules_service.fetch_tag_by_name', return_value={"tag_id": 9, "tag_name": "Entertainment"})
+@patch('services.tag_rules_service.transactions_repo.get_transactions_by_descriptions', return_value=[])
+@patch('services.tag_rules_service.transactions_repo.get_description_counts', return_value=DESCRIPTIONS)
+@patch('services.tag_rules_service.tag_rules_repo.get_all_tagging_rules', return_value=RULES)
+class TestRulePreview:
+    """Test cases for the rule impact preview."""
+
+    def setup_method(self):
+        tag_rules_service._matcher_cache.clear()
+        tag_rules_service._description_match_cache.clear()
+
+    def test_new_rule_only_takes_unmatched_rows(self, mock_get_rules, mock_get_descriptions, mock_get_samples, mock_fetch_tag):
+        """Test a new rule ranks last, so rows matched by earlier rules are reported as shadowed."""
+        # Execute
+        preview = tag_rules_service.preview_rule_impact(1, TagRuleBase(keyword=" Video ", tag_name="entertainment"))
+
+        # Assertions
+        assert preview.keyword == "video"
+        assert preview.total_transactions == 14
+        assert preview.keyword_match_count == 2
+        assert preview.match_count == 0
+        assert preview.rules_losing_matches == []
+        assert [(s.rule_id, s.transaction_count) for s in preview.shadowed_by] == [(4, 2)]
+
+    def test_new_rule_tags_unmatched_rows(self, mock_get_rules, mock_get_descriptions, mock_get_samples, mock_fetch_tag):
+        """Test rows no rule matches today are counted as newly tagged and sampled."""
+        mock_get_samples.return_value = [{
+            "transaction_id": 31,
+            "transaction_time": datetime(2025, 3, 2, 9, 0),
+            "description": "NETFLIX.COM",
+            "amount": Decimal("-649.00"),
+            "tag_name": None,
+        }]
+
+        preview = tag_rules_service.preview_rule_impact(1, TagRuleBase(keyword="netflix", tag_name="entertainment"), sample_size=5)
+
+        assert (preview.match_count, preview.newly_tagged_count) == (4, 4)
+        mock_get_samples.assert_called_once_with(1, ["NETFLIX.COM"], 5)
+        assert preview.samples[0].transaction_id == 31
+        assert preview.samples[0].current_rule_id is None
+
+    def test_edited_rule_takes_rows_from_later_rules(self, mock_get_rules, mock_get_descriptions, mock_get_samples, mock_fetch_tag):
+        """Test editing a rule keeps its priority, steals later matches and releases its old ones."""
+        preview = tag_rules_service.preview_rule_impact(
+            1, TagRuleBase(keyword="amazon prime", tag_name="entertainment"), rule_id=1
+        )
+
+        assert preview.match_count == 2
+        # Rule 1 gives up its SWIGGY rows (no other rule matches them); rule 4 loses AMAZON PRIME VIDEO
+        assert {s.rule_id: s.transaction_count for s in preview.rules_losing_matches} == {1: 5, 4: 2}
+        assert preview.shadowed_by == []
+
+    def test_matches_are_cached_per_rule_set_version(self, mock_get_rules, mock_get_descriptions, mock_get_samples, mock_fetch_tag):
+        """Test repeated previews reuse the compiled matcher and descriptions until rules change."""
+        tag_rules_service.preview_rule_impact(1, TagRuleBase(keyword="uber", tag_name="travel"))
+        tag_rules_service.preview_rule_impact(1, TagRuleBase(keyword="ola", tag_name="travel"))
+        assert mock_get_rules.call_count == 1
+        assert mock_get_descriptions.call_count == 1
+
+        bump_table_version("tagging_rules")
+        tag_rules_service.preview_rule_impact(1, TagRuleBase(keyword="ola", tag_name="travel"))
+        assert mock_get_rules.call_count == 2
+        assert mock_get_descriptions.call_count == 2
+
+    def test_invalid_input(self, mock_get_rules, mock_get_descriptions, mock_get_samples, mock_fetch_tag):
+        """Test unknown rules, missing tags and bad user IDs are rejected."""
+        with pytest.raises(ValueError):
+            tag_rules_service.preview_rule_impact(1, TagRuleBase(keyword="uber", tag_name="travel"), rule_id=99)
+        with pytest.raises(ValueError):
+            tag_rules_service.preview_rule_impact(0, TagRuleBase(keyword="uber", tag_name="travel"))
+        mock_fetch_tag.return_value = None
+        with pytest.raises(ValueError):
+            tag_rules_service.preview_rule_impact(1, TagRuleBase(keyword="uber", tag_name="travel"))
+
+    def test_unreadable_transactions(self, mock_get_rules, mock_get_descriptions, mock_get_samples, mock_fetch_tag):
+        """Test a failed description read returns None."""
+        mock_get_descriptions.return_value = None
+
+        assert tag_rules_service.preview_rule_impact(1, TagRuleBase(keyword="uber", tag_name="travel")) is None
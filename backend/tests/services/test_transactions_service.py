@@ -1,11 +1,13 @@
 """Tests for Transaction service functionality."""
 
+import gzip
+import json
 import pytest
 from unittest.mock import patch, MagicMock
 from decimal import Decimal
 from datetime import datetime
 
-from models.transaction import Transaction, TransactionType, BulkTransactionResponse
+from models.transaction import Transaction, TransactionType, BulkTransactionResponse, TransactionSearchFilters, BulkInsertMode
 from services import transactions_service
 from tests.test_utils import TestDataFactory
 
@@ -357,4 +359,285 @@ class TestTransactionsService:
         assert result.failure_count == 2
         assert result.total_processed == 2
         assert len(result.errors) == 2
-        mock_bulk_insert.assert_not_called()  # Should not call repo if no valid transactions
\ No newline at end of file
+        mock_bulk_insert.assert_not_called()  # Should not call repo if no valid transactions
+    
+    @patch('services.transactions_service.transactions_repo.bulk_insert_transactions')
+    def test_bulk_add_transactions_counts_duplicates(self, mock_bulk_insert):
+        """Test rows skipped by the unique constraint are reported as duplicates, not successes."""
+        # Setup mock: only one of three valid rows landed
+        mock_bulk_insert.return_value = ([42], [])
+        transactions = [
+            TestDataFactory.create_test_transaction(reference_id=f"TXN{i}") for i in range(3)
+        ] + [TestDataFactory.create_test_transaction(user_id=None)]
+        
+        # Execute
+        result = transactions_service.bulk_add_transactions(transactions)
+        
+        # Assertions
+        assert result.success_count == 1
+        assert result.duplicate_count == 2
+        assert result.failure_count == 1
+        assert result.total_processed == 4
+        assert result.inserted_ids == [42]
+    
+    @patch('services.transactions_service.transactions_repo.bulk_insert_transactions')
+    @patch('services.transactions_service.transactions_repo.copy_insert_transactions')
+    def test_bulk_add_transactions_copy_mode(self, mock_copy_insert, mock_bulk_insert):
+        """Test COPY mode routes valid transactions to the COPY repository path."""
+        # Setup mock
+        mock_copy_insert.return_value = ([1], [])
+        transactions = [TestDataFactory.create_test_transaction(reference_id="TXN1")]
+        
+        # Execute
+        result = transactions_service.bulk_add_transactions(transactions, mode=BulkInsertMode.COPY)
+        
+        # Assertions
+        assert result.inserted_ids == [1]
+        mock_copy_insert.assert_called_once_with(transactions)
+        mock_bulk_insert.assert_not_called()
+    
+    @patch('services.transactions_service.transactions_repo.search_transactions')
+    def test_search_transactions_next_cursor(self, mock_search):
+        """Test a next cursor is returned only when an extra row exists."""
+        # Setup mock: limit + 1 rows means another page exists
+        rows = [
+            TestDataFactory.create_test_transaction(transaction_id=3, transaction_time=datetime(2024, 1, 3)),
+            TestDataFactory.create_test_transaction(transaction_id=2, transaction_time=datetime(2024, 1, 2)),
+            TestDataFactory.create_test_transaction(transaction_id=1, transaction_time=datetime(2024, 1, 1)),
+        ]
+        mock_search.return_value = (rows, 3)
+        filters = TransactionSearchFilters(user_id=1)
+        
+        # Execute
+        page = transactions_service.search_transactions(filters, limit=2, include_total=True)
+        
+        # Assertions
+        assert [t.transaction_id for t in page.items] == [3, 2]
+        assert page.total_count == 3
+        assert transactions_service._decode_cursor(page.next_cursor) == (datetime(2024, 1, 2), 2)
+        mock_search.assert_called_once_with(filters, 3, None, True)
+    
+    @patch('services.transactions_service.transactions_repo.search_transactions')
+    def test_search_transactions_last_page(self, mock_search):
+        """Test the cursor is decoded and no next cursor is returned on the last page."""
+        # Setup mock
+        mock_search.return_value = ([TestDataFactory.create_test_transaction(transaction_id=1)], None)
+        cursor = transactions_service._encode_cursor(
+            TestDataFactory.create_test_transaction(transaction_id=2, transaction_time=datetime(2024, 1, 2))
+        )
+        
+        # Execute
+        page = transactions_service.search_transactions(TransactionSearchFilters(user_id=1), limit=2, cursor=cursor)
+        
+        # Assertions
+        assert page.next_cursor is None
+        assert mock_search.call_args[0][2] == (datetime(2024, 1, 2), 2)
+    
+    @pytest.mark.parametrize("filters, limit", [
+        (TransactionSearchFilters(user_id=0), 10),
+        (TransactionSearchFilters(user_id=1), 0),
+        (TransactionSearchFilters(user_id=1), 10_000),
+        (TransactionSearchFilters(user_id=1, min_amount=Decimal("50"), max_amount=Decimal("10")), 10),
+    ])
+    @patch('services.transactions_service.transactions_repo.search_transactions')
+    def test_search_transactions_invalid_input(self, mock_search, filters, limit):
+        """Test invalid search input raises ValueError without querying."""
+        with pytest.raises(ValueError):
+            transactions_service.search_transactions(filters, limit=limit)
+        mock_search.assert_not_called()
+    
+    def test_search_transactions_invalid_cursor(self):
+        """Test malformed cursors are rejected."""
+        with pytest.raises(ValueError):
+            transactions_service.search_transactions(TransactionSearchFilters(user_id=1), cursor="not-a-cursor")
+
+
+class TestTransactionsServiceAsync:
+    """Test cases for the awaitable transaction service helpers."""
+
+    @pytest.mark.asyncio
+    @patch('services.transactions_service.async_db.DB_ASYNC_ENABLED', False)
+    @patch('services.transactions_service.transactions_repo.get_all_transaction_for_user')
+    async def test_get_all_transaction_for_user_async_threadpool_fallback(self, mock_get_transactions):
+        """Test the sync repository is used when async DB access is disabled."""
+        mock_get_transactions.return_value = [TestDataFactory.create_test_transaction(transaction_id=1)]
+
+        result = await transactions_service.get_all_transaction_for_user_async(1)
+
+        assert len(result) == 1
+        mock_get_transactions.assert_called_once_with(1)
+
+    @pytest.mark.asyncio
+    @patch('services.transactions_service.async_db.DB_ASYNC_ENABLED', True)
+    @patch('services.transactions_service.async_transactions_repo.get_all_transaction_for_user')
+    @patch('services.transactions_service.transactions_repo.get_all_transaction_for_user')
+    async def test_get_all_transaction_for_user_async_uses_asyncpg(self, mock_sync_get, mock_async_get):
+        """Test the async repository is awaited when async DB access is enabled."""
+        mock_async_get.return_value = [TestDataFactory.create_test_transaction(transaction_id=1)]
+
+        result = await transactions_service.get_all_transaction_for_user_async(1)
+
+        assert len(result) == 1
+        mock_async_get.assert_awaited_once_with(1)
+        mock_sync_get.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('services.transactions_service.async_db.DB_ASYNC_ENABLED', True)
+    @patch('services.transactions_service.async_transactions_repo.get_transaction_by_id')
+    async def test_fetch_transaction_by_id_async_invalid_id(self, mock_async_get):
+        """Test invalid IDs are rejected before hitting the database."""
+        result = await transactions_service.fetch_transaction_by_id_async(0)
+
+        assert result is None
+        mock_async_get.assert_not_called()
+
+
+async def _byte_stream(*blocks: bytes):
+    for block in blocks:
+        yield block
+
+
+def _ndjson_line(reference_id: str, **overrides) -> bytes:
+    transaction = TestDataFactory.create_test_transaction(reference_id=reference_id, **overrides)
+    return transaction.model_dump_json().encode() + b"\n"
+
+
+class TestTransactionsServiceStream:
+    """Test cases for NDJSON streaming ingestion."""
+
+    @pytest.mark.asyncio
+    async def test_iter_ndjson_lines_splits_across_blocks(self):
+        """Test lines split across network blocks are reassembled."""
+        lines = [line async for line in transactions_service._iter_ndjson_lines(_byte_stream(b'{"a"', b': 1}\n{"b": 2}', b"\n", b'{"c": 3}'))]
+
+        assert lines == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+    @pytest.mark.asyncio
+    async def test_iter_ndjson_lines_rejects_oversized_line(self):
+        """Test a runaway line is rejected instead of buffered without bound."""
+        with pytest.raises(ValueError):
+            async for _ in transactions_service._iter_ndjson_lines(_byte_stream(b"x" * 20), max_line_bytes=10):
+                pass
+
+    @pytest.mark.asyncio
+    @patch('services.transactions_service.bulk_add_transactions')
+    async def test_stream_add_transactions_chunks(self, mock_bulk_add):
+        """Test rows are inserted in rolling chunks with per-chunk summaries."""
+        # Setup mock
+        mock_bulk_add.side_effect = lambda txns, mode, lines: BulkTransactionResponse(
+            success_count=len(txns), failure_count=0, total_processed=len(txns), inserted_ids=list(range(len(txns)))
+        )
+        body = _byte_stream(
+            _ndjson_line("TXN1") + _ndjson_line("TXN2"),
+            b'{"amount": "oops"}\n',
+            b"\n",
+            _ndjson_line("TXN3"),
+        )
+
+        # Execute
+        result = await transactions_service.stream_add_transactions(body, chunk_size=2)
+
+        # Assertions
+        assert mock_bulk_add.call_count == 2
+        assert [c.success_count for c in result.chunks] == [2, 1]
+        assert result.chunks[1].failure_count == 1
+        assert result.chunks[1].errors[0].startswith("Line 3:")
+        assert result.chunks[1].first_line == 3
+        assert result.success_count == 3
+        assert result.failure_count == 1
+        assert result.total_processed == 4
+        assert result.error is None
+
+    @pytest.mark.asyncio
+    @patch('services.transactions_service.transactions_repo')
+    async def test_stream_add_transactions_reports_absolute_line_numbers(self, mock_repo):
+        """Test row errors in a later chunk name the stream line, not the index within the chunk."""
+        # Setup mock
+        mock_repo.bulk_insert_transactions.side_effect = lambda txns: (list(range(len(txns))), [])
+        body = _byte_stream(
+            _ndjson_line("TXN1") + _ndjson_line("TXN2"),
+            b"\n",
+            _ndjson_line("TXN3") + _ndjson_line("TXN4", amount=Decimal("5.00"), type=TransactionType.DEBIT),
+        )
+
+        # Execute
+        result = await transactions_service.stream_add_transactions(body, chunk_size=2)
+
+        # Assertions
+        assert result.chunks[1].errors == ["Line 5: Amount sign doesn't match transaction type"]
+        assert result.chunks[1].success_count == 1
+
+    @pytest.mark.asyncio
+    @patch('services.transactions_service.bulk_add_transactions')
+    async def test_stream_add_transactions_aborts_on_oversized_line(self, mock_bulk_add):
+        """Test an oversized line stops the stream but keeps earlier rows."""
+        mock_bulk_add.return_value = BulkTransactionResponse(success_count=1, failure_count=0, total_processed=1, inserted_ids=[1])
+
+        with patch('services.transactions_service.STREAM_MAX_LINE_BYTES', 1000):
+            body = _byte_stream(_ndjson_line("TXN1"), b"x" * 2000)
+            result = await transactions_service.stream_add_transactions(body)
+
+        assert result.success_count == 1
+        assert result.error is not None
+
+
+class TestTransactionsServiceColumnar:
+    """Test cases for decoding the columnar bulk payload."""
+
+    def _payload(self, **overrides):
+        document = {
+            "columns": {
+                "transaction_time": ["2023-01-01T12:00:00", "2023-01-02T08:30:00"],
+                "amount": ["-100.50", "2500.00"],
+                "reference_id": ["TXN1", "TXN2"],
+                "type": ["debit", "credit"],
+                "tag_id": [3, None],
+            },
+            "constants": {"acc_id": 1, "user_id": 1},
+        }
+        document.update(overrides)
+        return json.dumps(document).encode()
+
+    def test_decode_columnar_transactions_gzip(self):
+        """Test a gzip columnar payload decodes into validated transactions."""
+        # Execute
+        result = transactions_service.decode_columnar_transactions(gzip.compress(self._payload()), "gzip")
+
+        # Assertions
+        assert len(result) == 2
+        assert result[0].amount == Decimal("-100.50")
+        assert result[0].transaction_time == datetime(2023, 1, 1, 12, 0)
+        assert result[1].type == TransactionType.CREDIT
+        assert result[1].tag_id is None
+        assert all(t.acc_id == 1 and t.user_id == 1 for t in result)
+        assert result[0].description is None
+
+    def test_decode_columnar_transactions_invalid_value(self):
+        """Test a bad value is reported with its row and column."""
+        payload = json.loads(self._payload())
+        payload["columns"]["amount"][1] = "oops"
+
+        with pytest.raises(ValueError, match="Transaction 1: amount"):
+            transactions_service.decode_columnar_transactions(json.dumps(payload).encode())
+
+    def test_decode_columnar_transactions_ragged_columns(self):
+        """Test columns of different lengths are rejected."""
+        payload = json.loads(self._payload())
+        payload["columns"]["reference_id"].append("TXN3")
+
+        with pytest.raises(ValueError, match="same length"):
+            transactions_service.decode_columnar_transactions(json.dumps(payload).encode())
+
+    def test_decode_columnar_transactions_missing_required(self):
+        """Test a payload without a required field is rejected."""
+        payload = json.loads(self._payload())
+        del payload["columns"]["reference_id"]
+
+        with pytest.raises(ValueError, match="Transaction 0: reference_id: Field required"):
+            transactions_service.decode_columnar_transactions(json.dumps(payload).encode())
+
+    def test_decode_columnar_transactions_decompression_limit(self):
+        """Test bodies that inflate past the limit are refused."""
+        with patch('services.transactions_service.COLUMNAR_MAX_DECOMPRESSED_BYTES', 100):
+            with pytest.raises(ValueError, match="exceeds"):
+                transactions_service.decode_columnar_transactions(gzip.compress(self._payload()), "gzip")
@@ -0,0 +1,63 @@
+"""Tests for user cache invalidation in the users service."""
+
+import pytest
+from unittest.mock import patch
+
+from services import users_service
+
+USER = {"user_id": 1, "username": "alice", "email": "alice@example.com", "is_active": True}
+OTHER = {"user_id": 2, "username": "bob", "email": "bob@example.com", "is_active": True}
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    users_service._user_cache.clear()
+    yield
+    users_service._user_cache.clear()
+
+
+def _cache_user(user):
+    for key in (("id", user["user_id"]), ("username", user["username"]), ("email", user["email"])):
+        users_service._user_cache.set(key, user)
+
+
+class TestUserCacheInvalidation:
+    """Test cases for per-user cache invalidation."""
+
+    @patch('services.users_service.users_repository.update_last_login', return_value=True)
+    def test_login_only_drops_that_user(self, mock_update_last_login):
+        """Test a login invalidates the user's id, username and email entries and nothing else."""
+        # Setup mock
+        _cache_user(USER)
+        _cache_user(OTHER)
+
+        # Execute
+        assert users_service.update_last_login(1) is True
+
+        # Assertions
+        cache = users_service._user_cache
+        assert cache.get(("id", 1)) is None
+        assert cache.get(("username", "alice")) is None
+        assert cache.get(("email", "alice@example.com")) is None
+        assert cache.get(("username", "bob")) == OTHER
+
+    @patch('services.users_service.users_repository.deactivate_user', return_value=True)
+    @patch('services.users_service.users_repository.get_user_by_id')
+    def test_deactivate_reads_keys_before_the_write(self, mock_get_user_by_id, mock_deactivate):
+        """Test entries cached only by username/email are dropped via a lookup made before deactivation."""
+        mock_get_user_by_id.return_value = USER
+        users_service._user_cache.set(("username", "alice"), USER)
+
+        users_service.deactivate_user(1)
+
+        mock_get_user_by_id.assert_called_once_with(1)
+        assert users_service._user_cache.get(("username", "alice")) is None
+
+    @patch('services.users_service.users_repository.update_email', return_value=True)
+    def test_email_change_drops_old_email(self, mock_update_email):
+        """Test the entry under the previous email is invalidated."""
+        _cache_user(USER)
+
+        users_service.update_email(1, "alice@new.example.com")
+
+        assert users_service._user_cache.get(("email", "alice@example.com")) is None
@@ -0,0 +1,97 @@
+"""Tests for the in-process reference data cache."""
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from utils.cache import TTLCache
+from services import banks_service, tags_service
+
+
+class TestTTLCache:
+    """Test cases for TTLCache."""
+
+    def test_get_or_load_reads_through_once(self):
+        """Test the loader runs on a miss and later lookups are hits."""
+        # Setup mock
+        cache = TTLCache("test", maxsize=10, ttl=60)
+        loader = MagicMock(return_value={"tag_id": 1})
+
+        # Execute
+        first = cache.get_or_load("key", loader)
+        second = cache.get_or_load("key", loader)
+
+        # Assertions
+        assert first == second == {"tag_id": 1}
+        loader.assert_called_once()
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_empty_results_are_not_cached(self):
+        """Test None results are looked up again next time."""
+        cache = TTLCache("test", maxsize=10, ttl=60)
+        loader = MagicMock(return_value=None)
+
+        cache.get_or_load("key", loader)
+        cache.get_or_load("key", loader)
+
+        assert loader.call_count == 2
+
+    def test_entries_expire_after_ttl(self):
+        """Test expired entries are reloaded."""
+        cache = TTLCache("test", maxsize=10, ttl=60)
+        with patch('utils.cache.time.monotonic', return_value=1000.0):
+            cache.set("key", "old")
+        with patch('utils.cache.time.monotonic', return_value=1061.0):
+            assert cache.get("key") is None
+        assert cache.stats()["size"] == 0
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = TTLCache("test", maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalidate(self):
+        """Test a single key can be dropped."""
+        cache = TTLCache("test", maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.invalidate("a")
+
+        assert cache.get("a") is None
+
+
+class TestReferenceCaching:
+    """Test cases for cached service lookups and invalidation on writes."""
+
+    @patch('repositories.banks_repository.get_bank_id')
+    def test_fetch_bank_id_by_name_is_cached(self, mock_get_bank_id):
+        """Test repeated bank lookups hit the database once."""
+        mock_get_bank_id.return_value = 3
+
+        assert banks_service.fetch_bank_id_by_name("HDFC") == 3
+        assert banks_service.fetch_bank_id_by_name(" HDFC ") == 3
+
+        mock_get_bank_id.assert_called_once_with("HDFC")
+
+    @patch('repositories.tags_repository.insert_tag')
+    @patch('repositories.tags_repository.get_tag_by_name')
+    @patch('repositories.categories_repository.get_category_id')
+    def test_upsert_tag_invalidates_tag_cache(self, mock_get_category_id, mock_get_tag_by_name, mock_insert_tag):
+        """Test writing a tag clears cached tag lookups."""
+        mock_get_category_id.return_value = 1
+        mock_insert_tag.return_value = 9
+        mock_get_tag_by_name.return_value = {"tag_id": 5, "tag_name": "Food"}
+        tags_service.fetch_tag_by_name("Food")
+
+        tags_service.upsert_tag(MagicMock(tag_name="Food", category_name="Expenses"))
+        tags_service.fetch_tag_by_name("Food")
+
+        # One lookup before the write, one inside upsert_tag, one after invalidation
+        assert mock_get_tag_by_name.call_count == 3
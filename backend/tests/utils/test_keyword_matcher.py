@@ -0,0 +1,69 @@
+"""Tests for the Aho-Corasick keyword matcher."""
+
+import importlib.util
+import random
+from pathlib import Path
+
+import pytest
+
+from utils.keyword_matcher import KeywordMatcher
+
+# statement-processor tags rows at import with its own copy of the matcher; rule previews
+# use this one, so the two must agree
+STATEMENT_PROCESSOR_MATCHER = Path(__file__).resolve().parents[3] / "statement-processor" / "utils" / "keyword_matcher.py"
+
+
+def _load_statement_processor_matcher():
+    if not STATEMENT_PROCESSOR_MATCHER.exists():
+        pytest.skip("statement-processor is not checked out next to the backend")
+    spec = importlib.util.spec_from_file_location("statement_processor_keyword_matcher", STATEMENT_PROCESSOR_MATCHER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.KeywordMatcher
+
+
+class TestKeywordMatcher:
+    """Test cases for KeywordMatcher."""
+
+    def test_first_rule_wins(self):
+        """Test the lowest-index rule wins when several keywords occur."""
+        matcher = KeywordMatcher([{"keyword": "prime"}, {"keyword": "amazon"}, {"keyword": "amazon prime"}])
+
+        assert matcher.match_index("AMAZON PRIME VIDEO") == 0
+        assert matcher.match_index("amazon pay") == 1
+
+    def test_overlapping_keywords_found_through_failure_links(self):
+        """Test a keyword that is a suffix of a partial match of another is still found."""
+        matcher = KeywordMatcher([{"keyword": "abcd"}, {"keyword": "bce"}])
+
+        assert matcher.match_index("xabcex") == 1
+        assert matcher.match("zzz") is None
+
+    def test_blank_keywords_are_ignored(self):
+        """Test empty keywords never match."""
+        matcher = KeywordMatcher([{"keyword": "  "}, {"keyword": None}, {"keyword": "uber"}])
+
+        assert matcher.match_index("UBER TRIP") == 2
+
+    def test_matches_statement_processor_copy(self):
+        """Test the backend and statement-processor matchers pick the same rule for the same rules and text."""
+        # Setup
+        ImportMatcher = _load_statement_processor_matcher()
+        rng = random.Random(25)
+        alphabet = "ab c"
+
+        for _ in range(200):
+            rules = [
+                {"rule_id": i, "keyword": "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 4)))}
+                for i in range(rng.randint(1, 12))
+            ]
+            texts = ["".join(rng.choice(alphabet + "AB") for _ in range(rng.randint(0, 20))) for _ in range(20)]
+
+            # Execute
+            preview_matcher = KeywordMatcher(rules)
+            import_matcher = ImportMatcher(rules)
+
+            # Assertions
+            for text in texts:
+                assert preview_matcher.match_index(text) == import_matcher.match_index(text), (rules, text)
+                assert preview_matcher.match(text) == import_matcher.match(text), (rules, text)
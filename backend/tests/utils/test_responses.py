@@ -0,0 +1,90 @@
+"""Tests for the orjson response class and response compression."""
+
+import json
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils import responses
+from utils.responses import CompressionMiddleware, ORJSONResponse
+
+
+def _make_client(body_size: int) -> TestClient:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/payload")
+    def payload():
+        return {"data": "x" * body_size}
+
+    return TestClient(app)
+
+
+class TestORJSONResponse:
+    """Test cases for ORJSONResponse."""
+
+    def test_renders_decimal_and_datetime(self):
+        """Test Decimal is kept exact as a string and datetime is ISO 8601."""
+        # Execute
+        response = ORJSONResponse({"amount": Decimal("-1234567.89"), "time": datetime(2024, 1, 15, 10, 30)})
+
+        # Assertions
+        assert json.loads(response.body) == {"amount": "-1234567.89", "time": "2024-01-15T10:30:00"}
+
+    def test_rejects_unknown_types(self):
+        """Test unsupported objects raise instead of being silently dropped."""
+        with pytest.raises(TypeError):
+            ORJSONResponse({"value": object()})
+
+
+class TestCompressionMiddleware:
+    """Test cases for CompressionMiddleware."""
+
+    def test_small_responses_are_not_compressed(self):
+        """Test bodies under the threshold are sent as-is."""
+        client = _make_client(100)
+
+        response = client.get("/payload", headers={"Accept-Encoding": "gzip, br"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+
+    def test_large_responses_use_gzip(self):
+        """Test gzip is applied when the client only accepts gzip."""
+        client = _make_client(5000)
+
+        response = client.get("/payload", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < 5000
+        assert response.json() == {"data": "x" * 5000}
+
+    def test_large_responses_prefer_brotli(self):
+        """Test brotli is chosen when accepted and installed."""
+        pytest.importorskip("brotli")
+        client = _make_client(5000)
+
+        response = client.get("/payload", headers={"Accept-Encoding": "gzip, br"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_falls_back_to_gzip_without_brotli(self, monkeypatch):
+        """Test a missing brotli package degrades to gzip."""
+        monkeypatch.setattr(responses, "brotli", None)
+        client = _make_client(5000)
+
+        response = client.get("/payload", headers={"Accept-Encoding": "br, gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+
+    def test_refused_encodings_are_not_used(self):
+        """Test q=0 in Accept-Encoding disables that coding."""
+        client = _make_client(5000)
+
+        response = client.get("/payload", headers={"Accept-Encoding": "gzip;q=0, br;q=0"})
+
+        assert "content-encoding" not in response.headers
+        assert len(response.content) > 5000
@@ -0,0 +1,95 @@
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, Hashable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from utils.cache import CACHE_TTL_SECONDS
+from utils.responses import ORJSONResponse
+import repositories.table_versions_repository as table_versions_repo
+import repositories.rollups_repository as rollups_repo
+
+# Changes on every restart so ETags issued by an earlier process never match
+_EPOCH = uuid.uuid4().hex[:8]
+
+_versions: Dict[str, int] = defaultdict(int)
+_versions_lock = threading.Lock()
+
+
+def bump_table_version(*tables: str) -> None:
+    """
+    Record a write to the given tables. Called by service write paths; only used by
+    table_etag when the database versions cannot be read.
+    """
+    with _versions_lock:
+        for table in tables:
+            _versions[table] += 1
+
+
+def _local_versions(*tables: str) -> str:
+    """This process's counters for the tables, with its epoch and the current TTL window."""
+    with _versions_lock:
+        versions = "-".join(f"{table}.{_versions[table]}" for table in tables)
+    window = int(time.time() // CACHE_TTL_SECONDS) if CACHE_TTL_SECONDS > 0 else 0
+    return f"{_EPOCH}-{window}-{versions}"
+
+
+def table_etag(*tables: str) -> str:
+    """
+    Weak ETag for a response built from the given tables. It is weak because the same
+    tag is sent for gzip, brotli and identity encodings of the body.
+
+    Reference tables (table_versions_repo.VERSIONED_TABLES) use the write versions kept
+    in Postgres by the table_versions triggers, so the tag changes on every committed
+    write from any worker or process and is the same in every worker. Other tables, or
+    all of them if the versions cannot be read, fall back to this process's counters
+    plus its epoch and the current cache TTL window: writes from elsewhere are then
+    picked up within one TTL.
+
+    This runs a blocking query; call it from a threadpool in async code. The tag is
+    read before the data it describes, so a write in between can pair newer data with
+    the older tag. That only costs one extra full response on the next revalidation,
+    never a stale 304.
+    """
+    versioned = [table for table in tables if table in table_versions_repo.VERSIONED_TABLES]
+    db_versions = (table_versions_repo.get_table_versions(versioned) if versioned else None) or {}
+    parts = [f"{table}.{version}" for table, version in db_versions.items()]
+    local = [table for table in tables if table not in db_versions]
+    if local:
+        parts.append(_local_versions(*local))
+    return 'W/"' + "-".join(parts) + '"'
+
+
+def user_data_version(user_id: int) -> Hashable:
+    """
+    Cache key component that changes whenever the user's transactions are written.
+    Read from the user's monthly rollup rows, which every transaction write updates in
+    the same statement, so it is per user and shared by all workers. Falls back to this
+    process's transaction counter if the rollups cannot be read.
+    """
+    version = rollups_repo.get_user_rollup_version(user_id)
+    if version is not None:
+        return version
+    return _local_versions("transactions")
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header lists etag (or is *)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored on both sides
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def etag_json_response(content: Any, etag: str) -> ORJSONResponse:
+    """JSON response carrying the ETag; no-cache makes clients revalidate on each use."""
+    return ORJSONResponse(jsonable_encoder(content), headers={"ETag": etag, "Cache-Control": "no-cache"})
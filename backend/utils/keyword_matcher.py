@@ -0,0 +1,80 @@
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over tagging rule keywords.
+
+    Built once from the rules (in priority order, i.e. sorted by rule_id) and
+    then finds the highest-priority rule whose keyword occurs in a description
+    in a single pass over the text, however many rules there are.
+    Matching is case-insensitive: keywords and text are both upper-cased.
+    Mirrors statement-processor's matcher, and the SQL retag in
+    transactions_repository, so previews agree with what imports and retags do.
+    tests/utils/test_keyword_matcher.py checks both copies give the same matches.
+    """
+
+    def __init__(self, rules: List[Dict]):
+        self.rules = rules
+        # Per node: outgoing transitions, failure link and the best (lowest) rule
+        # index among keywords ending here or at any suffix reachable by failure links
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[Optional[int]] = [None]
+
+        for index, rule in enumerate(rules):
+            keyword = (rule.get("keyword") or "").strip().upper()
+            if keyword:
+                self._add_keyword(keyword, index)
+        self._build_failure_links()
+
+    def _add_keyword(self, keyword: str, index: int) -> None:
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+                self._goto[node][char] = next_node
+            node = next_node
+        if self._best[node] is None or index < self._best[node]:
+            self._best[node] = index
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                inherited = self._best[self._fail[child]]
+                if inherited is not None and (self._best[child] is None or inherited < self._best[child]):
+                    self._best[child] = inherited
+
+    def match_index(self, text: str) -> Optional[int]:
+        """Return the index of the first rule whose keyword occurs in text, or None."""
+        best = None
+        node = 0
+        goto, fail, best_at = self._goto, self._fail, self._best
+        for char in text.upper():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            candidate = best_at[node]
+            if candidate is not None and (best is None or candidate < best):
+                best = candidate
+                if best == 0:
+                    break
+        return best
+
+    def match(self, text: str) -> Optional[Dict]:
+        """Return the first matching rule for text, or None."""
+        index = self.match_index(text)
+        return self.rules[index] if index is not None else None
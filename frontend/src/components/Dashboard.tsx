@@ -1,24 +1,10 @@
 import React, { useState, useEffect, useCallback } from 'react';
-import { Account, Transaction } from '../types/api';
-import { accountsApi, transactionsApi } from '../services/api';
+import { AccountBalance, DashboardSummary } from '../types/api';
+import { dashboardApi } from '../services/api';
 import './Dashboard.css';
 
-interface DashboardStats {
-  totalBalance: number;
-  totalAccounts: number;
-  recentTransactions: number;
-  monthlySpending: number;
-}
-
 const Dashboard: React.FC = () => {
-  const [stats, setStats] = useState<DashboardStats>({
-    totalBalance: 0,
-    totalAccounts: 0,
-    recentTransactions: 0,
-    monthlySpending: 0,
-  });
-  const [accounts, setAccounts] = useState<Account[]>([]);
-  const [recentTransactions, setRecentTransactions] = useState<Transaction[]>([]);
+  const [summary, setSummary] = useState<DashboardSummary | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -30,37 +16,9 @@ const Dashboard: React.FC = () => {
       setLoading(true);
       setError(null);
       
-      // Load accounts
-      const accountsResponse = await accountsApi.getByUser(currentUserId);
-      const userAccounts = accountsResponse.data;
-      console.log('Dashboard - Accounts loaded:', userAccounts);
-      setAccounts(userAccounts);
-
-      // Load recent transactions
-      const transactionsResponse = await transactionsApi.getByUser(currentUserId);
-      const allTransactions = transactionsResponse.data;
-      
-      // Sort transactions by date and take the 5 most recent
-      const sortedTransactions = allTransactions
-        .sort((a, b) => {
-          const dateA = new Date((a.transaction_time || a.transaction_date || '') + 'Z').getTime();
-          const dateB = new Date((b.transaction_time || b.transaction_date || '') + 'Z').getTime();
-          return dateB - dateA;
-        })
-        .slice(0, 5);
-      setRecentTransactions(sortedTransactions);
-
-      // Calculate stats
-      // Note: Backend doesn't provide balance, so we'll calculate from transactions or set to 0
-      const totalBalance = 0; // userAccounts.reduce((sum, account) => sum + (account.balance || 0), 0);
-      const monthlySpending = calculateMonthlySpending(allTransactions);
-      
-      setStats({
-        totalBalance,
-        totalAccounts: userAccounts.length,
-        recentTransactions: allTransactions.length,
-        monthlySpending,
-      });
+      // Balances, monthly totals and recent transactions are computed server-side
+      const summaryResponse = await dashboardApi.getSummary(currentUserId, 5);
+      setSummary(summaryResponse.data);
     } catch (err: any) {
       setError(err.response?.data?.detail || 'Failed to load dashboard data');
     } finally {
@@ -72,20 +30,6 @@ const Dashboard: React.FC = () => {
     loadDashboardData();
   }, [loadDashboardData]);
 
-  const calculateMonthlySpending = (transactions: any[]): number => {
-    const currentMonth = new Date().getMonth();
-    const currentYear = new Date().getFullYear();
-    
-    return transactions
-      .filter(transaction => {
-        const transactionDate = new Date(transaction.transaction_time + 'Z');
-        return transactionDate.getMonth() === currentMonth && 
-               transactionDate.getFullYear() === currentYear &&
-               parseFloat(transaction.amount) < 0; // Only count expenses
-      })
-      .reduce((sum, transaction) => sum + Math.abs(parseFloat(transaction.amount)), 0);
-  };
-
   const formatCurrency = (amount: number, currencyCode: string = 'USD'): string => {
     const locale = navigator.language || 'en-US';
     try {
@@ -118,16 +62,20 @@ const Dashboard: React.FC = () => {
     });
   };
 
-  const getDisplayName = (account: any): string => {
+  const getDisplayName = (account: AccountBalance): string => {
     return account.acc_name || 'Unknown Account';
   };
 
-  const getAccountNumber = (account: any): string => {
+  const getAccountNumber = (account: AccountBalance): string => {
     // Extract account number from acc_name if available
     const match = account.acc_name?.match(/(\d{4})/);
     return match ? `****${match[1]}` : '****0000';
   };
 
+  const accounts = summary?.accounts ?? [];
+  const recentTransactions = summary?.recent_transactions ?? [];
+  const totalBalance = accounts.reduce((sum, account) => sum + Number(account.balance || 0), 0);
+
   const getAccountCurrency = (accId: number): string => {
     const account = accounts.find(acc => acc.acc_id === accId);
     return account?.currency || 'USD';
@@ -155,22 +103,22 @@ const Dashboard: React.FC = () => {
       <div className="stats-grid">
         <div className="stat-card">
           <h3>Total Balance</h3>
-          <p className="stat-value">{formatCurrency(stats.totalBalance)}</p>
+          <p className="stat-value">{formatCurrency(totalBalance)}</p>
         </div>
         
         <div className="stat-card">
           <h3>Total Accounts</h3>
-          <p className="stat-value">{stats.totalAccounts}</p>
+          <p className="stat-value">{summary?.account_count ?? 0}</p>
         </div>
         
         <div className="stat-card">
           <h3>Total Transactions</h3>
-          <p className="stat-value">{stats.recentTransactions}</p>
+          <p className="stat-value">{summary?.transaction_count ?? 0}</p>
         </div>
         
         <div className="stat-card">
           <h3>Monthly Spending</h3>
-          <p className="stat-value expense">{formatCurrency(stats.monthlySpending)}</p>
+          <p className="stat-value expense">{formatCurrency(Number(summary?.monthly_spending ?? 0))}</p>
         </div>
       </div>
 
@@ -191,7 +139,7 @@ const Dashboard: React.FC = () => {
                   </p>
                   <p className="account-balance">
                     {account.balance !== undefined && account.currency 
-                      ? formatCurrency(account.balance, account.currency)
+                      ? formatCurrency(Number(account.balance), account.currency)
                       : 'Balance unavailable'
                     }
                   </p>
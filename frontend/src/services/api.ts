@@ -1,7 +1,8 @@
 import axios from 'axios';
 import { 
   User, Account, Transaction, Category, Bank, Tag, 
-  BulkTransactionRequest, BulkTransactionResponse 
+  BulkTransactionRequest, BulkTransactionResponse,
+  TransactionSearchParams, TransactionPage, DashboardSummary
 } from '../types/api';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL
@@ -36,11 +37,18 @@ export const transactionsApi = {
   getById: (transId: number) => api.get<Transaction>(`/transactions/${transId}`),
   getByUser: (userId: number) => api.get<Transaction[]>(`/transactions/user/${userId}`),
   getByAccount: (accId: number) => api.get<Transaction[]>(`/transactions/account/${accId}`),
+  search: (params: TransactionSearchParams) => api.get<TransactionPage>('/transactions/search', { params }),
   create: (transaction: Omit<Transaction, 'trans_id'>) => api.post<number>('/transactions', transaction),
   update: (transId: number, transaction: Partial<Transaction>) => api.put(`/transactions/${transId}`, transaction),
   bulkCreate: (request: BulkTransactionRequest) => api.post<BulkTransactionResponse>('/transactions/bulk', request),
 };
 
+// Dashboard API
+export const dashboardApi = {
+  getSummary: (userId: number, recentLimit: number = 5) =>
+    api.get<DashboardSummary>(`/dashboard/${userId}/summary`, { params: { recent_limit: recentLimit } }),
+};
+
 // Categories API
 export const categoriesApi = {
   getAll: () => api.get<Category[]>('/categories/'),
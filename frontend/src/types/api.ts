@@ -35,6 +35,47 @@ export interface Transaction {
   currency?: string;
 }
 
+export interface TransactionSearchParams {
+  user_id: number;
+  acc_id?: number;
+  tag_id?: number;
+  type?: 'credit' | 'debit';
+  min_amount?: number;
+  max_amount?: number;
+  start_date?: string;
+  end_date?: string;
+  q?: string;
+  limit?: number;
+  cursor?: string;
+  include_total?: boolean;
+}
+
+export interface TransactionPage {
+  items: Transaction[];
+  next_cursor?: string | null;
+  total_count?: number | null;
+}
+
+// Amounts in the dashboard summary are Decimals, sent as strings so no precision is lost
+export interface AccountBalance {
+  acc_id: number;
+  acc_name: string;
+  bank_name: string;
+  currency: string;
+  balance: string;
+}
+
+export interface DashboardSummary {
+  user_id: number;
+  account_count: number;
+  transaction_count: number;
+  accounts: AccountBalance[];
+  month_start: string;
+  monthly_spending: string;
+  monthly_income: string;
+  recent_transactions: Transaction[];
+}
+
 export interface Category {
   category_id?: number;
   user_id: number;
@@ -68,6 +109,8 @@ export interface BulkTransactionRequest {
 export interface BulkTransactionResponse {
   success_count: number;
   failure_count: number;
-  total_count: number;
+  duplicate_count: number;
+  total_processed: number;
+  inserted_ids: number[];
   errors?: string[];
 }
\ No newline at end of file
@@ -1,26 +1,21 @@
-from services.processor import DataHandling
+import argparse
+import sys
+from typing import Optional
 
-if __name__ == "__main__":
-    file_path = "D:\\Downloads\\Oct2024-Oct2025.xls"
-    bank_name = "HDFC"
-    user_id = 1  # TODO: Make this configurable
-    acc_id = 1   # TODO: Make this configurable
+from services.processor import DataHandling
+from services.batch_ingest import build_jobs, discover_statements, ingest_statements, load_manifest
+from services.direct_client import check_backend_dir
+from utils.ingest_ledger import IngestionLedger
 
+def process_single_statement(file_path: str, bank_name: str, user_id: int, acc_id: int, ledger: Optional[IngestionLedger], chunk_size: Optional[int] = None, direct_db: bool = False) -> None:
     try:
-        hdfc_bank = DataHandling(bank_name, file_path)
-        df = hdfc_bank.load_excel_statement()
-        print(df.head())
-        # with open("check_df.txt", "w") as f:
-        #     f.write(df.to_string())
-        df = hdfc_bank.clean_statement(df)
-        # with open("check_df_after_clean.txt", "w") as f:
-        #     f.write(df.to_string())
-        
-        # Apply tagging and process transactions
-        df = hdfc_bank.apply_tags(df)
-        
+        statement = DataHandling(bank_name, file_path, direct_db=direct_db)
+
         # Process and upload transactions using bulk API
-        result = hdfc_bank.process_and_upload_statement(user_id, acc_id)
+        if chunk_size:
+            result = statement.process_and_upload_statement_chunked(user_id, acc_id, chunk_size=chunk_size, ledger=ledger)
+        else:
+            result = statement.process_and_upload_statement(user_id, acc_id, ledger=ledger)
         
         if result['success']:
             print(f"✅ {result['message']}")
@@ -29,3 +24,47 @@ if __name__ == "__main__":
             
     except Exception as e:
         print(f"❌ Error processing statement: {str(e)}")
+
+def process_statements(source: str, manifest_path: str, workers: int, ledger: Optional[IngestionLedger], direct_db: bool = False) -> None:
+    entries = load_manifest(manifest_path)
+    paths = discover_statements(source)
+    jobs, unmatched = build_jobs(paths, entries)
+    for path in unmatched:
+        print(f"⚠️  No manifest entry for {path}, skipping")
+
+    print(f"Processing {len(jobs)} statements...")
+    summary = ingest_statements(jobs, workers=workers, ledger=ledger, direct_db=direct_db)
+    for file_result in summary["files"]:
+        status = "✅" if file_result["success"] else "❌"
+        print(f"{status} {file_result['path']}: {file_result['message']}")
+    print(
+        f"Done: {summary['success_count']} inserted, {summary['duplicate_count']} duplicates, "
+        f"{summary['failure_count']} failed"
+    )
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Process bank statements and upload them to the backend.")
+    parser.add_argument("source", help="Statement file, directory of statements, or glob pattern")
+    parser.add_argument("--manifest", help="JSON manifest mapping statement filenames to bank, account and user")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: number of CPUs)")
+    parser.add_argument("--bank", default="HDFC", help="Bank for a single statement (without --manifest)")
+    parser.add_argument("--user-id", type=int, default=1, help="User for a single statement (without --manifest)")
+    parser.add_argument("--acc-id", type=int, default=1, help="Account for a single statement (without --manifest)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Stream a single statement in chunks of this many rows")
+    parser.add_argument("--direct-db", action="store_true", help="Insert straight into DATABASE_URL via the backend's bulk insert instead of the HTTP API")
+    parser.add_argument("--no-ledger", action="store_true", help="Re-process files and rows recorded in the ingestion ledger")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.direct_db:
+        # Fail before parsing any statement rather than reporting every chunk as failed
+        try:
+            check_backend_dir()
+        except RuntimeError as e:
+            sys.exit(f"❌ {e}")
+    ledger = None if args.no_ledger else IngestionLedger()
+    if args.manifest:
+        process_statements(args.source, args.manifest, args.workers, ledger, args.direct_db)
+    else:
+        process_single_statement(args.source, args.bank, args.user_id, args.acc_id, ledger, args.chunk_size, args.direct_db)
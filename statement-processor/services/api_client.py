@@ -1,10 +1,33 @@
+import asyncio
+import atexit
+import gzip
+import json
+import os
+import random
+import re
+import threading
+import httpx
 import requests
-from typing import List
+from typing import Dict, List, Optional
 from models.bank_config import BankRule
 from models.transaction import Transaction
 
 API_BASE = "http://127.0.0.1:8000"
 
+# Matches BULK_MAX_TRANSACTIONS on the backend's /transactions/bulk endpoint
+UPLOAD_CHUNK_SIZE = 1000
+UPLOAD_CONCURRENCY = 4
+UPLOAD_MAX_RETRIES = 3
+UPLOAD_BACKOFF_SECONDS = 0.5
+UPLOAD_TIMEOUT_SECONDS = 60
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# "columnar" sends gzip column arrays understood by the backend; "json" sends row objects
+UPLOAD_WIRE_FORMAT = os.getenv("UPLOAD_WIRE_FORMAT", "columnar")
+COLUMNAR_CONTENT_TYPE = "application/vnd.finance.transactions.columnar+json"
+
+_ROW_ERROR = re.compile(r"^Transaction (\d+):")
+
 def get_bank_config(bank_name: str) -> BankRule:
     res = requests.get(f"{API_BASE}/banks/config/{bank_name}")
     res.raise_for_status()
@@ -18,33 +41,212 @@ def insert_transactions(transactions: List[Transaction]):
         print("No transactions to insert")
         return
     
-    try:
-        # Use bulk endpoint for better performance
-        # Convert transactions to dictionaries with proper datetime serialization
-        serialized_transactions = []
-        for tx in transactions:
-            tx_dict = tx.dict()
-            # Convert datetime to ISO format string
-            if tx_dict.get('transaction_time'):
-                tx_dict['transaction_time'] = tx_dict['transaction_time'].isoformat()
-            # Convert Decimal to float for JSON serialization
-            if tx_dict.get('amount'):
-                tx_dict['amount'] = float(tx_dict['amount'])
-            serialized_transactions.append(tx_dict)
-        
-        payload = {"transactions": serialized_transactions}
-        res = requests.post(f"{API_BASE}/transactions/bulk", json=payload)
-        res.raise_for_status()
-        
-        result = res.json()
-        print(f"Bulk insert completed: {result['success_count']} successful, {result['failure_count']} failed")
-        
-        if result.get('errors'):
-            print("Errors during insert:")
-            for error in result['errors']:
-                print(f"  - {error}")
-        
-        return result
-    except requests.exceptions.RequestException as e:
-        print(f"Error inserting transactions: {str(e)}")
-        raise
+    # Convert transactions to dictionaries with proper datetime serialization
+    serialized_transactions = []
+    for tx in transactions:
+        tx_dict = tx.dict()
+        # Convert datetime to ISO format string
+        if tx_dict.get('transaction_time'):
+            tx_dict['transaction_time'] = tx_dict['transaction_time'].isoformat()
+        # Send Decimal as a string so no precision is lost in JSON
+        if tx_dict.get('amount') is not None:
+            tx_dict['amount'] = str(tx_dict['amount'])
+        if tx_dict.get('type') is not None:
+            tx_dict['type'] = tx_dict['type'].value
+        serialized_transactions.append(tx_dict)
+
+    return insert_transaction_payload(serialized_transactions)
+
+def _failed_chunk_result(chunk: List[Dict], message: str) -> Dict:
+    return {
+        "success_count": 0,
+        "failure_count": len(chunk),
+        "duplicate_count": 0,
+        "total_processed": len(chunk),
+        "inserted_ids": [],
+        "errors": [message],
+    }
+
+def encode_columnar_chunk(chunk: List[Dict]) -> bytes:
+    """
+    Encode rows as one list per field, gzip compressed.
+    Fields with the same value in every row (account, user) are sent once as constants.
+    """
+    fields = list(dict.fromkeys(key for row in chunk for key in row))
+    columns, constants = {}, {}
+    for field in fields:
+        values = [row.get(field) for row in chunk]
+        if all(value == values[0] for value in values):
+            constants[field] = values[0]
+        else:
+            columns[field] = values
+    body = json.dumps({"columns": columns, "constants": constants}, separators=(",", ":"), default=str)
+    return gzip.compress(body.encode(), compresslevel=6)
+
+def _chunk_request(chunk: List[Dict]) -> Dict:
+    """Request arguments for one chunk in the configured wire format."""
+    if UPLOAD_WIRE_FORMAT == "columnar":
+        return {
+            "content": encode_columnar_chunk(chunk),
+            "headers": {"Content-Type": COLUMNAR_CONTENT_TYPE, "Content-Encoding": "gzip"},
+        }
+    return {"json": {"transactions": chunk}}
+
+async def _post_chunk(client: httpx.AsyncClient, chunk: List[Dict], chunk_index: int, max_retries: int) -> Dict:
+    """
+    POST one chunk to the bulk endpoint, retrying connection errors and
+    retryable status codes with exponential backoff and jitter.
+    A chunk that still fails is reported as a failed result rather than raised.
+    """
+    request = _chunk_request(chunk)
+    for attempt in range(max_retries + 1):
+        try:
+            res = await client.post("/transactions/bulk", **request)
+            if res.status_code not in RETRYABLE_STATUS_CODES:
+                res.raise_for_status()
+                return res.json()
+            error = f"HTTP {res.status_code}"
+        except httpx.TransportError as e:
+            error = str(e) or e.__class__.__name__
+        except httpx.HTTPStatusError as e:
+            # Not retryable, e.g. 400 for a malformed chunk
+            return _failed_chunk_result(chunk, f"Chunk {chunk_index}: {e.response.status_code} {e.response.text}")
+
+        if attempt < max_retries:
+            delay = UPLOAD_BACKOFF_SECONDS * (2 ** attempt) * (1 + random.random())
+            print(f"Chunk {chunk_index} failed ({error}), retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+
+    return _failed_chunk_result(chunk, f"Chunk {chunk_index}: {error} after {max_retries + 1} attempts")
+
+def merge_bulk_results(results: List[Dict], chunk_offsets: List[int]) -> Dict:
+    """
+    Merge per-chunk BulkTransactionResponse dicts into one.
+    Row errors ("Transaction <i>: ...") are renumbered to positions in the full payload.
+    """
+    merged = {
+        "success_count": 0,
+        "failure_count": 0,
+        "duplicate_count": 0,
+        "total_processed": 0,
+        "inserted_ids": [],
+        "errors": [],
+    }
+    for result, offset in zip(results, chunk_offsets):
+        for key in ("success_count", "failure_count", "duplicate_count", "total_processed"):
+            merged[key] += result.get(key) or 0
+        merged["inserted_ids"].extend(result.get("inserted_ids") or [])
+        for error in result.get("errors") or []:
+            merged["errors"].append(
+                _ROW_ERROR.sub(lambda m: f"Transaction {int(m.group(1)) + offset}:", error)
+            )
+    merged["errors"] = merged["errors"] or None
+    return merged
+
+async def upload_transaction_payload_async(
+    payload: List[Dict],
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+    concurrency: int = UPLOAD_CONCURRENCY,
+    max_retries: int = UPLOAD_MAX_RETRIES,
+    client: Optional[httpx.AsyncClient] = None,
+) -> Dict:
+    """
+    Upload a payload in chunks over one persistent HTTP connection pool,
+    keeping up to `concurrency` chunks in flight, and return the merged result.
+    """
+    offsets = list(range(0, len(payload), chunk_size))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(session: httpx.AsyncClient, index: int, offset: int) -> Dict:
+        async with semaphore:
+            return await _post_chunk(session, payload[offset:offset + chunk_size], index, max_retries)
+
+    async def send_all(session: httpx.AsyncClient) -> List[Dict]:
+        return await asyncio.gather(*(send(session, i, offset) for i, offset in enumerate(offsets)))
+
+    if client is not None:
+        results = await send_all(client)
+    else:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=API_BASE, timeout=UPLOAD_TIMEOUT_SECONDS, limits=limits) as session:
+            results = await send_all(session)
+
+    return merge_bulk_results(results, offsets)
+
+class UploadSession:
+    """
+    One event loop and one httpx.AsyncClient shared by every upload of a run, so batch
+    and chunked ingestion keep their connections open between files and chunks instead
+    of opening a new client per call. Uploads are serialized; each one still keeps up
+    to UPLOAD_CONCURRENCY chunks in flight.
+    """
+
+    def __init__(self, base_url: str = API_BASE, concurrency: int = UPLOAD_CONCURRENCY):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self._runner = asyncio.Runner()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    async def _open_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        return httpx.AsyncClient(base_url=self.base_url, timeout=UPLOAD_TIMEOUT_SECONDS, limits=limits)
+
+    def upload(self, payload: List[Dict]) -> Dict:
+        with self._lock:
+            if self._client is None:
+                self._client = self._runner.run(self._open_client())
+            return self._runner.run(
+                upload_transaction_payload_async(payload, concurrency=self.concurrency, client=self._client)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._runner.run(self._client.aclose())
+                self._client = None
+            self._runner.close()
+
+
+_session: Optional[UploadSession] = None
+_session_lock = threading.Lock()
+
+def get_upload_session() -> UploadSession:
+    """Return this process's upload session, opening it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = UploadSession()
+            atexit.register(close_upload_session)
+        return _session
+
+def close_upload_session() -> None:
+    """Close the shared client and its event loop; the next upload opens a new session."""
+    global _session
+    with _session_lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
+
+def insert_transaction_payload(payload: List[Dict]):
+    """
+    Insert already-serialized transaction dicts using the bulk API endpoint.
+    Large payloads are split into chunks and uploaded concurrently over the
+    process's shared upload session.
+    """
+    if not payload:
+        print("No transactions to insert")
+        return
+
+    result = get_upload_session().upload(payload)
+    print(
+        f"Bulk insert completed: {result['success_count']} successful, "
+        f"{result['duplicate_count']} duplicates, {result['failure_count']} failed"
+    )
+    
+    if result.get('errors'):
+        print("Errors during insert:")
+        for error in result['errors']:
+            print(f"  - {error}")
+    
+    return result
@@ -0,0 +1,174 @@
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from typing import Dict, List, Optional, Tuple
+
+from utils.helper import fetch_bank_config, get_tagging_rules
+from utils.ingest_ledger import IngestionLedger, bank_config_version, file_content_hash
+from services.processor import DataHandling
+from services.api_client import insert_transaction_payload
+from services.direct_client import insert_transaction_payload_direct
+
+STATEMENT_EXTENSIONS = (".xls", ".xlsx", ".csv")
+
+@dataclass
+class StatementJob:
+    path: str
+    bank: str
+    acc_id: int
+    user_id: int
+
+# Set once per worker process by _init_worker
+_worker_bank_configs: Dict[str, Dict] = {}
+_worker_tagging_rules: List[Dict] = []
+
+def load_manifest(manifest_path: str) -> List[Dict]:
+    """
+    Load a statement manifest.
+
+    The manifest is a JSON file of the form
+        {"defaults": {"user_id": 1},
+         "statements": [{"pattern": "HDFC_*.xls", "bank": "HDFC", "acc_id": 1}, ...]}
+    where each entry maps a filename glob to the bank, account and user its
+    statements belong to. Entries are checked in order; the first match wins.
+    """
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    defaults = manifest.get("defaults", {})
+    entries = []
+    for entry in manifest.get("statements", []):
+        merged = {**defaults, **entry}
+        missing = [key for key in ("pattern", "bank", "acc_id", "user_id") if key not in merged]
+        if missing:
+            raise ValueError(f"Manifest entry {entry} is missing {', '.join(missing)}")
+        entries.append(merged)
+    return entries
+
+def discover_statements(source: str) -> List[str]:
+    """Return the statement files in a directory, or matching a glob, in sorted order."""
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = glob.glob(source)
+    return sorted(
+        path for path in paths
+        if os.path.isfile(path) and path.lower().endswith(STATEMENT_EXTENSIONS)
+    )
+
+def build_jobs(paths: List[str], entries: List[Dict]) -> Tuple[List[StatementJob], List[str]]:
+    """
+    Match each statement file against the manifest entries.
+    Returns the jobs and the paths no entry matched.
+    """
+    jobs, unmatched = [], []
+    for path in paths:
+        name = os.path.basename(path)
+        entry = next((e for e in entries if fnmatch(name, e["pattern"])), None)
+        if entry is None:
+            unmatched.append(path)
+            continue
+        jobs.append(StatementJob(path=path, bank=entry["bank"], acc_id=int(entry["acc_id"]), user_id=int(entry["user_id"])))
+    return jobs, unmatched
+
+def _init_worker(bank_configs: Dict[str, Dict], tagging_rules: List[Dict]) -> None:
+    global _worker_bank_configs, _worker_tagging_rules
+    _worker_bank_configs = bank_configs
+    _worker_tagging_rules = tagging_rules
+
+def prepare_statement(job: StatementJob) -> List[Dict]:
+    """
+    Load, clean and tag one statement and return its upload payload.
+    Runs inside a worker process, using the config and rules fetched by the parent.
+    """
+    handler = DataHandling(
+        job.bank,
+        job.path,
+        bank_config=_worker_bank_configs.get(job.bank),
+        tagging_rules=_worker_tagging_rules,
+    )
+    df = handler.load_statement()
+    df = handler.clean_statement(df)
+    df = handler.apply_tags(df)
+    return handler.dataframe_to_payload(df, job.user_id, job.acc_id)
+
+def ingest_statements(jobs: List[StatementJob], workers: Optional[int] = None, ledger: Optional[IngestionLedger] = None, direct_db: bool = False) -> Dict:
+    """
+    Process statements in a process pool, one file per worker, and upload each
+    finished payload from this process so only one uploader talks to the API.
+    With a ledger, already-ingested files are never submitted and only rows not
+    uploaded before are sent. direct_db writes through the backend's ingest command
+    straight to Postgres instead of the HTTP API.
+    Returns per-file results and overall counts.
+    """
+    if not jobs:
+        return {"files": [], "success_count": 0, "failure_count": 0, "duplicate_count": 0}
+
+    # Fetch shared reference data once instead of once per file
+    tagging_rules = get_tagging_rules()
+    bank_configs = {}
+    for bank in sorted({job.bank for job in jobs}):
+        config = fetch_bank_config(bank)
+        if config is not None:
+            bank_configs[bank] = config
+
+    upload = insert_transaction_payload_direct if direct_db else insert_transaction_payload
+    files = []
+    totals = {"success_count": 0, "failure_count": 0, "duplicate_count": 0}
+
+    # Ledger keys are computed here, before any worker parses the file
+    ledger_keys = {}
+    if ledger is not None:
+        pending = []
+        for job in jobs:
+            key = (file_content_hash(job.path), bank_config_version(bank_configs.get(job.bank)), job.acc_id)
+            if ledger.has_file(*key):
+                files.append({"path": job.path, "success": True, "message": "Already ingested, skipped"})
+                continue
+            ledger_keys[job.path] = key
+            pending.append(job)
+        jobs = pending
+        if not jobs:
+            return {"files": files, **totals}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(bank_configs, tagging_rules)) as pool:
+        futures = {pool.submit(prepare_statement, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                payload = future.result()
+            except Exception as e:
+                print(f"❌ {job.path}: {str(e)}")
+                files.append({"path": job.path, "success": False, "message": str(e)})
+                continue
+
+            if not payload:
+                files.append({"path": job.path, "success": False, "message": "No valid transactions found"})
+                continue
+
+            row_count = len(payload)
+            if ledger is not None:
+                payload = ledger.filter_new_rows(payload)
+                if not payload:
+                    ledger.record_file(*ledger_keys[job.path], job.path, row_count)
+                    files.append({"path": job.path, "success": True, "message": "No new transactions to upload"})
+                    continue
+
+            print(f"Uploading {len(payload)} transactions from {job.path}...")
+            try:
+                result = upload(payload) or {}
+            except Exception as e:
+                files.append({"path": job.path, "success": False, "message": str(e)})
+                continue
+
+            if ledger is not None and ledger.record_upload(payload, result):
+                ledger.record_file(*ledger_keys[job.path], job.path, row_count)
+
+            for key in totals:
+                totals[key] += result.get(key, 0)
+            files.append({"path": job.path, "success": True, "message": f"Uploaded {len(payload)} transactions", "result": result})
+
+    return {"files": files, **totals}
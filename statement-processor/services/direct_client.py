@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+from services.api_client import encode_columnar_chunk, merge_bulk_results
+
+# Backend checkout whose cli.py does the insert; it reads DATABASE_URL from the environment.
+# The processor image ships the backend at /backend and sets BACKEND_DIR to it.
+BACKEND_DIR = os.getenv(
+    "BACKEND_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend"),
+)
+DIRECT_CHUNK_SIZE = 50_000
+DIRECT_INSERT_MODE = os.getenv("DIRECT_INSERT_MODE", "copy")
+
+def check_backend_dir() -> None:
+    """Raise RuntimeError unless BACKEND_DIR holds the backend's cli.py."""
+    if not os.path.isfile(os.path.join(BACKEND_DIR, "cli.py")):
+        raise RuntimeError(
+            f"Direct insert needs the backend checkout, but {BACKEND_DIR}/cli.py does not exist. "
+            "Set BACKEND_DIR to the backend directory (with its requirements installed)."
+        )
+
+def _ingest_chunk(chunk: List[Dict], chunk_index: int) -> Dict:
+    """Pipe one columnar chunk to the backend's ingest command and return its result."""
+    proc = subprocess.run(
+        [sys.executable, "cli.py", "ingest", "--mode", DIRECT_INSERT_MODE],
+        cwd=BACKEND_DIR,
+        input=encode_columnar_chunk(chunk),
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        message = proc.stderr.decode(errors="replace").strip().splitlines()
+        return {
+            "success_count": 0,
+            "failure_count": len(chunk),
+            "duplicate_count": 0,
+            "total_processed": len(chunk),
+            "inserted_ids": [],
+            "errors": [f"Chunk {chunk_index}: {message[-1] if message else f'exit code {proc.returncode}'}"],
+        }
+    return json.loads(proc.stdout)
+
+def insert_transaction_payload_direct(payload: List[Dict]):
+    """
+    Insert already-serialized transaction dicts straight into Postgres, using the
+    backend's own validation and bulk insert code instead of the HTTP API.
+    Returns the same merged result shape as insert_transaction_payload.
+    Raises RuntimeError if BACKEND_DIR does not hold the backend.
+    """
+    if not payload:
+        print("No transactions to insert")
+        return
+    check_backend_dir()
+
+    offsets = list(range(0, len(payload), DIRECT_CHUNK_SIZE))
+    results = [
+        _ingest_chunk(payload[offset:offset + DIRECT_CHUNK_SIZE], index)
+        for index, offset in enumerate(offsets)
+    ]
+    result = merge_bulk_results(results, offsets)
+    print(
+        f"Direct insert completed: {result['success_count']} successful, "
+        f"{result['duplicate_count']} duplicates, {result['failure_count']} failed"
+    )
+
+    if result.get('errors'):
+        print("Errors during insert:")
+        for error in result['errors']:
+            print(f"  - {error}")
+
+    return result
@@ -1,18 +1,55 @@
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from typing import List
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime
 from decimal import Decimal
 # import yaml
 from utils.helper import fetch_bank_config, get_tagging_rules
+from utils.keyword_matcher import KeywordMatcher
+from utils.ingest_ledger import IngestionLedger, bank_config_version, file_content_hash
 from models.transaction import Transaction, TransactionType
-from services.api_client import insert_transactions
+from services.api_client import insert_transaction_payload
+from services.direct_client import insert_transaction_payload_direct
+
+STATEMENT_CHUNK_SIZE = 5000
+
+def usecols_positions(usecols: Optional[str]) -> Optional[List[int]]:
+    """
+    Convert an Excel-style usecols string such as "A:C,E" into zero-based
+    column positions, so the same bank config can drive CSV reads.
+    Returns None when usecols is empty.
+    """
+    if not usecols:
+        return None
+    positions = []
+    for part in usecols.replace(" ", "").upper().split(","):
+        match = re.fullmatch(r"([A-Z]+)(?::([A-Z]+))?", part)
+        if match is None:
+            raise ValueError(f"Invalid usecols range: {part}")
+        start, end = (_column_index(letters) for letters in (match.group(1), match.group(2) or match.group(1)))
+        positions.extend(range(start, end + 1))
+    return positions
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - ord("A") + 1
+    return index - 1
 
 class DataHandling:
-    def __init__(self, bank:str, statement_path:str):
+    def __init__(self, bank:str, statement_path:str, bank_config: Optional[Dict] = None, tagging_rules: Optional[List[Dict]] = None, direct_db: bool = False):
         self.bank = bank
         self.statement_path = statement_path
-        self.bank_config = fetch_bank_config(self.bank)
-        self._tagging_rules = None  # Cache tagging rules
+        # Write straight to Postgres through the backend's bulk insert instead of the HTTP API
+        self.direct_db = direct_db
+        # Callers processing many statements can pass prefetched config and rules
+        self.bank_config = bank_config if bank_config is not None else fetch_bank_config(self.bank)
+        self._tagging_rules = tagging_rules  # Cache tagging rules
+        self._tag_matcher = None  # Compiled from tagging rules on first use
     
     @property
     def tagging_rules(self):
@@ -22,6 +59,14 @@ class DataHandling:
             self._tagging_rules = get_tagging_rules()
         return self._tagging_rules
 
+    @property
+    def tag_matcher(self) -> KeywordMatcher:
+        """Lazy build and cache the keyword matcher, keeping first-rule-by-rule_id priority"""
+        if self._tag_matcher is None:
+            rules = sorted(self.tagging_rules, key=lambda rule: rule.get('rule_id') or 0)
+            self._tag_matcher = KeywordMatcher(rules)
+        return self._tag_matcher
+
     def load_excel_statement(self) -> pd.DataFrame:
         if self.bank_config is None:
             raise ValueError(f"Bank configuration not found for {self.bank}")
@@ -39,6 +84,98 @@ class DataHandling:
         except Exception as e:
             raise Exception(f"Error reading Excel file: {str(e)}")
 
+    def load_statement(self) -> pd.DataFrame:
+        """Load the whole statement, reading CSV exports chunk by chunk."""
+        if self.statement_path.lower().endswith(".csv"):
+            df = pd.concat(self.iter_statement_chunks(), ignore_index=True)
+            print(f"Loaded {len(df)} rows from statement")
+            return df
+        return self.load_excel_statement()
+
+    def iter_statement_chunks(self, chunk_size: int = STATEMENT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+        """
+        Yield the raw statement in frames of at most chunk_size rows, applying the
+        bank config's skiprows, skipfooter and usecols.
+        CSV and XLSX are streamed; legacy XLS files can only be read whole and
+        are sliced after loading.
+        """
+        if self.bank_config is None:
+            raise ValueError(f"Bank configuration not found for {self.bank}")
+
+        extension = os.path.splitext(self.statement_path)[1].lower()
+        try:
+            if extension == ".csv":
+                yield from self._iter_csv_chunks(chunk_size)
+            elif extension == ".xlsx":
+                yield from self._iter_xlsx_chunks(chunk_size)
+            else:
+                df = self.load_excel_statement()
+                for start in range(0, len(df), chunk_size):
+                    yield df.iloc[start:start + chunk_size]
+        except ValueError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error reading statement file: {str(e)}")
+
+    def _iter_csv_chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        skiprows = self.bank_config["skiprows"]
+        skipfooter = self.bank_config["skipfooter"]
+
+        # read_csv cannot combine skipfooter with chunksize, so count the data
+        # rows up front (a cheap streaming pass) and read exactly that many
+        nrows = None
+        if skipfooter:
+            with open(self.statement_path, "rb") as f:
+                line_count = sum(1 for _ in f)
+            nrows = max(line_count - skiprows - 1 - skipfooter, 0)
+
+        reader = pd.read_csv(
+            self.statement_path,
+            skiprows=skiprows,
+            nrows=nrows,
+            usecols=usecols_positions(self.bank_config.get("usecols")),
+            chunksize=chunk_size,
+            skipinitialspace=True,
+        )
+        with reader:
+            yield from reader
+
+    def _iter_xlsx_chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise Exception("openpyxl is required to stream .xlsx statements")
+
+        skiprows = self.bank_config["skiprows"]
+        skipfooter = self.bank_config["skipfooter"]
+        positions = usecols_positions(self.bank_config.get("usecols"))
+
+        workbook = load_workbook(self.statement_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            for _ in range(skiprows):
+                next(rows, None)
+            header = next(rows, None)
+            if header is None:
+                return
+            pick = (lambda row: [row[i] if i < len(row) else None for i in positions]) if positions else list
+            columns = pick(header)
+
+            # Hold back skipfooter rows so footer lines are never emitted
+            pending = deque()
+            chunk = []
+            for row in rows:
+                pending.append(pick(row))
+                if len(pending) > skipfooter:
+                    chunk.append(pending.popleft())
+                    if len(chunk) == chunk_size:
+                        yield pd.DataFrame(chunk, columns=columns)
+                        chunk = []
+            if chunk:
+                yield pd.DataFrame(chunk, columns=columns)
+        finally:
+            workbook.close()
+
     def clean_description(self, desc: str) -> str:
         reason = desc
         if desc.startswith('UPI'):
@@ -46,6 +183,19 @@ class DataHandling:
         if 'UPI' not in reason and not "PAY" in reason: return reason
         return desc
 
+    def clean_descriptions(self, desc: pd.Series) -> pd.Series:
+        """
+        Vectorized clean_description over an upper-cased description column.
+        UPI descriptions are reduced to the text after the last '-' unless that
+        text itself mentions UPI or PAY.
+        """
+        is_upi = desc.str.startswith('UPI').fillna(False).astype(bool)
+        reason = desc.where(~is_upi, desc.str.rsplit('-', n=1).str[-1])
+        keep_full = (
+            reason.str.contains('UPI', regex=False) | reason.str.contains('PAY', regex=False)
+        ).fillna(False).astype(bool)
+        return reason.where(~keep_full, desc)
+
     def clean_statement(self, df: pd.DataFrame) -> pd.DataFrame:
         if self.bank_config is None:
             raise ValueError(f"Bank configuration not found for {self.bank}")
@@ -61,7 +211,7 @@ class DataHandling:
             if "description" in df.columns:
                 # Store original description before cleaning
                 df["old_description"] = df["description"].str.strip()
-                df["description"] = df["description"].str.strip().str.upper().apply(self.clean_description)
+                df["description"] = self.clean_descriptions(df["description"].str.strip().str.upper())
             
             # Convert date column
             if "date" in df.columns:
@@ -77,7 +227,7 @@ class DataHandling:
             # Calculate net amount and transaction type
             if "withdrawal" in df.columns and "deposit" in df.columns:
                 df["amount"] = df["deposit"] - df["withdrawal"]
-                df["type"] = df["amount"].apply(lambda x: "credit" if x > 0 else "debit")
+                df["type"] = np.where(df["amount"] > 0, "credit", "debit")
                 df = df.drop(columns=["withdrawal", "deposit"])
             
             df["bank"] = self.bank
@@ -92,25 +242,21 @@ class DataHandling:
         Returns tuple of (tag_name, tag_id)
         """
         try:
-            # Use cached tagging rules instead of fetching every time
-            tagging_rules = self.tagging_rules
-            
-            # Find matching rule for description using 'keyword' field
-            desc_upper = desc.upper()
-            for rule in tagging_rules:
+            # Single pass over the description with the compiled matcher
+            rule = self.tag_matcher.match(desc)
+            if rule is not None:
                 keyword = rule.get('keyword', '').strip().upper()
-                if keyword and keyword in desc_upper:
-                    # Debug: print matched tag for first few transactions
-                    if hasattr(self, '_debug_count') and self._debug_count < 3:
-                        print(f"Matched '{keyword}' in '{desc}' -> {rule.get('tag_name')}")
-                        self._debug_count += 1
-                    elif not hasattr(self, '_debug_count'):
-                        self._debug_count = 1
-                        print(f"Matched '{keyword}' in '{desc}' -> {rule.get('tag_name')}")
-                    return (
-                        rule.get('tag_name', 'Unknown'),
-                        rule.get('tag_id', None)
-                    )
+                # Debug: print matched tag for first few transactions
+                if hasattr(self, '_debug_count') and self._debug_count < 3:
+                    print(f"Matched '{keyword}' in '{desc}' -> {rule.get('tag_name')}")
+                    self._debug_count += 1
+                elif not hasattr(self, '_debug_count'):
+                    self._debug_count = 1
+                    print(f"Matched '{keyword}' in '{desc}' -> {rule.get('tag_name')}")
+                return (
+                    rule.get('tag_name', 'Unknown'),
+                    rule.get('tag_id', None)
+                )
             
             # No matching rule found
             return ('Unknown', None)
@@ -128,8 +274,9 @@ class DataHandling:
             df["tag_id"] = None
             return df
         
-        # Apply tagging rules
-        tagging_results = df["description"].apply(self.get_tag)
+        # Apply tagging rules once per distinct description
+        tags_by_description = {desc: self.get_tag(desc) for desc in df["description"].unique()}
+        tagging_results = df["description"].map(tags_by_description)
         
         # Split tuple results into separate columns
         df[["tag_name", "tag_id"]] = pd.DataFrame(
@@ -175,14 +322,93 @@ class DataHandling:
         print(f"Converted {len(transactions)} rows to Transaction objects")
         return transactions
     
-    def process_and_upload_statement(self, user_id: int, acc_id: int) -> dict:
+    @staticmethod
+    def _nullable(series: pd.Series) -> list:
+        """Convert a column to a Python list with missing values as None."""
+        return series.astype(object).where(series.notna(), None).tolist()
+
+    def dataframe_to_payload(self, df: pd.DataFrame, user_id: int, acc_id: int, row_offset: int = 0) -> List[Dict]:
+        """
+        Columnar alternative to dataframe_to_transactions.
+        Builds the bulk upload payload straight from the frame's columns and
+        validates all rows at once with the same rules the backend applies.
+        row_offset is the number of valid rows in earlier chunks when df is one chunk of a
+        statement, so generated reference IDs continue the statement's sequence.
+        """
+        if df.empty:
+            print("Converted 0 rows to upload payload")
+            return []
+
+        times = pd.to_datetime(df["date"], errors="coerce")
+        amounts = pd.to_numeric(df["amount"], errors="coerce")
+
+        if "type" in df.columns:
+            types = pd.Series(np.where(df["type"] == "credit", "credit", "debit"), index=df.index)
+        else:
+            types = pd.Series("debit", index=df.index)
+
+        # Batch validation: required fields present and amount sign matching the type
+        valid = times.notna() & amounts.notna()
+        valid &= np.where(types == "credit", amounts > 0, amounts <= 0)
+
+        if "reference_id" in df.columns:
+            ref_ids = df["reference_id"].astype(str)
+            valid &= ref_ids.str.len().gt(0)
+        else:
+            # Same fallback as dataframe_to_transactions: BANK_YYYYMMDD_<n>, where n counts
+            # only the rows that convert, so skipped rows don't shift later IDs
+            row_numbers = (valid.cumsum() - 1 + row_offset).astype(str)
+            ref_ids = self.bank + "_" + times.dt.strftime("%Y%m%d") + "_" + row_numbers
+
+        skipped = int((~valid).sum())
+        if skipped:
+            print(f"Skipping {skipped} rows that failed validation")
+
+        descriptions = df["description"] if "description" in df.columns else pd.Series("", index=df.index)
+        old_descriptions = df["old_description"] if "old_description" in df.columns else descriptions
+        if "tag_id" in df.columns:
+            tag_ids = pd.to_numeric(df["tag_id"], errors="coerce").astype("Int64")
+        else:
+            tag_ids = pd.Series(pd.NA, index=df.index, dtype="Int64")
+
+        columns = {
+            "transaction_time": times[valid].dt.strftime("%Y-%m-%dT%H:%M:%S").tolist(),
+            "description": self._nullable(descriptions[valid]),
+            "old_description": self._nullable(old_descriptions[valid]),
+            # Amounts travel as strings so the backend parses exact Decimals
+            "amount": amounts[valid].astype(str).tolist(),
+            "reference_id": ref_ids[valid].tolist(),
+            "type": types[valid].tolist(),
+            "tag_id": self._nullable(tag_ids[valid]),
+        }
+        keys = list(columns) + ["acc_id", "user_id"]
+        payload = [dict(zip(keys, (*values, acc_id, user_id))) for values in zip(*columns.values())]
+
+        print(f"Converted {len(payload)} rows to upload payload")
+        return payload
+
+    def upload_payload(self, payload: List[Dict]) -> Optional[Dict]:
+        """Send a payload through the configured ingestion path."""
+        if self.direct_db:
+            return insert_transaction_payload_direct(payload)
+        return insert_transaction_payload(payload)
+
+    def process_and_upload_statement(self, user_id: int, acc_id: int, ledger: Optional[IngestionLedger] = None) -> dict:
         """
         Complete pipeline to process statement and upload to backend.
+        With a ledger, files already ingested for this account and bank config are
+        skipped, and only rows not uploaded before are sent.
         """
         try:
+            if ledger is not None:
+                content_hash = file_content_hash(self.statement_path)
+                config_version = bank_config_version(self.bank_config)
+                if ledger.has_file(content_hash, config_version, acc_id):
+                    return {"success": True, "message": f"Statement {self.statement_path} was already ingested, skipping"}
+
             # Load statement
             print(f"Loading statement from {self.statement_path}")
-            df = self.load_excel_statement()
+            df = self.load_statement()
             
             # Clean statement data
             print("Cleaning statement data...")
@@ -192,20 +418,32 @@ class DataHandling:
             print("Applying tagging rules...")
             df = self.apply_tags(df)
             
-            # Convert to Transaction objects
-            print("Converting to Transaction objects...")
-            transactions = self.dataframe_to_transactions(df, user_id, acc_id)
+            # Build the upload payload from the frame's columns
+            print("Converting to upload payload...")
+            payload = self.dataframe_to_payload(df, user_id, acc_id)
             
-            if not transactions:
+            if not payload:
                 return {"success": False, "message": "No valid transactions found"}
             
+            row_count = len(payload)
+            if ledger is not None:
+                # Drop rows already uploaded from an overlapping statement
+                payload = ledger.filter_new_rows(payload)
+                print(f"{row_count - len(payload)} rows were uploaded before, {len(payload)} new")
+                if not payload:
+                    ledger.record_file(content_hash, config_version, acc_id, self.statement_path, row_count)
+                    return {"success": True, "message": "No new transactions to upload"}
+            
             # Upload to backend
-            print(f"Uploading {len(transactions)} transactions...")
-            result = insert_transactions(transactions)
+            print(f"Uploading {len(payload)} transactions...")
+            result = self.upload_payload(payload)
+            
+            if ledger is not None and ledger.record_upload(payload, result):
+                ledger.record_file(content_hash, config_version, acc_id, self.statement_path, row_count)
             
             return {
                 "success": True, 
-                "message": f"Successfully processed {len(transactions)} transactions",
+                "message": f"Successfully processed {len(payload)} transactions",
                 "result": result
             }
             
@@ -213,3 +451,73 @@ class DataHandling:
             error_msg = f"Error processing statement: {str(e)}"
             print(error_msg)
             return {"success": False, "message": error_msg}
+
+    def process_and_upload_statement_chunked(self, user_id: int, acc_id: int, chunk_size: int = STATEMENT_CHUNK_SIZE, ledger: Optional[IngestionLedger] = None) -> dict:
+        """
+        Streaming variant of process_and_upload_statement for large exports.
+        Each chunk goes through clean -> tag -> convert and is uploaded in the
+        background while the next chunk is parsed; at most one chunk is in
+        flight, so memory stays bounded by the chunk size.
+        """
+        try:
+            if ledger is not None:
+                content_hash = file_content_hash(self.statement_path)
+                config_version = bank_config_version(self.bank_config)
+                if ledger.has_file(content_hash, config_version, acc_id):
+                    return {"success": True, "message": f"Statement {self.statement_path} was already ingested, skipping"}
+
+            totals = {"success_count": 0, "failure_count": 0, "duplicate_count": 0}
+            errors = []
+            row_count = 0
+            numbered_rows = 0
+            all_accepted = True
+
+            def collect(payload: List[Dict], result: Optional[Dict]) -> None:
+                nonlocal all_accepted
+                result = result or {}
+                for key in totals:
+                    totals[key] += result.get(key, 0)
+                errors.extend(result.get("errors") or [])
+                if ledger is not None and not ledger.record_upload(payload, result):
+                    all_accepted = False
+
+            print(f"Streaming statement from {self.statement_path} in chunks of {chunk_size} rows")
+            with ThreadPoolExecutor(max_workers=1) as uploader:
+                in_flight = None
+                for chunk in self.iter_statement_chunks(chunk_size):
+                    df = self.clean_statement(chunk)
+                    if df.empty:
+                        continue
+                    df = self.apply_tags(df)
+                    payload = self.dataframe_to_payload(df, user_id, acc_id, row_offset=numbered_rows)
+                    row_count += len(df)
+                    numbered_rows += len(payload)
+                    if ledger is not None:
+                        payload = ledger.filter_new_rows(payload)
+                    if not payload:
+                        continue
+
+                    # Wait for the previous upload before queueing this one
+                    if in_flight is not None:
+                        collect(in_flight[0], in_flight[1].result())
+                    print(f"Uploading {len(payload)} transactions...")
+                    in_flight = (payload, uploader.submit(self.upload_payload, payload))
+
+                if in_flight is not None:
+                    collect(in_flight[0], in_flight[1].result())
+
+            if row_count == 0:
+                return {"success": False, "message": "No valid transactions found"}
+            if ledger is not None and all_accepted:
+                ledger.record_file(content_hash, config_version, acc_id, self.statement_path, row_count)
+
+            return {
+                "success": True,
+                "message": f"Successfully processed {row_count} transactions",
+                "result": {**totals, "errors": errors or None},
+            }
+
+        except Exception as e:
+            error_msg = f"Error processing statement: {str(e)}"
+            print(error_msg)
+            return {"success": False, "message": error_msg}
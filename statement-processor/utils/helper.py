@@ -1,13 +1,55 @@
+import hashlib
+import json
+import os
 import requests
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List
+
+# Last good response per URL with its ETag, revalidated with If-None-Match on every run
+REFERENCE_CACHE_DIR = os.getenv(
+    "REFERENCE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "reference_cache"),
+)
+
+def _cache_path(url: str) -> str:
+    return os.path.join(REFERENCE_CACHE_DIR, hashlib.sha256(url.encode()).hexdigest()[:32] + ".json")
+
+def _read_cache(url: str) -> Optional[Dict]:
+    try:
+        with open(_cache_path(url)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_cache(url: str, etag: str, body: Any) -> None:
+    os.makedirs(REFERENCE_CACHE_DIR, exist_ok=True)
+    tmp_path = _cache_path(url) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"url": url, "etag": etag, "body": body}, f)
+    os.replace(tmp_path, _cache_path(url))
+
+def get_json_validated(url: str, timeout: int = 10) -> requests.Response:
+    """
+    GET a read-mostly endpoint through the local cache.
+    Sends the cached ETag as If-None-Match; on 304 the cached body is served
+    as a 200 response, so callers handle both cases the same way.
+    """
+    cached = _read_cache(url)
+    headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+    response = requests.get(url, headers=headers, verify=False, timeout=timeout)
+
+    if response.status_code == 304 and cached is not None:
+        response.status_code = 200
+        response._content = json.dumps(cached["body"]).encode()
+    elif response.status_code == 200 and response.headers.get("ETag"):
+        _write_cache(url, response.headers["ETag"], response.json())
+    return response
 
 def fetch_bank_config(bank: str) -> Optional[Dict]:
     """
     Fetch bank configuration from API.
     """
     try:
-        response = requests.get(f"http://127.0.0.1:8000/bank-configs/{bank}", 
-                              verify=False, timeout=10)
+        response = get_json_validated(f"http://127.0.0.1:8000/bank-configs/{bank}")
         
         if response.status_code == 200:
             bank_config = response.json()
@@ -32,8 +74,7 @@ def get_tagging_rules() -> List[Dict]:
     Fetch tagging rules from API.
     """
     try:
-        response = requests.get("http://127.0.0.1:8000/tagging_rules/", 
-                              verify=False, timeout=10)
+        response = get_json_validated("http://127.0.0.1:8000/tagging_rules/")
         
         if response.status_code == 200:
             return response.json()
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+DEFAULT_LEDGER_PATH = os.getenv(
+    "STATEMENT_LEDGER_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "ingest_ledger.sqlite"),
+)
+
+def file_content_hash(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's bytes, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def bank_config_version(bank_config: Optional[Dict]) -> str:
+    """
+    Stable hash of a bank config, so statements are re-processed when the
+    column mapping or read settings change.
+    """
+    canonical = json.dumps(bank_config or {}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+def row_fingerprint(acc_id: int, reference_id: str) -> str:
+    """Fingerprint of an uploaded row; mirrors the backend's unique_reference_per_account key."""
+    return f"{acc_id}:{reference_id}"
+
+class IngestionLedger:
+    """
+    Local SQLite record of ingested statement files and uploaded rows.
+
+    Files are keyed by content hash, bank config version and account, so the
+    same export is skipped without being parsed again. Row fingerprints let an
+    overlapping statement upload only the rows that were not sent before.
+    """
+
+    def __init__(self, path: str = DEFAULT_LEDGER_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS ingested_files (
+                    content_hash TEXT NOT NULL,
+                    config_version TEXT NOT NULL,
+                    acc_id INTEGER NOT NULL,
+                    path TEXT,
+                    row_count INTEGER,
+                    ingested_at TEXT,
+                    PRIMARY KEY (content_hash, config_version, acc_id)
+                );
+                CREATE TABLE IF NOT EXISTS ingested_rows (
+                    fingerprint TEXT PRIMARY KEY
+                );
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def has_file(self, content_hash: str, config_version: str, acc_id: int) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM ingested_files WHERE content_hash = ? AND config_version = ? AND acc_id = ?",
+                (content_hash, config_version, acc_id),
+            ).fetchone()
+        return row is not None
+
+    def record_file(self, content_hash: str, config_version: str, acc_id: int, path: str, row_count: int) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ingested_files VALUES (?, ?, ?, ?, ?, ?)",
+                (content_hash, config_version, acc_id, path, row_count, datetime.now().isoformat()),
+            )
+
+    def known_fingerprints(self, fingerprints: Iterable[str]) -> Set[str]:
+        """Return the subset of fingerprints already in the ledger."""
+        candidates = list(fingerprints)
+        known = set()
+        with self._connect() as conn:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(candidates), 900):
+                batch = candidates[start:start + 900]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT fingerprint FROM ingested_rows WHERE fingerprint IN ({placeholders})", batch
+                ).fetchall()
+                known.update(row[0] for row in rows)
+        return known
+
+    def record_fingerprints(self, fingerprints: Iterable[str]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO ingested_rows (fingerprint) VALUES (?)",
+                ((fingerprint,) for fingerprint in fingerprints),
+            )
+
+    def filter_new_rows(self, payload: List[Dict]) -> List[Dict]:
+        """Drop payload rows whose fingerprint was recorded by an earlier upload."""
+        fingerprints = [row_fingerprint(row["acc_id"], row["reference_id"]) for row in payload]
+        known = self.known_fingerprints(fingerprints)
+        if not known:
+            return payload
+        return [row for row, fingerprint in zip(payload, fingerprints) if fingerprint not in known]
+
+    def record_upload(self, payload: List[Dict], result: Optional[Dict]) -> bool:
+        """
+        Record fingerprints for rows the backend accepted (inserted or already present).
+        Rows named in per-row errors are left out so they are retried next time.
+        Returns True if every row was accepted.
+        """
+        result = result or {}
+        rejected = set()
+        if result.get("failure_count"):
+            # Row errors look like "Transaction <index>: ..."; anything else means the batch failed
+            for error in result.get("errors") or []:
+                prefix = error.split(":", 1)[0]
+                if not prefix.startswith("Transaction ") or not prefix[len("Transaction "):].isdigit():
+                    return False
+                rejected.add(int(prefix[len("Transaction "):]))
+            accepted = result.get("success_count", 0) + result.get("duplicate_count", 0)
+            if accepted != len(payload) - len(rejected):
+                return False
+
+        self.record_fingerprints(
+            row_fingerprint(row["acc_id"], row["reference_id"])
+            for index, row in enumerate(payload) if index not in rejected
+        )
+        return not rejected